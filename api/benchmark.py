@@ -0,0 +1,730 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction, close_old_connections
+from django.http import HttpResponseNotFound
+from django.utils import timezone
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from users.models import User
+from references.models import UserTeam, UserSeason
+from events.models import UserEvent, EventVideoLink
+from exercises.models import UserFolder, AdminFolder, UserExercise, AdminExercise
+from players.models import UserPlayer, PlayerCard, PlayerCharacteristicsRows, PlayerCharacteristicUser
+from matches.models import UserMatch, UserProtocol
+from shared.models import SharedLink
+import exercises.v_api as exercises_v_api
+import players.v_api as players_v_api
+import matches.v_api as matches_v_api
+import shared.v_api as shared_v_api
+import api.languages as languages
+import api.responses as responses
+import api.metrics as api_metrics
+import exercises.nfb_library as nfb_library
+
+
+BENCH_USER_EMAIL = "bench@nanofootball.local"
+BENCH_BASE_DATE = datetime(2022, 1, 1, 10, 0)
+BENCH_LINK = "bench-shared-match"
+BENCH_LINK_EXPIRED = "bench-shared-match-expired"
+BENCH_LINKS_PREFIX = "bench-link-"
+BENCH_FOLDER_MARKER = "__bench__"
+BATCH_SIZE = 1000
+SURNAMES = ["Ivanov", "Petrov", "Smirnov", "Kuznetsov", "Popov", "Sokolov", "Lebedev", "Kozlov", "Novikov", "Morozov"]
+NAMES = ["Alex", "Ivan", "Dmitry", "Sergey", "Andrey", "Pavel", "Nikita", "Maxim", "Oleg", "Roman"]
+TRIMMED_CASES = [
+    "exercises.GET_get_exs_all", "exercises.GET_get_exs_one", "players.GET_get_players_json",
+    "players.GET_get_player", "matches.GET_get_matches", "matches.GET_get_match", "matches.GET_get_match_protocol",
+]
+SERIALIZED_CASES = ["exercises.GET_get_exs_all", "players.GET_get_players_json", "matches.GET_get_match_protocol"]
+IMPORT_PLAYERS_DEFAULT = 50000
+STARTUP_TARGETS = ["", "api.views", "shared.views", "exercises.views", "players.views", "matches.views"]
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+WORDS = ["pass", "shot", "dribble", "press", "cross", "header", "sprint", "tackle", "keeper", "rondo"]
+
+
+
+def make_title(rnd, prefix, num):
+    words = " ".join(rnd.choice(WORDS) for _ in range(3))
+    return {'en': f"{prefix} {num}: {words}", 'ru': f"{prefix} {num}: {words}"}
+
+
+def get_bench_link(seed, num):
+    """
+    Return unique token of bulk-created shared link. Tokens look random like real tokens, so links are spread over index.
+
+    """
+    return BENCH_LINKS_PREFIX + hashlib.sha1(f"{seed}:{num}".encode()).hexdigest()[:24] + f"-{num}"
+
+
+def generate_data(seed=1, teams=2, players=1000, characteristics=10, folders=5, exercises=2000, matches=40, links=0, stdout=None):
+    """
+    Create deterministic synthetic data for benchmarks: user, teams, season, players with cards and characteristics,
+    folders' trees with user's and NFB exercises, matches with video links and protocols, valid and expired shared links to the first match.
+    Additional <links> shared links (valid and expired in turn) fill the table for benchmark of link's resolution, for example: 1 000 000.
+    Previous data of benchmark's user is deleted, so result depends only on seed and amounts.
+
+    :param seed: Seed of random generator.
+    :type seed: [int]
+    :param teams: Amount of teams.
+    :type teams: [int]
+    :param players: Amount of players in each team.
+    :type players: [int]
+    :param characteristics: Amount of characteristics' rows.
+    :type characteristics: [int]
+    :param folders: Amount of root folders, each root folder has three child folders.
+    :type folders: [int]
+    :param exercises: Amount of user's exercises, the same amount of NFB exercises is created.
+    :type exercises: [int]
+    :param matches: Amount of matches in each team.
+    :type matches: [int]
+    :param links: Amount of additional shared links without snapshots.
+    :type links: [int]
+    :param stdout: Stream for progress messages or None.
+    :type stdout: [OutputWrapper] or None
+    :return: Benchmark's user.
+    :rtype: Model.object[User]
+
+    """
+    rnd = random.Random(seed)
+    def log(msg):
+        if stdout is not None:
+            stdout.write(msg)
+
+    with transaction.atomic():
+        # links are deleted by batches, deletion of user would load all of them at once.
+        old_links = SharedLink.objects.filter(user__email=BENCH_USER_EMAIL, link__startswith=BENCH_LINKS_PREFIX)
+        links_ids = list(old_links.values_list('id', flat=True)[:BATCH_SIZE])
+        while len(links_ids) > 0:
+            SharedLink.objects.filter(id__in=links_ids).delete()
+            links_ids = list(old_links.values_list('id', flat=True)[:BATCH_SIZE])
+        User.objects.filter(email=BENCH_USER_EMAIL).delete()
+        AdminFolder.objects.filter(short_name__startswith=BENCH_FOLDER_MARKER).delete()
+        user = User(email=BENCH_USER_EMAIL)
+        user.set_unusable_password()
+        user.save()
+
+        f_teams = [UserTeam.objects.create(user_id=user, name=f"Bench team {i + 1}") for i in range(teams)]
+        f_season = UserSeason.objects.create(
+            user_id=user, name="Bench season",
+            date_with=BENCH_BASE_DATE.date(), date_by=(BENCH_BASE_DATE + timedelta(days=364)).date()
+        )
+        log(f"Teams: {len(f_teams)}, season: {f_season.id}")
+
+        f_rows = PlayerCharacteristicsRows.objects.bulk_create([
+            PlayerCharacteristicsRows(user=user, is_nfb=False, parent=0, title=make_title(rnd, "Skill", i + 1), order=i)
+            for i in range(characteristics)
+        ])
+        for team in f_teams:
+            cards = PlayerCard.objects.bulk_create([
+                PlayerCard(
+                    growth=rnd.randint(150, 200), weight=rnd.randint(45, 95), game_num=rnd.randint(1, 99),
+                    birthsday=date(2000, 1, 1) + timedelta(days=rnd.randint(0, 4000)),
+                ) for _ in range(players)
+            ], batch_size=BATCH_SIZE)
+            f_players = UserPlayer.objects.bulk_create([
+                UserPlayer(user=user, team=team, card=card, surname=rnd.choice(SURNAMES), name=rnd.choice(NAMES))
+                for card in cards
+            ], batch_size=BATCH_SIZE)
+            PlayerCharacteristicUser.objects.bulk_create([
+                PlayerCharacteristicUser(characteristics=row, user=user, player=player, value=rnd.randint(0, 10))
+                for player in f_players for row in f_rows
+            ], batch_size=BATCH_SIZE)
+            log(f"Team {team.id}: players {len(f_players)}")
+
+        user_folders = []
+        nfb_folders = []
+        for i in range(folders):
+            root = UserFolder.objects.create(user=user, team=f_teams[0], parent=0, name=f"Folder {i + 1}", short_name=f"F{i + 1}", order=i)
+            nfb_root = AdminFolder.objects.create(parent=0, name=f"NFB folder {i + 1}", short_name=f"{BENCH_FOLDER_MARKER}{i + 1}", order=i)
+            for j in range(3):
+                user_folders.append(UserFolder.objects.create(
+                    user=user, team=f_teams[0], parent=root.id, name=f"Folder {i + 1}.{j + 1}", short_name=f"F{i + 1}.{j + 1}", order=j
+                ))
+                nfb_folders.append(AdminFolder.objects.create(
+                    parent=nfb_root.id, name=f"NFB folder {i + 1}.{j + 1}", short_name=f"{BENCH_FOLDER_MARKER}{i + 1}.{j + 1}", order=j
+                ))
+        user_exercises = [
+            UserExercise(
+                user=user, folder=user_folders[i % len(user_folders)], order=i,
+                title=make_title(rnd, "Exercise", i + 1), description=make_title(rnd, "Description", i + 1),
+                video_data={'data': [-1, -1]}, animation_data={'data': {'custom': "", 'default': [-1, -1]}},
+            ) for i in range(exercises)
+        ]
+        nfb_exercises = [
+            AdminExercise(
+                folder=nfb_folders[i % len(nfb_folders)], order=i,
+                title=make_title(rnd, "NFB exercise", i + 1), description=make_title(rnd, "Description", i + 1),
+                video_data={'data': [-1, -1]}, animation_data={'data': {'custom': "", 'default': [-1, -1]}},
+            ) for i in range(exercises)
+        ]
+        for exercise in user_exercises + nfb_exercises:
+            exercise.set_title_keys()
+        UserExercise.objects.bulk_create(user_exercises, batch_size=BATCH_SIZE)
+        AdminExercise.objects.bulk_create(nfb_exercises, batch_size=BATCH_SIZE)
+        # bulk_create() doesn't send signals, so new NFB exercises have to be published manually.
+        nfb_library.bump_version()
+        log(f"Folders: {len(user_folders)}, exercises: {exercises} + {exercises} NFB")
+
+        for team in f_teams:
+            team_players = list(UserPlayer.objects.filter(team=team).order_by('id')[:22])
+            for i in range(matches):
+                video_link = EventVideoLink.objects.create(
+                    json_link=[f"https://video.local/{team.id}/{i}/{k}" for k in range(2)], description=["", ""]
+                )
+                event = UserEvent.objects.create(
+                    user_id=user, date=BENCH_BASE_DATE + timedelta(days=i * 7, hours=team.id % 5), video_link=video_link
+                )
+                match = UserMatch.objects.create(
+                    event_id=event, team_id=team, opponent=f"Opponent {rnd.randint(1, 50)}",
+                    goals=rnd.randint(0, 5), o_goals=rnd.randint(0, 5), duration=timedelta(minutes=90),
+                )
+                UserProtocol.objects.bulk_create([
+                    UserProtocol(
+                        match=match, player=player, order=k, p_num=k + 1,
+                        minute_from=0, minute_to=rnd.choice([45, 60, 90]), goal=rnd.randint(0, 2),
+                    ) for k, player in enumerate(team_players)
+                ])
+            log(f"Team {team.id}: matches {matches}")
+
+        first_match = UserMatch.objects.filter(team_id=f_teams[0]).order_by('event_id').first()
+        if first_match is not None:
+            snapshot = matches_v_api.get_match_snapshot(make_request(user, "GET", {}, {}), first_match)
+            for link, days in [(BENCH_LINK, 365), (BENCH_LINK_EXPIRED, -1)]:
+                SharedLink.objects.create(
+                    link=link, user=user, match_user=first_match, snapshot=snapshot,
+                    expiration_date=timezone.now() + timedelta(days=days)
+                )
+            log(f"Shared links: {BENCH_LINK}, {BENCH_LINK_EXPIRED}")
+            now = timezone.now()
+            for start in range(0, links, BATCH_SIZE):
+                SharedLink.objects.bulk_create([
+                    SharedLink(
+                        link=get_bench_link(seed, num), user=user, match_user=first_match,
+                        expiration_date=now + timedelta(days=365 if num % 2 == 0 else -1)
+                    ) for num in range(start, min(links, start + BATCH_SIZE))
+                ])
+            log(f"Additional shared links: {links}")
+    return user
+
+
+def make_request(user, method, params, session):
+    factory = RequestFactory()
+    headers = {'HTTP_X_REQUESTED_WITH': "XMLHttpRequest"}
+    if method == "POST":
+        request = factory.post("/bench", params, **headers)
+    else:
+        request = factory.get("/bench", params, **headers)
+    request.user = user
+    request.session = dict(session)
+    request.LANGUAGE_CODE = "en"
+    return request
+
+
+def read_response(response):
+    if getattr(response, "streaming", False):
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def get_shared_link(request, cur_user, cur_team):
+    # shared page is public, link is resolved without user like shared.views.shared_link does.
+    request.user = AnonymousUser()
+    return shared_v_api.GET_get_link(request) or HttpResponseNotFound()
+
+
+def with_json_backend(func, backend_name):
+    """
+    Return v_api function, which serializes response by JSON backend from api.responses.JSON_BACKENDS.
+    Streaming content is read while backend is selected, so the whole response is serialized by this backend.
+
+    :param func: The v_api function.
+    :type func: [function]
+    :param backend_name: Backend's name, for example: "json", "orjson".
+    :type backend_name: [str]
+    :return: Function with the same arguments.
+    :rtype: [function]
+
+    """
+    def call(request, cur_user, cur_team):
+        with override_settings(API_JSON_BACKEND=backend_name):
+            response = func(request, cur_user, cur_team)
+            if getattr(response, "streaming", False):
+                response.streaming_content = [b"".join(response.streaming_content)]
+        return response
+    return call
+
+
+def get_benchmark_cases(user):
+    """
+    Return list of benchmark's cases: (name, method, v_api function, params).
+    Objects for cases are taken from data created by generate_data().
+
+    :param user: Benchmark's user.
+    :type user: Model.object[User]
+    :return: List of cases.
+    :rtype: list[tuple]
+
+    """
+    team = UserTeam.objects.filter(user_id=user).order_by('id').first()
+    season = UserSeason.objects.filter(user_id=user).order_by('id').first()
+    folder = UserFolder.objects.filter(user=user).exclude(parent=0).order_by('id').first()
+    nfb_folder = AdminFolder.objects.filter(short_name__startswith=BENCH_FOLDER_MARKER).exclude(parent=0).order_by('id').first()
+    exercise = UserExercise.objects.filter(user=user).order_by('id').first()
+    player = UserPlayer.objects.filter(user=user, team=team).order_by('id').first()
+    match = UserMatch.objects.filter(team_id=team).order_by('event_id').first()
+    protocol = UserProtocol.objects.filter(match=match).order_by('id').first()
+    session = {'team': team.id, 'season': season.id}
+    cases = [
+        ("exercises.GET_get_exs_all", "GET", exercises_v_api.GET_get_exs_all, {'folder': folder.id, 'f_type': exercises_v_api.FOLDER_TEAM}),
+        ("exercises.GET_get_exs_all(nfb)", "GET", exercises_v_api.GET_get_exs_all, {'folder': nfb_folder.id, 'f_type': exercises_v_api.FOLDER_NFB}),
+        ("exercises.GET_get_exs_one", "GET", exercises_v_api.GET_get_exs_one, {'exs': exercise.id, 'f_type': exercises_v_api.FOLDER_TEAM}),
+        ("exercises.GET_get_nfb_library", "GET", exercises_v_api.GET_get_nfb_library, {}),
+        ("exercises.POST_move_exs", "POST", exercises_v_api.POST_move_exs, {'exs': exercise.id, 'folder': folder.id}),
+        ("players.GET_get_players_json", "GET", lambda req, u, t: players_v_api.GET_get_players_json(req, u, t, False), {}),
+        ("players.GET_get_players_json(table)", "GET", players_v_api.GET_get_players_json, {'start': 0, 'length': 50}),
+        ("players.GET_get_player", "GET", players_v_api.GET_get_player, {'id': player.id}),
+        ("matches.GET_get_matches", "GET", matches_v_api.GET_get_matches, {'season': season.id}),
+        ("matches.GET_get_match", "GET", matches_v_api.GET_get_match, {'id': match.event_id.id}),
+        ("matches.GET_get_match_protocol", "GET", matches_v_api.GET_get_match_protocol, {'id': match.event_id.id}),
+        ("shared.GET_get_link", "GET", get_shared_link, {'link': BENCH_LINK}),
+        ("shared.GET_get_link(expired)", "GET", get_shared_link, {'link': BENCH_LINK_EXPIRED}),
+        ("matches.POST_edit_players_protocol", "POST", lambda req, u, t: matches_v_api.POST_edit_players_protocol(req, u), {'protocol_id': protocol.id, 'key': "goal", 'value': 1}),
+    ]
+    # links from the middle of table created by generate_data(links=N), they have no snapshot, so page isn't cached
+    # and each request measures lookup by index of link's token.
+    bulk_links = SharedLink.objects.filter(user=user, link__startswith=BENCH_LINKS_PREFIX)
+    links_count = bulk_links.count()
+    if links_count > 1:
+        middle_links = list(bulk_links.order_by('id').values_list('link', 'expiration_date')[links_count // 2:links_count // 2 + 2])
+        now = timezone.now()
+        valid_link = next(link for link, expiration_date in middle_links if expiration_date > now)
+        expired_link = next(link for link, expiration_date in middle_links if expiration_date <= now)
+        cases += [
+            (f"shared.GET_get_link(table {links_count})", "GET", get_shared_link, {'link': valid_link}),
+            (f"shared.GET_get_link(table {links_count}, expired)", "GET", get_shared_link, {'link': expired_link}),
+            (f"shared.GET_get_link(table {links_count}, missing)", "GET", get_shared_link, {'link': f"{BENCH_LINKS_PREFIX}missing"}),
+        ]
+    # the same reads with language-trimmed payload, compare their "size" with full payload.
+    cases += [
+        (f"{name}(lang_only)", method, func, {**params, languages.TRIM_PARAM: "1"})
+        for name, method, func, params in cases if name in TRIMMED_CASES
+    ]
+    # the same reads with each JSON backend, compare their latency.
+    cases += [
+        (f"{name}[{backend_name}]", method, with_json_backend(func, backend_name), params)
+        for name, method, func, params in cases if name in SERIALIZED_CASES
+        for backend_name in responses.JSON_BACKENDS
+    ]
+    return [(name, method, func, params, session) for name, method, func, params in cases]
+
+
+@contextmanager
+def count_queries():
+    """
+    Count queries of the current thread and of loaders, which api.concurrency.run_parallel() calls in pool's threads.
+    CaptureQueriesContext sees only connection of the current thread, so queries of parallel loaders would be missed.
+    Counter is shared with threads like metrics of request in api.metrics.MetricsMiddleware.
+
+    :return: Metrics with amount of queries in key "queries".
+    :rtype: dict
+
+    """
+    metrics = {
+        'queries': 0, 'db_time': 0.0,
+        'slow_query_ms': getattr(settings, "API_SLOW_QUERY_MS", api_metrics.SLOW_QUERY_MS_DEFAULT)
+    }
+    token = api_metrics.current_metrics.set(metrics)
+    try:
+        with api_metrics.track_queries():
+            yield metrics
+    finally:
+        api_metrics.current_metrics.reset(token)
+
+
+def run_benchmarks(user, repeat=10, only=None):
+    """
+    Return results of benchmarks: latency and amount of queries of each v_api function.
+    Every case is run once for warming up and then "repeat" times.
+
+    :param user: Benchmark's user.
+    :type user: Model.object[User]
+    :param repeat: Amount of measured runs.
+    :type repeat: [int]
+    :param only: Substring of case's name for filtering cases or None.
+    :type only: [str] or None
+    :return: List of results.
+    :rtype: list[dict]
+
+    """
+    results = []
+    for name, method, func, params, session in get_benchmark_cases(user):
+        if only and only not in name:
+            continue
+        read_response(func(make_request(user, method, params, session), user, session['team']))
+        timings = []
+        queries = 0
+        status = None
+        for _ in range(repeat):
+            request = make_request(user, method, params, session)
+            with count_queries() as ctx:
+                start = time.perf_counter()
+                response = func(request, user, session['team'])
+                content = read_response(response)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = ctx['queries']
+            status = response.status_code
+        timings.sort()
+        results.append({
+            'name': name,
+            'status': status,
+            'queries': queries,
+            'size': len(content),
+            'avg_ms': statistics.mean(timings),
+            'p50_ms': timings[len(timings) // 2],
+            'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        })
+    return results
+
+
+def make_import_file(players, file_format, seed=1):
+    """
+    Return content of players' import file with deterministic rows: names and card's fields.
+
+    :param players: Amount of rows.
+    :type players: [int]
+    :param file_format: Format of file: "csv" or "jsonl".
+    :type file_format: [str]
+    :param seed: Seed of random generator.
+    :type seed: [int]
+    :return: File's content.
+    :rtype: [bytes]
+
+    """
+    rnd = random.Random(seed)
+    rows = (
+        {
+            'surname': rnd.choice(SURNAMES), 'name': rnd.choice(NAMES), 'growth': rnd.randint(150, 200),
+            'weight': rnd.randint(45, 95), 'game_num': rnd.randint(1, 99),
+            'birthsday': (date(2000, 1, 1) + timedelta(days=rnd.randint(0, 4000))).strftime("%d/%m/%Y"),
+        } for _ in range(players)
+    )
+    if file_format == "csv":
+        lines = ["surname,name,growth,weight,game_num,birthsday"]
+        lines += [f"{row['surname']},{row['name']},{row['growth']},{row['weight']},{row['game_num']},{row['birthsday']}" for row in rows]
+    else:
+        lines = [json.dumps(row) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def measure_call(func, trace_memory=False):
+    """
+    Return result of function, its time in milliseconds and peak of Python's memory allocations in KB.
+    Memory is traced only if trace_memory is True, because tracing slows calls down.
+
+    :param func: Function without arguments.
+    :type func: [function]
+    :param trace_memory: Trace memory's allocations.
+    :type trace_memory: [bool]
+    :return: Result, time and peak memory or None.
+    :rtype: tuple[object, float, float or None]
+
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        res = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return res, elapsed, peak
+
+
+def run_import_export_benchmark(user, players=IMPORT_PLAYERS_DEFAULT, formats=None):
+    """
+    Return results of players' import and export for each format: time and peak memory of both actions.
+    Players are imported into new team and exported from it, all changes are rolled back at the end.
+    Each action is run twice: without tracing for time and with tracemalloc for peak memory.
+
+    :param user: Benchmark's user.
+    :type user: Model.object[User]
+    :param players: Amount of imported and exported players.
+    :type players: [int]
+    :param formats: Formats of file, by default all formats of players.v_api.IMPORT_EXPORT_FORMATS.
+    :type formats: list[str] or None
+    :return: List of results.
+    :rtype: list[dict]
+
+    """
+    def import_players(content, file_format, team):
+        c_file = SimpleUploadedFile(f"players.{file_format}", content)
+        request = make_request(user, "POST", {'format': file_format, 'fileImport': c_file}, {'team': team.id})
+        return players_v_api.POST_import_players(request, user, team.id)
+
+    def export_players(file_format, team):
+        request = make_request(user, "GET", {'format': file_format}, {'team': team.id})
+        response = players_v_api.GET_export_players(request, user, team.id)
+        # file is read by chunks like client would do, so its content isn't stored.
+        size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+        return response, size
+
+    results = []
+    for file_format in formats or players_v_api.IMPORT_EXPORT_FORMATS:
+        content = make_import_file(players, file_format)
+        res = {'format': file_format, 'players': players, 'file_size': len(content)}
+        with transaction.atomic():
+            team = UserTeam.objects.create(user_id=user, name=f"Bench import team ({file_format})")
+            for trace_memory in (False, True):
+                point = transaction.savepoint()
+                response, import_ms, import_peak = measure_call(lambda: import_players(content, file_format, team), trace_memory)
+                (export_response, export_size), export_ms, export_peak = measure_call(lambda: export_players(file_format, team), trace_memory)
+                transaction.savepoint_rollback(point)
+                if trace_memory:
+                    res.update({'import_peak_kb': import_peak, 'export_peak_kb': export_peak})
+                else:
+                    res.update({
+                        'import_status': response.status_code, 'import_ms': import_ms,
+                        'export_status': export_response.status_code, 'export_ms': export_ms, 'export_size': export_size,
+                    })
+            transaction.set_rollback(True)
+        results.append(res)
+    return results
+
+
+def get_load_cases(user):
+    """
+    Return list of load test's cases: (name, sync v_api function, async v_api function, params, session).
+
+    :param user: Benchmark's user.
+    :type user: Model.object[User]
+    :return: List of cases.
+    :rtype: list[tuple]
+
+    """
+    cases = {name: (params, session) for name, method, func, params, session in get_benchmark_cases(user)}
+    pairs = [
+        ("exercises.GET_get_exs_all", exercises_v_api.GET_get_exs_all, exercises_v_api.GET_get_exs_all_async),
+        ("exercises.GET_get_exs_one", exercises_v_api.GET_get_exs_one, exercises_v_api.GET_get_exs_one_async),
+        ("players.GET_get_players_json(table)", players_v_api.GET_get_players_json, players_v_api.GET_get_players_json_async),
+        ("matches.GET_get_match", matches_v_api.GET_get_match, matches_v_api.GET_get_match_async),
+        ("matches.GET_get_match_protocol", matches_v_api.GET_get_match_protocol, matches_v_api.GET_get_match_protocol_async),
+    ]
+    return [(name, sync_func, async_func, cases[name][0], cases[name][1]) for name, sync_func, async_func in pairs]
+
+
+def run_sync_load(user, func, params, session, concurrency, total):
+    def call(_):
+        try:
+            return read_response(func(make_request(user, "GET", params, session), user, session['team']))
+        finally:
+            close_old_connections()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(total)))
+    return time.perf_counter() - start
+
+
+async def run_async_load(user, func, params, session, concurrency, total):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def call():
+        async with semaphore:
+            response = await func(make_request(user, "GET", params, session), user, session['team'])
+            return response.content
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+def run_load_test(user, concurrency=10, total=200, only=None):
+    """
+    Return results of load test, which compares throughput of sync and async variants of read v_api functions.
+    Sync variant is called by pool of threads like sync workers, async variant by coroutines in one event loop.
+    Both variants are run with the same amount of concurrent requests.
+
+    :param user: Benchmark's user.
+    :type user: Model.object[User]
+    :param concurrency: Amount of concurrent requests.
+    :type concurrency: [int]
+    :param total: Amount of requests for each variant.
+    :type total: [int]
+    :param only: Substring of case's name for filtering cases or None.
+    :type only: [str] or None
+    :return: List of results.
+    :rtype: list[dict]
+
+    """
+    results = []
+    for name, sync_func, async_func, params, session in get_load_cases(user):
+        if only and only not in name:
+            continue
+        sync_time = run_sync_load(user, sync_func, params, session, concurrency, total)
+        async_time = asyncio.run(run_async_load(user, async_func, params, session, concurrency, total))
+        results.append({
+            'name': name,
+            'sync_rps': total / sync_time,
+            'async_rps': total / async_time,
+        })
+    return results
+
+
+def get_memory_usage():
+    """
+    Return memory of the current process in KB from /proc/self/smaps_rollup (Linux only).
+    RSS counts shared pages in each process, PSS divides them between processes, which share them.
+
+    :return: Dictionary with keys "rss", "pss", "private" or None if memory can't be read.
+    :rtype: dict[str, int] or None
+
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    res = {'rss': 0, 'pss': 0, 'private': 0}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    res[fields[name]] += int(value.split()[0])
+    except (OSError, ValueError):
+        return None
+    return res
+
+
+def measure_library_worker(mode, version, barrier, queue):
+    before = get_memory_usage()
+    if mode == "mmap":
+        snapshot = nfb_library.load_snapshot(version, use_mmap=True)
+        # pages of file are read, like requests would do.
+        loaded = [snapshot, sum(len(chunk) for chunk in snapshot.iter_content())]
+    else:
+        snapshot = nfb_library.load_snapshot(version, use_mmap=False)
+        loaded = [snapshot, json.loads(bytes(snapshot.get_section("content"))), snapshot.get_refs()]
+    # all workers are alive while memory is measured, so shared pages are divided between them.
+    barrier.wait()
+    after = get_memory_usage()
+    barrier.wait()
+    if before is None or after is None:
+        queue.put(None)
+    else:
+        queue.put({key: after[key] - before[key] for key in after})
+    connections.close_all()
+
+
+def run_memory_benchmark(workers=4):
+    """
+    Return memory, which NFB library's snapshot takes in each of forked workers, for two modes:
+    "memory" - each worker builds own copy of library and references as Python objects,
+    "mmap" - workers map the same snapshot's file. Check exercises.nfb_library.
+
+    :param workers: Amount of forked workers.
+    :type workers: [int]
+    :return: Lists of workers' memory deltas in KB by mode, deltas are None if memory can't be read.
+    :rtype: dict[str, list[dict[str, int] or None]]
+
+    """
+    version = nfb_library.get_version()
+    nfb_library.load_snapshot(version, use_mmap=True)
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    results = {}
+    for mode in ("memory", "mmap"):
+        barrier = context.Barrier(workers)
+        queue = context.Queue()
+        processes = [
+            context.Process(target=measure_library_worker, args=(mode, version, barrier, queue)) for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        results[mode] = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    return results
+
+
+def parse_importtime(text):
+    """
+    Return imported modules from output of "python -X importtime".
+
+    :param text: Output (stderr) of interpreter.
+    :type text: [str]
+    :return: List of modules: name, own time and cumulative time in microseconds, depth of import.
+    :rtype: list[dict]
+
+    """
+    modules = []
+    for line in text.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            modules.append({
+                'name': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': (len(match.group(3)) - 1) // 2,
+            })
+    return modules
+
+
+def run_import_profile(target="", repeat=3, top=10):
+    """
+    Return startup's profile of module: Django is set up and module is imported in new interpreter
+    with "-X importtime". Process has to be started from project's directory with DJANGO_SETTINGS_MODULE.
+
+    :param target: Module's name or "" for django.setup() only.
+    :type target: [str]
+    :param repeat: Amount of runs, the fastest run is reported.
+    :type repeat: [int]
+    :param top: Amount of packages in report.
+    :type top: [int]
+    :return: Profile: wall time, amount of modules, import time, slowest top-level packages, imported v_api modules.
+    :rtype: dict[str]
+
+    """
+    code = "import django; django.setup()"
+    if target:
+        code += f"; import {target}"
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            env=os.environ.copy(), cwd=os.getcwd(), capture_output=True, text=True
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            errors = proc.stderr.strip().splitlines()
+            raise RuntimeError(errors[-1] if len(errors) > 0 else f"Can't import {target}")
+        if best is None or wall_ms < best[0]:
+            best = (wall_ms, proc.stderr)
+    modules = parse_importtime(best[1])
+    packages = {}
+    for module in modules:
+        package = module['name'].split(".")[0]
+        packages[package] = packages.get(package, 0) + module['self_us']
+    return {
+        'target': target or "django.setup()",
+        'wall_ms': best[0],
+        'modules': len(modules),
+        'import_ms': sum(module['self_us'] for module in modules) / 1000,
+        'packages': sorted(((name, value / 1000) for name, value in packages.items()), key=lambda x: -x[1])[:top],
+        'v_api': sorted(module['name'] for module in modules if module['name'].endswith(".v_api")),
+    }
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, close_old_connections
+from api.middleware import get_cur_user, get_cur_team
+from api.queries import get_one_or_none
+from api.metrics import track_queries
+
+
+PARALLEL_WORKERS_DEFAULT = 8
+_executor = None
+_executor_lock = threading.Lock()
+
+
+
+def call_and_close(func, *args, **kwargs):
+    """
+    Call function and release database's connection of the current thread if it is old.
+    Worker threads of run_sync() open own connections, which aren't closed by request_finished signal.
+    Queries are counted into metrics of the current request. Check MetricsMiddleware.
+
+    :param func: Any synchronous function.
+    :type func: [callable]
+    :return: Result of function.
+    :rtype: any
+
+    """
+    try:
+        with track_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Run synchronous function (ORM queries) in worker thread. Functions are not bound to the main thread,
+    so several calls inside asyncio.gather() send their queries concurrently by different connections.
+    Functions mustn't change shared state of request without care.
+
+    :param func: Any synchronous function.
+    :type func: [callable]
+    :return: Result of function.
+    :rtype: any
+
+    """
+    return await sync_to_async(call_and_close, thread_sensitive=False)(func, *args, **kwargs)
+
+
+async def get_first(queryset):
+    """
+    Return first object of queryset or None. Check get_one_or_none().
+
+    :param queryset: Any queryset or None.
+    :type queryset: [QuerySet] or None
+    :return: Object or None.
+    :rtype: Model.object or None
+
+    """
+    if queryset is None:
+        return None
+    return await run_sync(get_one_or_none, queryset)
+
+
+async def get_list(queryset):
+    """
+    Return list of queryset's objects or empty list if queryset is None.
+
+    :param queryset: Any queryset or None.
+    :type queryset: [QuerySet] or None
+    :return: List of objects.
+    :rtype: list[Model.object] or list[dict]
+
+    """
+    if queryset is None:
+        return []
+    return await run_sync(list, queryset)
+
+
+async def gather(*coros):
+    """
+    Await coroutines concurrently and return their results in the same order.
+
+    :return: List of results.
+    :rtype: list
+
+    """
+    return await asyncio.gather(*coros)
+
+
+def get_executor():
+    """
+    Return shared pool of threads for run_parallel(). Size is set by settings.API_PARALLEL_WORKERS.
+    Threads keep their connections between calls if settings.CONN_MAX_AGE allows it.
+
+    :return: Pool of threads.
+    :rtype: [ThreadPoolExecutor]
+
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "API_PARALLEL_WORKERS", PARALLEL_WORKERS_DEFAULT),
+                    thread_name_prefix="api-loader"
+                )
+    return _executor
+
+
+def run_parallel(*loaders):
+    """
+    Call independent loaders (functions without arguments, which usually evaluate querysets) concurrently
+    in shared pool of threads and return their results in the same order. Latency is bounded by the slowest loader.
+    Loaders are called one by one if settings.API_PARALLEL_LOADERS is False or if transaction is opened,
+    because other connections wouldn't see its uncommitted data.
+
+    :return: List of results.
+    :rtype: list
+
+    """
+    if len(loaders) < 2 or not getattr(settings, "API_PARALLEL_LOADERS", True) or connection.in_atomic_block:
+        return [loader() for loader in loaders]
+    executor = get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, call_and_close, loader) for loader in loaders]
+    return [future.result() for future in futures]
+
+
+def get_request_context_sync(request):
+    return {
+        'is_authenticated': request.user.is_authenticated,
+        'cur_user': get_cur_user(request),
+        'cur_team': get_cur_team(request),
+    }
+
+
+async def get_request_context(request):
+    """
+    Return authentication's flag, the current user and the current team for async views.
+    Lazy request.user and session are loaded in the main thread, because they are bound to request.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Dictionary with keys "is_authenticated", "cur_user", "cur_team".
+    :rtype: dict[str]
+
+    """
+    return await sync_to_async(get_request_context_sync)(request)
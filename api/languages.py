@@ -0,0 +1,99 @@
+from django.conf import settings
+
+
+LANG_CODE_DEFAULT = "en"
+LANGUAGE_CODES_DEFAULT = ["en", "ru"]
+TRIM_PARAM = "lang_only"
+
+
+
+def get_language_codes():
+    """
+    Return codes of languages, which are stored in multilingual JSON fields. Set by settings.API_LANGUAGE_CODES.
+    Only dictionaries with these keys are resolved by trim_languages().
+
+    :return: Languages' codes.
+    :rtype: list[str]
+
+    """
+    return getattr(settings, "API_LANGUAGE_CODES", LANGUAGE_CODES_DEFAULT)
+
+
+def get_trim_language(request):
+    """
+    Return language's code for trimmed payload or None if client didn't ask for it.
+    Trimmed payload is requested by parameter "lang_only=1".
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: The current language's code or None.
+    :rtype: [str] or None
+
+    """
+    params = request.POST if request.method == "POST" else request.GET
+    if params.get(TRIM_PARAM) == "1":
+        return request.LANGUAGE_CODE
+    return None
+
+
+def is_language_dict(value, lang_codes):
+    return isinstance(value, dict) and len(value) > 0 and all(key in lang_codes for key in value)
+
+
+def trim_languages(data, lang_code, drop_keys=(), lang_codes=None):
+    """
+    Return copy of data where each multilingual dictionary ("code_1": "value_1",...) is replaced by value
+    for language's code with fallback to LANG_CODE_DEFAULT. Keys from drop_keys are removed from all dictionaries.
+    If lang_code is None then data is returned without changes.
+
+    :param data: Any JSON compatible object.
+    :type data: [object]
+    :param lang_code: Language's code. Check get_trim_language().
+    :type lang_code: [str] or None
+    :param drop_keys: Keys, which aren't needed in trimmed payload, for example: sorting keys.
+    :type drop_keys: list[str]
+    :param lang_codes: Codes of languages or None for get_language_codes().
+    :type lang_codes: list[str] or None
+    :return: Trimmed data.
+    :rtype: [object]
+
+    """
+    if lang_code is None:
+        return data
+    if lang_codes is None:
+        lang_codes = get_language_codes()
+    if is_language_dict(data, lang_codes):
+        value = data.get(lang_code)
+        if value is None or value == "":
+            value = data.get(LANG_CODE_DEFAULT, "")
+        return value
+    if isinstance(data, dict):
+        return {
+            key: trim_languages(value, lang_code, drop_keys, lang_codes)
+            for key, value in data.items() if key not in drop_keys
+        }
+    if isinstance(data, (list, tuple)):
+        return [trim_languages(value, lang_code, drop_keys, lang_codes) for value in data]
+    return data
+
+
+def iter_trimmed(data, lang_code, drop_keys=()):
+    """
+    Return generator of trimmed elements for StreamingJsonResponse. Check trim_languages().
+
+    :param data: Iterable with elements.
+    :type data: [iterable]
+    :param lang_code: Language's code or None.
+    :type lang_code: [str] or None
+    :param drop_keys: Keys, which aren't needed in trimmed payload.
+    :type drop_keys: list[str]
+    :return: Generator of elements.
+    :rtype: generator[object]
+
+    """
+    if lang_code is None:
+        yield from data
+        return
+    lang_codes = get_language_codes()
+    for elem in data:
+        yield trim_languages(elem, lang_code, drop_keys, lang_codes)
@@ -0,0 +1,26 @@
+import importlib
+
+
+
+class LazyModule:
+    """
+    Module, which is imported on the first access to its attribute. It is used for cross-app v_api modules,
+    so processes that never call another app (management commands, workers of other subsystems)
+    don't import it and its dependencies at startup. Usage: exercises_v_api = LazyModule("exercises.v_api").
+
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput of sync and async read v_api functions on benchmark data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=10, help='Amount of concurrent requests.')
+        parser.add_argument('--total', type=int, default=200, help='Amount of requests for each variant.')
+        parser.add_argument('--only', type=str, default=None, help='Run only cases which names contain this text.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=benchmark.BENCH_USER_EMAIL).first()
+        if user is None:
+            raise CommandError('Benchmark data not found. Run "generate_bench_data" first.')
+        results = benchmark.run_load_test(user, max(1, options['concurrency']), max(1, options['total']), options['only'])
+        self.stdout.write(f"{'case':<40} {'sync rps':>10} {'async rps':>10}")
+        for res in results:
+            self.stdout.write(f"{res['name']:<40} {res['sync_rps']:>10.1f} {res['async_rps']:>10.1f}")
+        self.stdout.write(self.style.SUCCESS(f'Load test finished: {len(results)} cases.'))
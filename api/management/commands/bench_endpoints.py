@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = 'Run v_api functions on benchmark data and report latency and amount of queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10, help='Amount of measured runs of each function.')
+        parser.add_argument('--only', type=str, default=None, help='Run only cases which names contain this text.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=benchmark.BENCH_USER_EMAIL).first()
+        if user is None:
+            raise CommandError('Benchmark data not found. Run "generate_bench_data" first.')
+        results = benchmark.run_benchmarks(user, max(1, options['repeat']), options['only'])
+        self.stdout.write(f"{'case':<40} {'status':>6} {'queries':>7} {'size':>9} {'avg ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for res in results:
+            self.stdout.write(
+                f"{res['name']:<40} {res['status']:>6} {res['queries']:>7} {res['size']:>9} "
+                f"{res['avg_ms']:>9.2f} {res['p50_ms']:>9.2f} {res['p95_ms']:>9.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Benchmark finished: {len(results)} cases.'))
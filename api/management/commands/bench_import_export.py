@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+import players.v_api as players_v_api
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = "Import and export players' file and report time and peak memory. Imported players are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=benchmark.IMPORT_PLAYERS_DEFAULT, help='Amount of imported and exported players.')
+        parser.add_argument('--format', type=str, default=None, choices=players_v_api.IMPORT_EXPORT_FORMATS, help='Format of file, by default all formats.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=benchmark.BENCH_USER_EMAIL).first()
+        if user is None:
+            raise CommandError('Benchmark data not found. Run "generate_bench_data" first.')
+        formats = [options['format']] if options['format'] else None
+        results = benchmark.run_import_export_benchmark(user, max(1, options['players']), formats)
+        self.stdout.write(
+            f"{'format':<7} {'players':>8} {'file KB':>9} {'import ms':>10} {'import peak KB':>15} "
+            f"{'export ms':>10} {'export peak KB':>15} {'status':>8}"
+        )
+        for res in results:
+            self.stdout.write(
+                f"{res['format']:<7} {res['players']:>8} {res['file_size'] / 1024:>9.0f} {res['import_ms']:>10.1f} "
+                f"{res['import_peak_kb']:>15.0f} {res['export_ms']:>10.1f} {res['export_peak_kb']:>15.0f} "
+                f"{res['import_status']:>4}/{res['export_status']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Import/export benchmark finished: {len(results)} formats.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = 'Compare memory per worker of in-memory and memory-mapped NFB library snapshots.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Amount of forked workers.')
+
+    def handle(self, *args, **options):
+        results = benchmark.run_memory_benchmark(max(1, options['workers']))
+        self.stdout.write(f"{'mode':<10} {'rss KB':>10} {'pss KB':>10} {'private KB':>12}")
+        for mode, rows in results.items():
+            rows = [row for row in rows if row is not None]
+            if len(rows) == 0:
+                raise CommandError('Memory of workers can not be read (/proc/self/smaps_rollup is required).')
+            avg = {key: sum(row[key] for row in rows) / len(rows) for key in rows[0]}
+            self.stdout.write(f"{mode:<10} {avg['rss']:>10.0f} {avg['pss']:>10.0f} {avg['private']:>12.0f}")
+        self.stdout.write(self.style.SUCCESS('Memory benchmark finished: values are averages per worker.'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = 'Profile startup: time of django.setup() and of importing views in new interpreters with "-X importtime".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', nargs='*', default=benchmark.STARTUP_TARGETS, help='Modules to import after django.setup().')
+        parser.add_argument('--repeat', type=int, default=3, help='Amount of runs for each target, the fastest is reported.')
+        parser.add_argument('--top', type=int, default=5, help='Amount of the slowest packages in report.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'target':<20} {'wall ms':>9} {'import ms':>10} {'modules':>8}  v_api modules")
+        for target in options['targets']:
+            try:
+                res = benchmark.run_import_profile(target, max(1, options['repeat']), max(1, options['top']))
+            except RuntimeError as e:
+                raise CommandError(f"Can't profile {target}: {e}")
+            self.stdout.write(
+                f"{res['target']:<20} {res['wall_ms']:>9.1f} {res['import_ms']:>10.1f} {res['modules']:>8}  {', '.join(res['v_api']) or '-'}"
+            )
+            self.stdout.write("    " + ", ".join(f"{name} {value:.1f} ms" for name, value in res['packages']))
+        self.stdout.write(self.style.SUCCESS(f"Startup profile finished: {len(options['targets'])} targets."))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import api.benchmark as benchmark
+
+
+
+class Command(BaseCommand):
+    help = 'Create deterministic synthetic data for benchmarks. Previous benchmark data is replaced.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='Seed of random generator.')
+        parser.add_argument('--teams', type=int, default=2, help='Amount of teams.')
+        parser.add_argument('--players', type=int, default=1000, help='Amount of players in each team.')
+        parser.add_argument('--characteristics', type=int, default=10, help='Amount of characteristics rows.')
+        parser.add_argument('--folders', type=int, default=5, help='Amount of root folders.')
+        parser.add_argument('--exercises', type=int, default=2000, help='Amount of user and NFB exercises.')
+        parser.add_argument('--matches', type=int, default=40, help='Amount of matches in each team.')
+        parser.add_argument('--links', type=int, default=0, help='Amount of additional shared links, for example: 1000000.')
+        parser.add_argument('--force', action='store_true', help='Run without DEBUG, data of benchmark is replaced anyway.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Benchmark data is created only with DEBUG = True, use --force to run anyway.')
+        user = benchmark.generate_data(
+            seed=options['seed'], teams=options['teams'], players=options['players'],
+            characteristics=options['characteristics'], folders=options['folders'],
+            exercises=options['exercises'], matches=options['matches'], links=options['links'], stdout=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(f'Benchmark data created for user: {user.email}.'))
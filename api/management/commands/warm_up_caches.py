@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+import api.warmup as warmup
+
+
+
+class Command(BaseCommand):
+    help = 'Preload NFB library snapshot and references, show what was loaded and how long it took. ' \
+        'Caches of this process are dropped after exit, but shared data (snapshot file, version in cache) stays ready for workers.'
+
+    def handle(self, *args, **options):
+        report = warmup.warm_up()
+        for line in warmup.format_report(report):
+            self.stdout.write(line)
+        failed = [row['name'] for row in report if not row['success']]
+        if len(failed) > 0:
+            self.stdout.write(self.style.ERROR(f"Warm-up failed: {', '.join(failed)}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Warm-up finished: {len(report)} steps.'))
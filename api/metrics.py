@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+SLOW_REQUEST_MS_DEFAULT = 1000
+SLOW_QUERY_MS_DEFAULT = 200
+MAX_ACTIONS = 500
+ACTION_PARAM_RE = re.compile(r'^(get|edit|add|delete|copy|move|count|import|export|change|nfb)(_|$)')
+
+current_metrics = ContextVar("current_metrics", default=None)
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+
+def get_request_action(request):
+    """
+    Return name of action for request. Dispatchers (matches_api, players_api, ...) get action as parameter
+    with value "1", for example: "get_match_protocol=1". For other views name of url is returned.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Action's name, for example: "matches_api.get_match_protocol".
+    :rtype: [str]
+
+    """
+    view_name = "unknown"
+    if request.resolver_match:
+        view_name = request.resolver_match.url_name or request.resolver_match.func.__name__
+    params = request.POST if request.method == "POST" else request.GET
+    for key in params:
+        if params.get(key) == "1" and ACTION_PARAM_RE.match(key):
+            return f"{view_name}.{key}"
+    return view_name
+
+
+def add_serialization_time(seconds):
+    """
+    Add time of JSON serialization to metrics of current request. Check ApiJsonResponse.
+
+    :param seconds: Serialization's time.
+    :type seconds: [float]
+
+    """
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics['serialization_time'] += seconds
+
+
+def observe(action, metrics):
+    """
+    Save request's metrics to histogram of action.
+
+    :param action: Action's name. Check get_request_action().
+    :type action: [str]
+    :param metrics: Request's metrics.
+    :type metrics: dict[str]
+
+    """
+    total_ms = metrics['total_time'] * 1000
+    bucket_ind = bisect_left(LATENCY_BUCKETS_MS, total_ms)
+    with _histograms_lock:
+        if action not in _histograms and len(_histograms) >= MAX_ACTIONS:
+            action = "other"
+        hist = _histograms.get(action)
+        if hist is None:
+            hist = {
+                'count': 0,
+                'total_ms': 0,
+                'db_ms': 0,
+                'serialization_ms': 0,
+                'queries': 0,
+                'max_ms': 0,
+                'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+            _histograms[action] = hist
+        hist['count'] += 1
+        hist['total_ms'] += total_ms
+        hist['db_ms'] += metrics['db_time'] * 1000
+        hist['serialization_ms'] += metrics['serialization_time'] * 1000
+        hist['queries'] += metrics['queries']
+        hist['max_ms'] = max(hist['max_ms'], total_ms)
+        hist['buckets'][bucket_ind] += 1
+
+
+def get_histograms():
+    """
+    Return histograms of all actions with averages. Last bucket counts requests longer than the biggest bound.
+
+    :return: Dictionary with bounds of buckets and actions' histograms.
+    :rtype: dict['buckets_ms': list[int], 'actions': dict[str, obj]]
+
+    """
+    res = {'buckets_ms': LATENCY_BUCKETS_MS, 'actions': {}}
+    with _histograms_lock:
+        for action, hist in _histograms.items():
+            count = hist['count']
+            res['actions'][action] = {
+                'count': count,
+                'avg_ms': round(hist['total_ms'] / count, 2),
+                'avg_db_ms': round(hist['db_ms'] / count, 2),
+                'avg_serialization_ms': round(hist['serialization_ms'] / count, 2),
+                'avg_queries': round(hist['queries'] / count, 2),
+                'max_ms': round(hist['max_ms'], 2),
+                'buckets': list(hist['buckets']),
+            }
+    return res
+
+
+def reset_histograms():
+    """
+    Remove all collected histograms.
+
+    """
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class QueryTimer:
+    """
+    Database's execute wrapper, which counts queries and their time. Slow queries are written to log.
+
+    """
+    def __init__(self, metrics, slow_query_ms):
+        self.metrics = metrics
+        self.slow_query_ms = slow_query_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.metrics['queries'] += 1
+            self.metrics['db_time'] += duration
+            if duration * 1000 >= self.slow_query_ms:
+                logger.warning("Slow query (%.1f ms): %s", duration * 1000, sql)
+
+
+def track_queries():
+    """
+    Return context manager, which counts queries of the current thread into metrics of the current request.
+    Async views send queries from worker threads, where wrapper of MetricsMiddleware isn't installed.
+
+    :return: Execute wrapper or empty context manager if metrics aren't collected.
+    :rtype: [ContextManager]
+
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return nullcontext()
+    return connection.execute_wrapper(QueryTimer(metrics, metrics['slow_query_ms']))
+
+
+class MetricsMiddleware:
+    """
+    Record amount of queries, database's time, serialization's time and total latency of each request
+    and save them to histogram of request's action. Slow requests are written to log.
+    Thresholds are set by settings.API_SLOW_REQUEST_MS and settings.API_SLOW_QUERY_MS.
+    Queries and time of streaming response (StreamingJsonResponse) are counted while its content is sent,
+    metrics are saved to histogram after the last chunk. Headers are sent before content, so headers
+    "X-Query-Count" and "Server-Timing" of streaming response contain only preparing of response.
+    Middleware supports async views, their queries are counted by api.concurrency.run_sync().
+
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, "API_SLOW_REQUEST_MS", SLOW_REQUEST_MS_DEFAULT)
+        self.slow_query_ms = getattr(settings, "API_SLOW_QUERY_MS", SLOW_QUERY_MS_DEFAULT)
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = self.start_metrics()
+        token = current_metrics.set(metrics)
+        try:
+            with connection.execute_wrapper(QueryTimer(metrics, self.slow_query_ms)):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish_metrics(request, response, metrics)
+
+    def track_streaming(self, request, content, metrics):
+        """
+        Return iterator of streaming content, which counts queries and serialization of each chunk
+        into request's metrics. Metrics are saved when content is sent or closed by disconnected client.
+
+        """
+        iterator = iter(content)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    with connection.execute_wrapper(QueryTimer(metrics, self.slow_query_ms)):
+                        chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    current_metrics.reset(token)
+                yield chunk
+        finally:
+            self.record_metrics(request, metrics)
+
+    async def __acall__(self, request):
+        metrics = self.start_metrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish_metrics(request, response, metrics)
+
+    def start_metrics(self):
+        return {
+            'queries': 0, 'db_time': 0.0, 'serialization_time': 0.0, 'total_time': 0.0,
+            'start': time.perf_counter(), 'slow_query_ms': self.slow_query_ms
+        }
+
+    def record_metrics(self, request, metrics):
+        metrics['total_time'] = time.perf_counter() - metrics['start']
+        action = get_request_action(request)
+        observe(action, metrics)
+        if metrics['total_time'] * 1000 >= self.slow_request_ms:
+            logger.warning(
+                "Slow request %s (%.1f ms): queries=%d, db=%.1f ms, serialization=%.1f ms",
+                action, metrics['total_time'] * 1000, metrics['queries'],
+                metrics['db_time'] * 1000, metrics['serialization_time'] * 1000
+            )
+
+    def finish_metrics(self, request, response, metrics):
+        if getattr(response, "streaming", False):
+            metrics['total_time'] = time.perf_counter() - metrics['start']
+            response.streaming_content = self.track_streaming(request, response.streaming_content, metrics)
+        else:
+            self.record_metrics(request, metrics)
+        response['Server-Timing'] = (
+            f"db;dur={metrics['db_time'] * 1000:.1f}, "
+            f"ser;dur={metrics['serialization_time'] * 1000:.1f}, "
+            f"total;dur={metrics['total_time'] * 1000:.1f}"
+        )
+        response['X-Query-Count'] = str(metrics['queries'])
+        return response
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from users.models import User
+from api.permissions import get_access_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+
+def get_cur_user(request):
+    """
+    Return the current user of the system or None if user isn't authorized.
+    User is resolved once per request and memoized on request, so views and v_api functions
+    don't repeat User's lookups. Check CurrentUserMiddleware.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: The current user of the system, who is currently authorized.
+    :rtype: Model.object[User] or None
+
+    """
+    if not hasattr(request, "_cached_cur_user"):
+        cur_user = None
+        if request.user.is_authenticated:
+            if isinstance(request.user, User):
+                cur_user = request.user
+            else:
+                cur_user = User.objects.filter(email=request.user).first()
+        request._cached_cur_user = cur_user
+    return request._cached_cur_user
+
+
+def get_session_int(request, key, def_value=-1):
+    """
+    Return session's value as integer or def_value if value not found or not correct.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param key: Session's key, for example: "team", "season".
+    :type key: [str]
+    :param def_value: Default value.
+    :type def_value: [int]
+    :return: Session's value.
+    :rtype: [int]
+
+    """
+    res = def_value
+    try:
+        res = int(request.session[key])
+    except:
+        pass
+    return res
+
+
+def get_cur_team(request):
+    """
+    Return the current team, that is selected by the user, or -1.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Team's ID.
+    :rtype: [int]
+
+    """
+    return get_session_int(request, "team")
+
+
+def get_cur_season(request):
+    """
+    Return the current season, that is selected by the user, or -1.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Season's ID.
+    :rtype: [int]
+
+    """
+    return get_session_int(request, "season")
+
+
+class CurrentUserMiddleware:
+    """
+    Resolve the current user, team and season once per request and save them at request:
+    request.cur_user, request.cur_team, request.cur_season.
+    Middleware has to be placed after AuthenticationMiddleware and SessionMiddleware.
+    After response amount of permissions' checks is written to log and in DEBUG mode to header "X-Access-Checks".
+    Middleware supports async views, then user and session are loaded by sync_to_async.
+
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        self.process_request(request)
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        await sync_to_async(self.process_request)(request)
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_request(self, request):
+        request.cur_user = get_cur_user(request)
+        request.cur_team = get_cur_team(request)
+        request.cur_season = get_cur_season(request)
+
+    def process_response(self, request, response):
+        access_stats = get_access_stats(request.cur_user)
+        if access_stats is not None:
+            logger.debug(
+                "Access checks at %s: calls=%d, computed=%d",
+                request.path, access_stats['calls'], access_stats['computed']
+            )
+            if settings.DEBUG:
+                response['X-Access-Checks'] = f"{access_stats['calls']};computed={access_stats['computed']}"
+        return response
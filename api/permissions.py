@@ -0,0 +1,178 @@
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from users.models import User
+from clubs.models import Club
+from nanofootball.views import util_check_access as util_check_access_origin
+
+
+
+ACCESS_KEY_PREFIX = "access_snapshot"
+ACCESS_VERSION_KEY_PREFIX = "access_version"
+ACCESS_CACHE_TIMEOUT_DEFAULT = 5 * 60
+
+
+def get_access_version_key(user_id=None, club_id=None):
+    if club_id is not None:
+        return f"{ACCESS_VERSION_KEY_PREFIX}:club:{club_id}"
+    if user_id is not None:
+        return f"{ACCESS_VERSION_KEY_PREFIX}:{user_id}"
+    return ACCESS_VERSION_KEY_PREFIX
+
+
+def get_access_version(user_id=None, club_id=None):
+    """
+    Return version of access rules. Common version is changed when any group's permissions are changed,
+    user's version is changed when user's groups, permissions or user's object are changed,
+    club's version is changed when club's object is changed.
+
+    :param user_id: User's ID or None for common version.
+    :type user_id: [int] or None
+    :param club_id: Club's ID or None.
+    :type club_id: [int] or None
+    :return: Version.
+    :rtype: [int]
+
+    """
+    return cache.get(get_access_version_key(user_id, club_id), 0)
+
+
+def bump_access_version(user_id=None, club_id=None):
+    """
+    Change version of access rules, all cached permissions' snapshots of user, of club's members
+    (or of all users) become invalid.
+
+    :param user_id: User's ID or None for common version.
+    :type user_id: [int] or None
+    :param club_id: Club's ID or None.
+    :type club_id: [int] or None
+
+    """
+    key = get_access_version_key(user_id, club_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_access_cache_key(user):
+    """
+    Return cache key of user's permissions' snapshot. Key contains user's club and versions,
+    so changed rules give new key.
+
+    :param user: The current user of the system, who is currently authorized.
+    :type user: Model.object[User]
+    :return: Cache key.
+    :rtype: [str]
+
+    """
+    key = f"{ACCESS_KEY_PREFIX}:{user.pk}:{get_access_version()}:{get_access_version(user.pk)}"
+    # user.club_id is club's object, its ID is used like in on_club_saved().
+    club_pk = user.club_id_id
+    if club_pk is not None:
+        key += f":{club_pk}:{get_access_version(club_id=club_pk)}"
+    return key
+
+
+def get_access_snapshot(user):
+    """
+    Return user's permissions' snapshot. Snapshot is created once per request and saved at user's object,
+    results of checks are taken from cache, so they are shared between requests while access rules aren't changed.
+    Snapshot contains "checks" (result of each check), "calls" (amount of checks at request)
+    and "computed" (amount of checks which were calculated by util_check_access).
+
+    :param user: The current user of the system, who is currently authorized.
+    :type user: Model.object[User]
+    :return: Permissions' snapshot.
+    :rtype: dict[str]
+
+    """
+    snapshot = getattr(user, "_access_snapshot", None)
+    if snapshot is None:
+        cache_key = get_access_cache_key(user)
+        snapshot = {
+            'cache_key': cache_key,
+            'checks': cache.get(cache_key, {}),
+            'calls': 0,
+            'computed': 0,
+        }
+        user._access_snapshot = snapshot
+    return snapshot
+
+
+def util_check_access(user, perms):
+    """
+    Return True if user has access. Analogue of nanofootball.views.util_check_access with cached results.
+    Results are cached for settings.API_ACCESS_CACHE_TIMEOUT seconds, so rules which depend on time
+    (for example: club's subscription) are checked again after timeout. Only saved User's objects are cached.
+
+    :param user: The current user of the system, who is currently authorized.
+    :type user: Model.object[User]
+    :param perms: Lists of permissions: {'perms_user': [...], 'perms_club': [...]}.
+    :type perms: dict[str, list[str]]
+    :return: Access status.
+    :rtype: [bool]
+
+    """
+    if not isinstance(user, User) or user.pk is None:
+        return util_check_access_origin(user, perms)
+    snapshot = get_access_snapshot(user)
+    snapshot['calls'] += 1
+    check_key = json.dumps(perms, sort_keys=True)
+    if check_key not in snapshot['checks']:
+        snapshot['checks'][check_key] = util_check_access_origin(user, perms)
+        snapshot['computed'] += 1
+        cache.set(snapshot['cache_key'], snapshot['checks'], getattr(settings, "API_ACCESS_CACHE_TIMEOUT", ACCESS_CACHE_TIMEOUT_DEFAULT))
+    return snapshot['checks'][check_key]
+
+
+def get_access_stats(user):
+    """
+    Return amount of permissions' checks at current request or None if there weren't any checks.
+
+    :param user: The current user of the system, who is currently authorized.
+    :type user: Model.object[User] or None
+    :return: Amount of all checks and amount of calculated checks.
+    :rtype: dict['calls': [int], 'computed': [int]] or None
+
+    """
+    snapshot = getattr(user, "_access_snapshot", None)
+    if snapshot is None:
+        return None
+    return {'calls': snapshot['calls'], 'computed': snapshot['computed']}
+
+
+
+@receiver(post_save, sender=User)
+def on_user_saved(sender, instance, **kwargs):
+    bump_access_version(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def on_user_perms_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        bump_access_version(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            bump_access_version(user_id)
+    else:
+        bump_access_version()
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def on_club_saved(sender, instance, **kwargs):
+    bump_access_version(club_id=instance.pk)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def on_group_perms_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_access_version()
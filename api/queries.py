@@ -0,0 +1,62 @@
+from django.db.models.fields.files import FieldFile
+
+
+
+def get_one_or_none(queryset):
+    """
+    Return first object of queryset or None. Object is fetched by one query, so it replaces
+    the checking "qs.exists() and qs[0].id != None" where each access to qs[0] sends new query.
+
+    :param queryset: Any queryset or None.
+    :type queryset: [QuerySet] or None
+    :return: Object or None.
+    :rtype: Model.object or None
+
+    """
+    if queryset is None:
+        return None
+    return queryset.first()
+
+
+def get_scoped_one(request, user_model, club_model, user_filters=None, club_filters=None, **filters):
+    """
+    Return one object of club's model if the current user is club's member else one object of user's model.
+    Common filters are used for both models, user_filters and club_filters limit object by user or by club.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param user_model: Model for users without club, for example: UserMatch.
+    :type user_model: [Model]
+    :param club_model: Model for club's members, for example: ClubMatch.
+    :type club_model: [Model]
+    :param user_filters: Additional filters for user's model, for example: {'user': cur_user}.
+    :type user_filters: dict[str] or None
+    :param club_filters: Additional filters for club's model, for example: {'club': request.user.club_id}.
+    :type club_filters: dict[str] or None
+    :return: Object or None.
+    :rtype: Model.object or None
+
+    """
+    if request.user.club_id is not None:
+        return get_one_or_none(club_model.objects.filter(**filters, **(club_filters or {})))
+    return get_one_or_none(user_model.objects.filter(**filters, **(user_filters or {})))
+
+
+def get_object_values(obj):
+    """
+    Return dictionary of object's fields like queryset.values() does, but without new query.
+    Files are returned as names, foreign keys as IDs with keys "<field>_id".
+
+    :param obj: Any model's object.
+    :type obj: [Model.object]
+    :return: Dictionary of fields.
+    :rtype: dict[str]
+
+    """
+    res = {}
+    for field in obj._meta.concrete_fields:
+        value = getattr(obj, field.attname)
+        if isinstance(value, FieldFile):
+            value = value.name
+        res[field.attname] = value
+    return res
@@ -0,0 +1,123 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from references.models import PlayerTeamStatus, PlayerPlayerStatus, PlayerLevel, PlayerPosition, PlayerFoot
+from references.models import PlayerProtocolStatus
+
+
+REFS_TIMEOUT_DEFAULT = 300
+VERSION_KEY_PREFIX = "refs_cache_version"
+_tables = {}
+_tables_lock = threading.Lock()
+_connected_models = set()
+
+
+
+def get_table_key(model, filters):
+    return (model._meta.label_lower, tuple(sorted(filters.items())))
+
+
+def get_version_key(label):
+    return f"{VERSION_KEY_PREFIX}:{label}"
+
+
+def get_model_version(label):
+    """
+    Return version of model's tables. Version is kept in cache, so all workers see the same version
+    if cache is shared between them.
+
+    :param label: Model's label, for example: "references.playerlevel".
+    :type label: [str]
+    :return: Version's token.
+    :rtype: [str]
+
+    """
+    key = get_version_key(label)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def publish_version(label):
+    cache.set(get_version_key(label), uuid.uuid4().hex, None)
+
+
+def invalidate_model(sender, **kwargs):
+    """
+    Remove all cached tables of model and publish new version of model after current transaction is committed,
+    tables of other workers become outdated. It is called by signals when reference's element is changed.
+
+    """
+    label = sender._meta.label_lower
+    with _tables_lock:
+        for key in [key for key in _tables if key[0] == label]:
+            del _tables[key]
+    transaction.on_commit(lambda: publish_version(label))
+
+
+def connect_model(model):
+    """
+    Connect invalidation of model's tables to signals. Cached models are connected when module is loaded,
+    so worker, which changes element, publishes new version even if it hasn't loaded model's tables.
+
+    :param model: Reference's model.
+    :type model: [Model]
+
+    """
+    if model in _connected_models:
+        return
+    label = model._meta.label_lower
+    post_save.connect(invalidate_model, sender=model, dispatch_uid=f"refs_cache_save_{label}")
+    post_delete.connect(invalidate_model, sender=model, dispatch_uid=f"refs_cache_delete_{label}")
+    _connected_models.add(model)
+
+
+def get_ref_values(model, **filters):
+    """
+    Return elements of reference's table like model.objects.filter(**filters).values() does.
+    Table is loaded once per worker and kept for settings.API_REFS_CACHE_TIMEOUT seconds
+    or until element of model is saved or deleted by any worker (model's version in cache is changed).
+    Each call returns new copies of elements, so caller can add keys to them, for example: set_refs_translations().
+
+    :param model: Reference's model, for example: PlayerPosition.
+    :type model: [Model]
+    :return: List of elements.
+    :rtype: list[dict]
+
+    """
+    key = get_table_key(model, filters)
+    now = time.monotonic()
+    version = get_model_version(key[0])
+    table = _tables.get(key)
+    if table is None or table[1] != version or now - table[0] >= getattr(settings, "API_REFS_CACHE_TIMEOUT", REFS_TIMEOUT_DEFAULT):
+        connect_model(model)
+        # version is read before loading, so table loaded during concurrent change is reloaded by the next call.
+        table = (now, version, tuple(model.objects.filter(**filters).values()))
+        with _tables_lock:
+            _tables[key] = table
+    return [dict(elem) for elem in table[2]]
+
+
+def get_cached_tables():
+    """
+    Return amount of elements in each cached table, for warm-up's report.
+
+    :return: Amount of elements by table's key, for example: {"references.playerlevel": 5}.
+    :rtype: dict[str, int]
+
+    """
+    with _tables_lock:
+        return {
+            key[0] + "".join(f",{name}={value}" for name, value in key[1]): len(table[2])
+            for key, table in _tables.items()
+        }
+
+
+for sender in [PlayerTeamStatus, PlayerPlayerStatus, PlayerLevel, PlayerPosition, PlayerFoot, PlayerProtocolStatus]:
+    connect_model(sender)
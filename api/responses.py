@@ -0,0 +1,178 @@
+import json
+import time
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from api.metrics import add_serialization_time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+STREAM_CHUNK_SIZE = 500
+JSON_BACKEND_DEFAULT = "auto"
+_django_encoder = DjangoJSONEncoder()
+
+
+
+def _orjson_default(obj):
+    """
+    Return JSON compatible value for objects which orjson can't serialize natively.
+    Dates, Decimal and timedelta are converted by DjangoJSONEncoder, so both backends give the same output.
+    Other objects raise TypeError like in standard library's encoder.
+
+    """
+    return _django_encoder.default(obj)
+
+
+def dumps_json(data):
+    """
+    Return data as JSON using standard library's encoder with DjangoJSONEncoder.
+
+    :param data: Any JSON compatible object, dates, Decimal, timedelta.
+    :type data: [object]
+    :return: JSON.
+    :rtype: [bytes]
+
+    """
+    return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def dumps_orjson(data):
+    """
+    Return data as JSON using orjson. Keys that are not strings are converted like in standard library.
+
+    :param data: Any JSON compatible object, dates, Decimal, timedelta.
+    :type data: [object]
+    :return: JSON.
+    :rtype: [bytes]
+
+    """
+    return orjson.dumps(
+        data,
+        default=_orjson_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+
+JSON_BACKENDS = {
+    'json': dumps_json,
+}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = dumps_orjson
+
+
+def register_json_backend(name, dumps_func):
+    """
+    Register new JSON backend. Function has to take object and return bytes.
+
+    :param name: Backend's name, it can be selected by settings.API_JSON_BACKEND.
+    :type name: [str]
+    :param dumps_func: Serialization function.
+    :type dumps_func: [function]
+
+    """
+    JSON_BACKENDS[name] = dumps_func
+
+
+def get_json_backend():
+    """
+    Return serialization function selected by settings.API_JSON_BACKEND: "auto", "json", "orjson" or registered name.
+    With "auto" orjson is used if it is installed.
+
+    :return: Serialization function.
+    :rtype: [function]
+
+    """
+    backend_name = getattr(settings, "API_JSON_BACKEND", JSON_BACKEND_DEFAULT)
+    if backend_name == "auto":
+        backend_name = "orjson" if "orjson" in JSON_BACKENDS else "json"
+    if backend_name not in JSON_BACKENDS:
+        backend_name = "json"
+    return JSON_BACKENDS[backend_name]
+
+
+def iter_json_array(data, extra, dumps=None):
+    """
+    Return generator of JSON parts for object: {"data": [elem_1, elem_2, ...], "key_1": value_1, ...}.
+    Elements of data are encoded one by one and sent by chunks, so the whole list is never stored in memory.
+
+    :param data: Iterable with elements, usually generator over queryset.iterator().
+    :type data: [iterable]
+    :param extra: Additional keys of result object, for example: {"success": True}.
+    :type extra: dict[str]
+    :param dumps: Serialization function, by default get_json_backend().
+    :type dumps: [function] or None
+    :return: Generator of JSON parts.
+    :rtype: generator[bytes]
+
+    """
+    if dumps is None:
+        dumps = get_json_backend()
+    yield b'{"data": ['
+    is_first = True
+    chunk = []
+    for elem in data:
+        chunk.append(dumps(elem))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield (b"" if is_first else b", ") + b", ".join(chunk)
+            is_first = False
+            chunk = []
+    if len(chunk) > 0:
+        yield (b"" if is_first else b", ") + b", ".join(chunk)
+    tail = b"]"
+    for key, value in extra.items():
+        tail += b", " + dumps(str(key)) + b": " + dumps(value)
+    yield tail + b"}"
+
+
+class ApiJsonResponse(HttpResponse):
+    """
+    Analogue of JsonResponse for v_api functions. Data is serialized by backend from settings.API_JSON_BACKEND.
+
+    """
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        start = time.perf_counter()
+        content = get_json_backend()(data)
+        add_serialization_time(time.perf_counter() - start)
+        super().__init__(content=content, **kwargs)
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    Streaming analogue of JsonResponse for big lists. Result has the same structure that v_api functions return:
+    {"data": [...], "success": True}. Status code is sent before data, so errors must be checked before creating response.
+
+    """
+    def __init__(self, data, extra=None, **kwargs):
+        if extra is None:
+            extra = {"success": True}
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(streaming_content=iter_json_array(data, extra), **kwargs)
+
+
+def get_list_response(request, data, extra=None):
+    """
+    Return StreamingJsonResponse for big list or ApiJsonResponse if request comes through ASGI handler.
+    ASGIHandler iterates sync streaming content on the event loop, so queries of data's generator would raise
+    SynchronousOnlyOperation. Sync views are run in worker thread under ASGI, so the list is read there.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param data: Iterable with elements, usually generator over queryset.iterator().
+    :type data: [iterable]
+    :param extra: Additional keys of result object, by default: {"success": True}.
+    :type extra: dict[str] or None
+    :return: Response with {"data": [...], **extra}.
+    :rtype: [StreamingJsonResponse] or [ApiJsonResponse]
+
+    """
+    if extra is None:
+        extra = {"success": True}
+    if isinstance(request, ASGIRequest):
+        return ApiJsonResponse({"data": list(data), **extra}, status=200)
+    return StreamingJsonResponse(data, extra)
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import api.benchmark as benchmark
+
+
+# tests of cached data don't depend on project's cache backend.
+LOCMEM_CACHES = {'default': {'BACKEND': "django.core.cache.backends.locmem.LocMemCache", 'LOCATION': "tests"}}
+
+
+
+def create_test_data():
+    """
+    Return user with small set of benchmark's data: team, season, players, folders, exercises and matches.
+    User is superuser, so tests don't depend on groups' permissions. Check api.benchmark.generate_data().
+
+    :return: Test's user.
+    :rtype: Model.object[User]
+
+    """
+    user = benchmark.generate_data(seed=1, teams=1, players=3, characteristics=2, folders=1, exercises=3, matches=2)
+    user.is_superuser = True
+    user.is_staff = True
+    user.save()
+    return user
+
+
+def make_request(user, method, params, team):
+    return benchmark.make_request(user, method, params, {'team': team.id})
+
+
+def get_table_selects(queries, model):
+    """
+    Return captured SELECT queries, which read model's table. Tables loaded by select_related() are joined,
+    so they aren't counted.
+
+    :param queries: Captured queries, for example: CaptureQueriesContext.captured_queries.
+    :type queries: list[dict]
+    :param model: Any model.
+    :type model: [Model]
+    :return: SQL of queries.
+    :rtype: list[str]
+
+    """
+    table = f"FROM {connection.ops.quote_name(model._meta.db_table)}"
+    return [query['sql'] for query in queries if query['sql'].startswith("SELECT") and table in query['sql']]
+
+
+def capture_queries(func, *args):
+    """
+    Return response of v_api function and captured queries. Streaming content is read inside capturing,
+    so queries of StreamingJsonResponse's generator are captured too.
+
+    :param func: Any v_api function.
+    :type func: [callable]
+    :param args: Arguments of function, for example: request, cur_user, cur_team.
+    :type args: list
+    :return: Response and captured queries.
+    :rtype: tuple[HttpResponse, list[dict]]
+
+    """
+    with CaptureQueriesContext(connection) as ctx:
+        response = func(*args)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    return response, ctx.captured_queries
+
+
+class TableSelectsMixin:
+    """
+    Mixin of TestCase for checking, how many times table of model is read by SELECT queries.
+
+    """
+    def assertSelects(self, queries, model, count):
+        self.assertEqual(len(get_table_selects(queries, model)), count, model.__name__)
@@ -1,3 +1,188 @@
-from django.test import TestCase
+from unittest import mock
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.test import TestCase, RequestFactory
+from users.models import User
+from api.middleware import CurrentUserMiddleware, get_cur_user
+from api.queries import get_one_or_none, get_object_values
+from api.metrics import MetricsMiddleware, get_histograms, reset_histograms
+from exercises.views import exercises_api, folders_api, exercises
+from players.views import players_api, players
+from matches.views import matches_api, matches, match
+from shared.views import shared_link_api
 
-# Create your tests here.
+
+
+class RequestUser:
+    """
+    Authenticated request's user, which isn't User's object (like user from token's authentication),
+    so get_cur_user() has to find User by email.
+
+    """
+    is_authenticated = True
+    club_id = None
+
+    def __init__(self, email):
+        self.email = email
+
+    def __str__(self):
+        return self.email
+
+
+class CurrentUserQueriesTest(TestCase):
+    """
+    The current user is resolved once per request: by middleware, dispatcher and v_api functions together.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(email="api.tests@nanofootball.local")
+        cls.user.set_unusable_password()
+        cls.user.save()
+
+    def make_request(self, params):
+        request = RequestFactory().get("/api", params, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        request.user = RequestUser(self.user.email)
+        request.session = {}
+        return request
+
+    def check_dispatcher(self, dispatcher, v_api_func, params):
+        calls = []
+
+        def fake_v_api(request, cur_user, *args):
+            # helpers of v_api functions ask for the current user again.
+            calls.append((cur_user, get_cur_user(request)))
+            return JsonResponse({"success": True})
+
+        with mock.patch(v_api_func, fake_v_api):
+            with self.assertNumQueries(1):
+                response = CurrentUserMiddleware(dispatcher)(self.make_request(params))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0].pk, self.user.pk)
+        self.assertIs(calls[0][1], calls[0][0])
+
+    def check_page(self, view, views_module, v_api_results):
+        """
+        Call page's view with stubs of rendering, access's check and v_api functions,
+        so only User's lookup is left. The same user is passed to access's check and returned by get_cur_user().
+
+        """
+        calls = []
+
+        def fake_check_access(cur_user, *args, **kwargs):
+            calls.append((cur_user, get_cur_user(request)))
+            return True
+
+        request = self.make_request({})
+        request.seasons_list = []
+        request.teams_list = []
+        patches = [
+            mock.patch(f"{views_module}.util_check_access", fake_check_access),
+            mock.patch(f"{views_module}.render", lambda *args, **kwargs: HttpResponse()),
+            mock.patch(f"{views_module}.get_ui_elements", lambda req: []),
+        ] + [mock.patch(func_name, return_value=result) for func_name, result in v_api_results.items()]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        with self.assertNumQueries(1):
+            response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0].pk, self.user.pk)
+        self.assertIs(calls[0][1], calls[0][0])
+
+    def test_cur_user_is_memoized(self):
+        request = self.make_request({})
+        with self.assertNumQueries(1):
+            cur_user = get_cur_user(request)
+            self.assertIs(get_cur_user(request), cur_user)
+        self.assertEqual(cur_user.pk, self.user.pk)
+
+    def test_cur_user_from_user_object(self):
+        request = self.make_request({})
+        request.user = self.user
+        with self.assertNumQueries(0):
+            self.assertIs(get_cur_user(request), self.user)
+
+    def test_exercises_api(self):
+        self.check_dispatcher(exercises_api, "exercises.v_api.GET_get_exs_all", {'get_exs_all': 1})
+
+    def test_players_api(self):
+        self.check_dispatcher(players_api, "players.v_api.GET_get_player", {'get_player': 1})
+
+    def test_matches_api(self):
+        self.check_dispatcher(matches_api, "matches.v_api.GET_get_match", {'get_match': 1})
+
+    def test_folders_api(self):
+        self.check_dispatcher(folders_api, "exercises.v_api.GET_nfb_folders", {'nfb_folders': 1})
+
+    def test_shared_link_api(self):
+        self.check_dispatcher(shared_link_api, "shared.v_api.GET_get_link", {'get_link': 1})
+
+    def test_exercises_page(self):
+        self.check_page(exercises, "exercises.views", {"exercises.v_api.get_exercises_params": ([], [], [], {})})
+
+    def test_players_page(self):
+        self.check_page(players, "players.views", {"players.v_api.get_players_refs": {}})
+
+    def test_matches_page(self):
+        self.check_page(matches, "matches.views", {
+            "matches.v_api.get_season_matches": None, "matches.v_api.get_matches_refs": {}
+        })
+
+    def test_match_page(self):
+        self.check_page(match, "matches.views", {
+            "matches.v_api.GET_get_match": {}, "matches.v_api.get_matches_refs": {}
+        })
+
+
+class QueriesHelpersTest(TestCase):
+    """
+    Helpers of api.queries fetch object by one query and don't fetch it again.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(email="api.queries@nanofootball.local")
+        cls.user.set_unusable_password()
+        cls.user.save()
+
+    def test_get_one_or_none(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_one_or_none(User.objects.filter(pk=self.user.pk)).pk, self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_one_or_none(User.objects.filter(pk=-1)))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_one_or_none(None))
+
+    def test_get_object_values(self):
+        with self.assertNumQueries(0):
+            values = get_object_values(self.user)
+        self.assertEqual(values['id'], self.user.pk)
+
+
+class MetricsMiddlewareTest(TestCase):
+    """
+    Queries sent while streaming content is consumed are counted into request's histogram.
+
+    """
+    def setUp(self):
+        reset_histograms()
+        self.addCleanup(reset_histograms)
+
+    def test_streaming_queries(self):
+        def view(request):
+            def content():
+                yield str(User.objects.count()).encode()
+                yield str(User.objects.count()).encode()
+            return StreamingHttpResponse(content())
+
+        request = RequestFactory().get("/api", {'get_users': 1})
+        response = MetricsMiddleware(view)(request)
+        self.assertEqual(response['X-Query-Count'], "0")
+        self.assertEqual(get_histograms()['actions'], {})
+        with self.assertNumQueries(2):
+            self.assertEqual(b"".join(response.streaming_content), b"00")
+        hist = get_histograms()['actions']['unknown.get_users']
+        self.assertEqual(hist['count'], 1)
+        self.assertEqual(hist['avg_queries'], 2)
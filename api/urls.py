@@ -4,4 +4,5 @@ from api import views
 
 urlpatterns = [
     path('exercises', views.exercises, name="exercises"),
+    path('metrics', views.metrics, name="metrics"),
 ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -5,7 +6,11 @@ from rest_framework.decorators import api_view, authentication_classes, permissi
 from rest_framework.authtoken.models import Token
 from api.models import APIToken
 from users.models import User
-import exercises.v_api as exercises_v_api
+from api.metrics import get_histograms, reset_histograms
+from api.lazy import LazyModule
+
+
+exercises_v_api = LazyModule("exercises.v_api")
 
 
 
@@ -88,3 +93,33 @@ def exercises(request):
         return exercises_v_api.GET_link_video_exs(request, cur_user)
     return JsonResponse({"err": "Access denied!"}, status=400)
 
+
+
+
+def metrics(request):
+    """
+    Return JsonResponse with latency histograms of actions. Check api.metrics.MetricsMiddleware.
+    Only superusers have access, setting "API_METRICS_PUBLIC = True" opens histograms for everyone.
+    Histograms are cleared by POST request with parameter "reset=1", only superusers can clear them.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Return an JsonResponse with histograms or error.
+    :rtype: [JsonResponse]
+
+    """
+    is_superuser = request.user.is_authenticated and request.user.is_superuser
+    if not is_superuser and not getattr(settings, "API_METRICS_PUBLIC", False):
+        return JsonResponse({"err": "Access denied!"}, status=400)
+    if request.method == "POST":
+        reset_status = 0
+        try:
+            reset_status = int(request.POST.get("reset", 0))
+        except:
+            pass
+        if reset_status != 1 or not is_superuser:
+            return JsonResponse({"err": "Access denied!"}, status=400)
+        res_data = get_histograms()
+        reset_histograms()
+        return JsonResponse({"data": res_data, "success": True}, status=200)
+    return JsonResponse({"data": get_histograms(), "success": True}, status=200)
@@ -0,0 +1,113 @@
+import logging
+import time
+from django.db import connection, connections
+
+
+logger = logging.getLogger(__name__)
+
+
+
+def warm_up_nfb_library():
+    import exercises.nfb_library as nfb_library
+    snapshot = nfb_library.get_snapshot()
+    return (
+        f"version={snapshot.version}, folders={len(snapshot.folders)}, "
+        f"goals={len(snapshot.goal_codes)}, size={len(snapshot.get_section('content'))} bytes"
+    )
+
+
+def warm_up_players_refs():
+    import players.v_api as players_v_api
+    refs = players_v_api.load_players_refs()
+    return ", ".join(f"{key}={len(value)}" for key, value in refs.items())
+
+
+def warm_up_matches_refs():
+    import matches.v_api as matches_v_api
+    refs = matches_v_api.load_matches_refs()
+    return ", ".join(f"{key}={len(value)}" for key, value in refs.items())
+
+
+# exercises' references (get_exercises_params) are stored in NFB library's snapshot.
+WARMUP_STEPS = [
+    ("exercises.nfb_library", warm_up_nfb_library),
+    ("players.refs", warm_up_players_refs),
+    ("matches.refs", warm_up_matches_refs),
+]
+
+
+def register_warmup_step(name, func):
+    """
+    Add step to warm-up. Function takes no arguments and returns short description of loaded data.
+
+    :param name: Step's name for report.
+    :type name: [str]
+    :param func: Step's function.
+    :type func: [callable]
+
+    """
+    WARMUP_STEPS.append((name, func))
+
+
+def warm_up():
+    """
+    Preload caches of the current worker: NFB library's snapshot with exercises' references
+    and references of players and matches. Failed step doesn't stop other steps.
+
+    :return: Report of steps: name, loaded data or error, time in ms, amount of queries.
+    :rtype: list[dict]
+
+    """
+    report = []
+    for name, func in WARMUP_STEPS:
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        row = {'name': name, 'success': True}
+        try:
+            with connection.execute_wrapper(count_query):
+                row['loaded'] = func()
+        except Exception as e:
+            logger.exception("Warm-up step %s failed.", name)
+            row['success'] = False
+            row['loaded'] = str(e)
+        row['time_ms'] = (time.perf_counter() - start) * 1000
+        row['queries'] = queries[0]
+        report.append(row)
+    return report
+
+
+def format_report(report):
+    """
+    Return warm-up's report as text lines.
+
+    :param report: Report from warm_up().
+    :type report: list[dict]
+    :return: Lines of report.
+    :rtype: list[str]
+
+    """
+    lines = []
+    for row in report:
+        status = "ok" if row['success'] else "failed"
+        lines.append(f"{row['name']:<24} {status:<6} {row['time_ms']:>8.1f} ms {row['queries']:>4} queries  {row['loaded']}")
+    lines.append(f"{'total':<24} {'':<6} {sum(row['time_ms'] for row in report):>8.1f} ms")
+    return lines
+
+
+def post_fork(server, worker):
+    """
+    Gunicorn's hook, which warms up worker before it accepts requests. Usage in gunicorn.conf.py:
+    from api.warmup import post_fork
+
+    """
+    import django
+    django.setup()
+    for line in format_report(warm_up()):
+        server.log.info("Warm-up [pid %s]: %s", worker.pid, line)
+    # connections of warm-up aren't bound to any request.
+    connections.close_all()
@@ -0,0 +1,147 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_DEFAULT = 2.0
+MAX_PENDING_DEFAULT = 1000
+
+
+
+class WriteBehindBuffer:
+    """
+    Collect small updates of rows in memory and write them by one bulk operation later.
+    Updates are coalesced by key: repeated changes of the same field keep only the last value.
+    Buffer is flushed by timer after settings.API_WRITE_BEHIND_INTERVAL seconds, at the end of request
+    if interval is over (timers don't run on servers without threads), when amount of keys reaches
+    settings.API_WRITE_BEHIND_MAX_PENDING and at process's exit.
+    Pending values are visible through get(), so the same process reads its own writes before flush.
+    If settings.API_WRITE_BEHIND is False then each update is written immediately.
+
+    """
+    def __init__(self, name, flush_func):
+        """
+        :param name: Buffer's name for logs.
+        :type name: [str]
+        :param flush_func: Function, which writes updates: flush_func({key: {field: value}}).
+        :type flush_func: [callable]
+
+        """
+        self.name = name
+        self.flush_func = flush_func
+        self._pending = {}
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._last_flush = time.monotonic()
+        request_finished.connect(self.on_request_finished, weak=False, dispatch_uid=f"write_behind:{name}")
+        atexit.register(self.flush)
+
+    @property
+    def interval(self):
+        return getattr(settings, "API_WRITE_BEHIND_INTERVAL", FLUSH_INTERVAL_DEFAULT)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, "API_WRITE_BEHIND_MAX_PENDING", MAX_PENDING_DEFAULT)
+
+    def is_enabled(self):
+        return getattr(settings, "API_WRITE_BEHIND", True)
+
+    def add(self, key, values):
+        """
+        Add update of row to buffer.
+
+        :param key: Row's key, which is understood by flush_func.
+        :type key: [tuple]
+        :param values: Changed fields with new values.
+        :type values: dict[str]
+
+        """
+        if not self.is_enabled() or connection.in_atomic_block:
+            # transaction expects its changes to be written with it. Pending values of key are written together
+            # with new ones, else the next flush would overwrite the newer direct write by older values.
+            with self._flush_lock:
+                with self._lock:
+                    pending = self._pending.pop(key, {})
+                try:
+                    self.flush_func({key: {**pending, **values}})
+                except Exception:
+                    with self._lock:
+                        self._pending[key] = {**pending, **self._pending.get(key, {})}
+                    raise
+            return
+        with self._lock:
+            self._pending.setdefault(key, {}).update(values)
+            is_full = len(self._pending) >= self.max_pending
+            if self._timer is None and not is_full:
+                self._timer = threading.Timer(self.interval, self.flush_by_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if is_full:
+            self.flush()
+
+    def get(self, key):
+        """
+        Return pending values of row, which aren't written yet, including values of running flush.
+
+        :param key: Row's key.
+        :type key: [tuple]
+        :return: Pending fields with values, empty if there are no pending changes.
+        :rtype: dict[str]
+
+        """
+        with self._lock:
+            values = dict(self._flushing.get(key, {}))
+            values.update(self._pending.get(key, {}))
+        return values
+
+    def flush(self):
+        """
+        Write all pending updates by flush_func(). If writing fails then updates are returned to buffer,
+        newer values added during flush are kept.
+
+        :return: Amount of written keys.
+        :rtype: [int]
+
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch = self._pending
+                self._pending = {}
+                self._flushing = batch
+                self._last_flush = time.monotonic()
+            if len(batch) == 0:
+                return 0
+            try:
+                self.flush_func(batch)
+            except Exception:
+                logger.exception("Can't flush write-behind buffer %s (%d keys).", self.name, len(batch))
+                with self._lock:
+                    for key, values in batch.items():
+                        self._pending[key] = {**values, **self._pending.get(key, {})}
+                return 0
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            return len(batch)
+
+    def flush_by_timer(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def on_request_finished(self, **kwargs):
+        if len(self._pending) > 0 and time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
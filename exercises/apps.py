@@ -6,3 +6,7 @@ class ExercisesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exercises'
     verbose_name = _('Exercises')
+
+    def ready(self):
+        import exercises.nfb_library
+        import exercises.versions
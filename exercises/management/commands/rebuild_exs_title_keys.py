@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from exercises.models import AdminExercise, UserExercise, ClubExercise, EXS_TITLE_LANGS
+
+
+
+class Command(BaseCommand):
+    help = 'Rebuild normalized title keys of exercises. Run it once after adding the columns or after bulk updates of titles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Amount of exercises updated by one query.')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        fields = [f"title_key_{lang_code}" for lang_code in EXS_TITLE_LANGS]
+        for model in [AdminExercise, UserExercise, ClubExercise]:
+            updated_count = 0
+            batch = []
+            for exercise in model.objects.only('id', 'title', *fields).order_by('id').iterator(chunk_size=batch_size):
+                exercise.set_title_keys()
+                batch.append(exercise)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, fields)
+                    updated_count += len(batch)
+                    batch = []
+            if len(batch) > 0:
+                model.objects.bulk_update(batch, fields)
+                updated_count += len(batch)
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: updated {updated_count}.'))
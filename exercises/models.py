@@ -7,6 +7,32 @@ from references.models import ExsGoal, ExsBall, ExsTeamCategory, ExsAgeCategory,
 from video.models import Video
 
 
+EXS_TITLE_LANGS = ["en", "ru"]
+EXS_TITLE_LANG_DEFAULT = "en"
+EXS_TITLE_KEY_LENGTH = 255
+
+
+def make_title_key(title, lang_code):
+    """
+    Return normalized title's key for sorting and searching: title by language's code with fallback
+    to EXS_TITLE_LANG_DEFAULT, in lower case and without whitespaces.
+
+    :param title: Dictionary with structure("code_1": "value_1",...) for different languages.
+    :type title: dict[str] or None
+    :param lang_code: Language's code, for example: "en", "ru".
+    :type lang_code: [str]
+    :return: Title's key.
+    :rtype: [str]
+
+    """
+    value = None
+    if isinstance(title, dict):
+        value = title.get(lang_code) or title.get(EXS_TITLE_LANG_DEFAULT)
+    if not isinstance(value, str):
+        value = ""
+    return "".join(value.split()).lower()[:EXS_TITLE_KEY_LENGTH]
+
+
 class AbstractExercise(models.Model):
     date_creation = models.DateField(auto_now_add=True)
     order = models.IntegerField(
@@ -26,6 +52,14 @@ class AbstractExercise(models.Model):
         blank=True, null=True
     )
     title = models.JSONField(null=True, blank=True)
+    title_key_en = models.CharField(
+        help_text='Название для сортировки и поиска (en), обновляется при сохранении',
+        max_length=EXS_TITLE_KEY_LENGTH, default="", blank=True, db_index=True
+    )
+    title_key_ru = models.CharField(
+        help_text='Название для сортировки и поиска (ru), обновляется при сохранении',
+        max_length=EXS_TITLE_KEY_LENGTH, default="", blank=True, db_index=True
+    )
     ref_goal = models.ForeignKey(ExsGoal, on_delete=models.SET_NULL, null=True, blank=True)
     ref_ball = models.ForeignKey(ExsBall, on_delete=models.SET_NULL, null=True, blank=True)
     ref_team_category = models.ForeignKey(ExsTeamCategory, on_delete=models.SET_NULL, null=True, blank=True)
@@ -46,6 +80,15 @@ class AbstractExercise(models.Model):
         ordering = ['order']
     def __str__(self):
         return f"[id: {self.id}]"
+    def set_title_keys(self):
+        for lang_code in EXS_TITLE_LANGS:
+            setattr(self, f"title_key_{lang_code}", make_title_key(self.title, lang_code))
+    def save(self, *args, **kwargs):
+        self.set_title_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = list(update_fields) + [f"title_key_{lang_code}" for lang_code in EXS_TITLE_LANGS]
+        super().save(*args, **kwargs)
 
 
 class AdminExercise(AbstractExercise):
@@ -0,0 +1,338 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from types import MappingProxyType
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from exercises.models import AdminFolder, AdminExercise, EXS_TITLE_LANGS
+from references.models import ExsGoal, ExsBall, ExsTeamCategory, ExsAgeCategory, ExsTrainPart, ExsCognitiveLoad
+from references.models import ExsKeyword, ExsStressType, ExsPurpose, ExsCoaching
+from references.models import ExsCategory, ExsAdditionalData, ExsTitleName
+from api.responses import get_json_backend
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+VERSION_KEY = "nfb_library_version"
+CHECK_INTERVAL_DEFAULT = 1.0
+STREAM_CHUNK_SIZE = 64 * 1024
+FILE_PREFIX = "nfb_library."
+FILE_SUFFIX = ".bin"
+FILE_MAGIC = b"NFBLIB01"
+FILE_HEADER = struct.Struct("<8sQ")
+EXS_PROJECTION_FIELDS = ["id", "folder_id", "title", "ref_goal_id", "ref_ball_id", "video_data", "animation_data", "date_creation"] \
+    + [f"title_key_{lang_code}" for lang_code in EXS_TITLE_LANGS]
+EXS_REFS_MODELS = {
+    'exs_goal': ExsGoal,
+    'exs_ball': ExsBall,
+    'exs_team_category': ExsTeamCategory,
+    'exs_age_category': ExsAgeCategory,
+    'exs_train_part': ExsTrainPart,
+    'exs_cognitive_load': ExsCognitiveLoad,
+    'exs_additional_data': ExsAdditionalData,
+    'exs_keyword': ExsKeyword,
+    'exs_stress_type': ExsStressType,
+    'exs_purpose': ExsPurpose,
+    'exs_coaching': ExsCoaching,
+    'exs_category': ExsCategory,
+    'exs_title_names': ExsTitleName,
+}
+
+_snapshot = None
+_checked_at = 0
+_snapshot_lock = threading.Lock()
+
+
+
+class NfbLibrarySnapshot:
+    """
+    Read-only snapshot of NFB library and exercises' references. Snapshot is never changed after building,
+    new version of library creates new snapshot.
+    Snapshot is stored as binary file: header, JSON index and JSON sections. Index (visible folders' tree, goals' codes)
+    is parsed to tuples and MappingProxyType, so callers can't change shared data by mistake.
+    Sections (JSON of GET_get_nfb_library() with exercises' projections, references) stay in buffer.
+    If buffer is memory-mapped file then pages of sections are shared by all workers and aren't copied.
+
+    """
+    def __init__(self, buffer):
+        """
+        :param buffer: Content of snapshot's file.
+        :type buffer: [bytes] or [mmap]
+        :raise ValueError: If buffer isn't snapshot's file.
+
+        """
+        magic, index_length = FILE_HEADER.unpack_from(buffer, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError("Wrong NFB library file.")
+        index = json.loads(bytes(buffer[FILE_HEADER.size:FILE_HEADER.size + index_length]))
+        self._buffer = buffer
+        self._data_offset = FILE_HEADER.size + index_length
+        self._sections = index['sections']
+        self.version = index['version']
+        self.etag = f'"nfb-{self.version}"'
+        self.folders = tuple(MappingProxyType(elem) for elem in index['folders'])
+        self.folders_by_id = MappingProxyType({elem['id']: elem for elem in self.folders})
+        children = {}
+        for elem in self.folders:
+            children.setdefault(elem['parent'], []).append(elem['id'])
+        self.children = MappingProxyType({key: tuple(value) for key, value in children.items()})
+        self.goal_codes = MappingProxyType({int(key): value for key, value in index['goal_codes'].items()})
+
+    def get_folder_ids(self, folder_id):
+        """
+        Return IDs of folder's children or folder's ID if folder hasn't children, like listing of exercises does.
+
+        :param folder_id: Folder's ID.
+        :type folder_id: [int]
+        :return: Folders' IDs or empty tuple if folder isn't found.
+        :rtype: tuple[int]
+
+        """
+        if folder_id not in self.folders_by_id:
+            return ()
+        return self.children.get(folder_id, (folder_id,))
+
+    def get_section(self, name):
+        """
+        Return section of snapshot without copying.
+
+        :param name: Section's name: "content" or "refs".
+        :type name: [str]
+        :return: Section's JSON.
+        :rtype: [memoryview]
+
+        """
+        offset, length = self._sections[name]
+        start = self._data_offset + offset
+        return memoryview(self._buffer)[start:start + length]
+
+    def get_refs(self):
+        """
+        Return new copy of exercises' references, it can be changed by caller. Check get_exercises_params().
+
+        :return: Dictionary with references' elements by reference's name.
+        :rtype: dict[str, list[dict]]
+
+        """
+        return json.loads(bytes(self.get_section("refs")))
+
+    def iter_content(self, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Return generator of chunks of JSON for GET_get_nfb_library(), only one chunk is copied at once.
+
+        :return: Generator of chunks.
+        :rtype: generator[bytes]
+
+        """
+        content = self.get_section("content")
+        for start in range(0, len(content), chunk_size):
+            yield bytes(content[start:start + chunk_size])
+
+
+def get_version():
+    """
+    Return current version of NFB library. Version is kept in cache, so all workers see the same version
+    if cache is shared between them.
+
+    :return: Version's token.
+    :rtype: [str]
+
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def publish_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def bump_version(**kwargs):
+    """
+    Publish new version of NFB library after current transaction is committed, snapshots of all workers
+    become outdated. Snapshot built by concurrent request before commit would keep old data with new version.
+    It is called by signals when NFB folders, NFB exercises or exercises' references are changed.
+
+    """
+    transaction.on_commit(publish_version)
+
+
+def build_file(version):
+    """
+    Return content of snapshot's file built from the database.
+
+    :param version: Version's token of snapshot.
+    :type version: [str]
+    :return: Content of file.
+    :rtype: [bytes]
+
+    """
+    dumps = get_json_backend()
+    folders = list(AdminFolder.objects.filter(visible=True).order_by('id').values())
+    for elem in folders:
+        elem['root'] = False if elem['parent'] and elem['parent'] != 0 else True
+    exercises = list(
+        AdminExercise.objects.filter(visible=True, folder__visible=True).order_by('id').values(*EXS_PROJECTION_FIELDS)
+    )
+    refs = {key: list(model.objects.order_by('id').values()) for key, model in EXS_REFS_MODELS.items()}
+    goal_codes = {str(elem['id']): elem['short_name'] for elem in refs['exs_goal']}
+    sections = {
+        'content': dumps({
+            "data": {
+                'version': version,
+                'folders': folders,
+                'exercises': exercises,
+                'goal_codes': goal_codes,
+                'balls': refs['exs_ball'],
+            },
+            "success": True
+        }),
+        'refs': dumps(refs),
+    }
+    index = {'version': version, 'folders': folders, 'goal_codes': goal_codes, 'sections': {}}
+    offset = 0
+    for name, section in sections.items():
+        index['sections'][name] = [offset, len(section)]
+        offset += len(section)
+    index = dumps(index)
+    return FILE_HEADER.pack(FILE_MAGIC, len(index)) + index + b"".join(sections.values())
+
+
+def get_files_dir():
+    """
+    Return directory of snapshots' files, it is set by settings.NFB_LIBRARY_DIR.
+    All workers of the server have to use the same directory.
+
+    :return: Path of directory.
+    :rtype: [str]
+
+    """
+    files_dir = getattr(settings, "NFB_LIBRARY_DIR", None)
+    if not files_dir:
+        files_dir = os.path.join(tempfile.gettempdir(), "nfb_library")
+    os.makedirs(files_dir, exist_ok=True)
+    return files_dir
+
+
+@contextmanager
+def files_lock(files_dir):
+    """
+    Return context manager, which locks directory of snapshots between processes,
+    so only one worker builds new snapshot and others wait for its file.
+
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(files_dir, ".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_file(path, content):
+    """
+    Write snapshot's file atomically: content is written to temporary file, which replaces target file.
+    Files of other versions are removed, workers which have mapped them keep their data until reload.
+
+    :param path: Path of file.
+    :type path: [str]
+    :param content: Content of file.
+    :type content: [bytes]
+
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    files_dir = os.path.dirname(path)
+    for name in os.listdir(files_dir):
+        old_path = os.path.join(files_dir, name)
+        if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX) and old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def map_file(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_snapshot(version, use_mmap=None):
+    """
+    Return snapshot of version. If settings.NFB_LIBRARY_MMAP is True (default) then snapshot's file
+    is memory-mapped, file is built by the first worker which needs this version. Else snapshot is kept in memory.
+
+    :param version: Version's token.
+    :type version: [str]
+    :param use_mmap: Use memory-mapped file or None for settings.NFB_LIBRARY_MMAP.
+    :type use_mmap: [bool] or None
+    :return: Snapshot.
+    :rtype: [NfbLibrarySnapshot]
+
+    """
+    if use_mmap is None:
+        use_mmap = getattr(settings, "NFB_LIBRARY_MMAP", True)
+    if not use_mmap:
+        return NfbLibrarySnapshot(build_file(version))
+    files_dir = get_files_dir()
+    path = os.path.join(files_dir, f"{FILE_PREFIX}{version}{FILE_SUFFIX}")
+    try:
+        return NfbLibrarySnapshot(map_file(path))
+    except (OSError, ValueError, struct.error):
+        pass
+    with files_lock(files_dir):
+        try:
+            return NfbLibrarySnapshot(map_file(path))
+        except (OSError, ValueError, struct.error):
+            write_file(path, build_file(version))
+    return NfbLibrarySnapshot(map_file(path))
+
+
+def get_snapshot():
+    """
+    Return snapshot of NFB library for the current version. Snapshot is loaded once per worker and reloaded
+    only after new version is published. Version is checked not more often than
+    settings.NFB_LIBRARY_CHECK_INTERVAL seconds.
+
+    :return: Snapshot.
+    :rtype: [NfbLibrarySnapshot]
+
+    """
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and now - _checked_at < getattr(settings, "NFB_LIBRARY_CHECK_INTERVAL", CHECK_INTERVAL_DEFAULT):
+        return snapshot
+    version = get_version()
+    if snapshot is None or snapshot.version != version:
+        with _snapshot_lock:
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = load_snapshot(version)
+            snapshot = _snapshot
+    _checked_at = now
+    return snapshot
+
+
+for sender in [AdminFolder, AdminExercise] + list(EXS_REFS_MODELS.values()):
+    post_save.connect(bump_version, sender=sender, dispatch_uid=f"nfb_library_save_{sender.__name__}")
+    post_delete.connect(bump_version, sender=sender, dispatch_uid=f"nfb_library_delete_{sender.__name__}")
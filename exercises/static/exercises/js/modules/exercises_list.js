@@ -54,7 +54,11 @@ function ResizeSplitCols() {
 }
 
 let exercises = {"nfb": {}};
+// Request's params and cursor of the next page for each folder in exercises:
+let exercisesPages = {"nfb": {}};
 window.exercisesFilter = {};
+const EXS_PAGE_SIZE = 100;
+window.exsPage = {'params': null, 'cursor': null, 'request': null, 'folder': null};
 function LoadFolderExercises() {
     let activeRow = $('.folders_list').find('.list-group-item.active');
     let isClub = false;
@@ -69,12 +73,24 @@ function LoadFolderExercises() {
     let folderElemStr = isClub ? '.folder-club-elem' : '.folder-elem';
     let cFolderId = !isNfbExs ? $(activeRow).find(folderElemStr).attr('data-id') : $(activeNfbRow).find('.folder-nfb-elem').attr('data-id');
     let tExs = !isNfbExs ? exercises : exercises['nfb'];
+    let tPages = !isNfbExs ? exercisesPages : exercisesPages['nfb'];
+    if (window.exsPage.request) {
+        window.exsPage.request.abort();
+        window.exsPage.request = null;
+    }
+    window.exsPage.folder = {'id': cFolderId, 'exs': tExs, 'pages': tPages};
     if (cFolderId in tExs) {
+        let cPage = tPages[cFolderId];
+        window.exsPage.params = cPage ? cPage.params : null;
+        window.exsPage.cursor = cPage ? cPage.cursor : null;
         RenderFolderExercises(cFolderId, tExs);
     } else {
-        let data = {'get_exs_all': 1, 'folder': cFolderId, 'get_nfb': isNfbExs ? 1 : 0, 'f_type': fType, 'filter': window.exercisesFilter};
+        let data = {'get_exs_all': 1, 'folder': cFolderId, 'get_nfb': isNfbExs ? 1 : 0, 'f_type': fType, 'filter': window.exercisesFilter, 'limit': EXS_PAGE_SIZE};
+        window.exsPage.params = data;
+        window.exsPage.cursor = null;
         $('.page-loader-wrapper').fadeIn();
-        $.ajax({
+        // request of the first page is aborted when another folder is selected, so its cursor isn't mixed with new folder.
+        window.exsPage.request = $.ajax({
             headers:{"X-CSRFToken": csrftoken},
             data: data,
             type: 'GET', // GET или POST
@@ -83,16 +99,25 @@ function LoadFolderExercises() {
             success: function (res) {
                 if (res.success) {
                     tExs[cFolderId] = res.data;
+                    tPages[cFolderId] = {'params': data, 'cursor': res.next_cursor ? res.next_cursor : null};
+                    if (window.exsPage.folder && window.exsPage.folder.id == cFolderId) {
+                        window.exsPage.cursor = tPages[cFolderId].cursor;
+                    }
                 } else {
                     tExs[cFolderId] = [];
                 }
             },
             error: function (res) {
+                if (res.statusText == "abort") {return;}
                 tExs[cFolderId] = [];
                 console.log(res);
             },
             complete: function (res) {
+                if (window.exsPage.request === res) {
+                    window.exsPage.request = null;
+                }
                 $('.page-loader-wrapper').fadeOut();
+                if (res.statusText == "abort" || !window.exsPage.folder || window.exsPage.folder.id != cFolderId) {return;}
                 RenderFolderExercises(cFolderId, tExs);
                 if (window.lastExercise && window.lastExercise.exs) {
                     CountExsInFolder();
@@ -103,19 +128,48 @@ function LoadFolderExercises() {
     }
 }
 
-function RenderFolderExercises(id, tExs) {
-    let exs = tExs[id];
-    let exsHtml = "";
-    $('.exs_counter').html(exs.length > 0 ? `(${exs.length})` : "(...)");
-    $('.folders-block').find('.list-group-item.active').find('.folder-exs-counter').html(exs.length > 0 ? exs.length : "...");
-    for (let i = 0; i < exs.length; i++) {
-        let exElem = exs[i];
-        exsHtml += `
+// Load next page of exercises while scrolling the list:
+function LoadFolderExercisesPage() {
+    if (!window.exsPage.cursor || window.exsPage.request) {return;}
+    let data = Object.assign({}, window.exsPage.params, {'cursor': window.exsPage.cursor});
+    window.exsPage.request = $.ajax({
+        headers:{"X-CSRFToken": csrftoken},
+        data: data,
+        type: 'GET',
+        dataType: 'json',
+        url: "/exercises/exercises_api",
+        success: function (res) {
+            if (res.success) {
+                window.exsPage.cursor = res.next_cursor ? res.next_cursor : null;
+                let cFolder = window.exsPage.folder;
+                if (cFolder && cFolder.id in cFolder.exs) {
+                    cFolder.exs[cFolder.id] = cFolder.exs[cFolder.id].concat(res.data);
+                    cFolder.pages[cFolder.id] = {'params': window.exsPage.params, 'cursor': window.exsPage.cursor};
+                }
+                AppendFolderExercises(res.data);
+            } else {
+                window.exsPage.cursor = null;
+            }
+        },
+        error: function (res) {
+            if (res.statusText != "abort") {
+                window.exsPage.cursor = null;
+                console.log(res);
+            }
+        },
+        complete: function (res) {
+            window.exsPage.request = null;
+        }
+    });
+}
+
+function GetFolderExerciseHtml(exElem, ind) {
+    return `
         <li class="exs-elem list-group-item py-1 px-0" data-id="${exElem.id}" data-folder="${exElem.folder}">
             <div class="row w-100">
                 <div class="col-12 d-flex">
                     <span class="ml-3 w-100">
-                        <span class="num">${i+1}.</span>
+                        <span class="num">${ind+1}.</span>
                         <span class="title">${exElem.title == "" ? "-- None --" : exElem.title}</span>
                     </span>
 
@@ -162,12 +216,23 @@ function RenderFolderExercises(id, tExs) {
                 </div>
             </div>
         </li>
-        `;
+    `;
+}
+
+function RenderFolderExercises(id, tExs) {
+    let exs = tExs[id];
+    let exsHtml = "";
+    let exsCount = exs.length > 0 ? `${exs.length}${window.exsPage.cursor ? '+' : ''}` : "...";
+    $('.exs_counter').html(`(${exsCount})`);
+    $('.folders-block').find('.list-group-item.active').find('.folder-exs-counter').html(exsCount);
+    for (let i = 0; i < exs.length; i++) {
+        exsHtml += GetFolderExerciseHtml(exs[i], i);
     }
     if (exs.length == 0) {exsHtml = `<li class="list-group-item py-2">В данной папке упр-ий нет.</li>`;}
     $('.exs-list-group').html(exsHtml);
     // временно, упр-ия не кешируются
     exercises = {"nfb": {}};
+    exercisesPages = {"nfb": {}};
 
     ToggleIconsInExs();
     ToggleMarkersInExs();
@@ -177,6 +242,20 @@ function RenderFolderExercises(id, tExs) {
     }
 }
 
+function AppendFolderExercises(exs) {
+    let startInd = $('.exs-list-group').find('.exs-elem').length;
+    let exsHtml = "";
+    for (let i = 0; i < exs.length; i++) {
+        exsHtml += GetFolderExerciseHtml(exs[i], startInd + i);
+    }
+    $('.exs-list-group').append(exsHtml);
+    let exsCount = `${startInd + exs.length}${window.exsPage.cursor ? '+' : ''}`;
+    $('.exs_counter').html(`(${exsCount})`);
+    $('.folders-block').find('.list-group-item.active').find('.folder-exs-counter').html(exsCount);
+    ToggleIconsInExs();
+    ToggleMarkersInExs();
+}
+
 // Handler for func LoadExerciseOne in exercise card:
 function LoadExerciseOneHandler() {
     let activeExs = $('.exercises-list').find('.exs-elem.active');
@@ -404,6 +483,15 @@ $(function() {
     // });
 
 
+    // Load next page of exercises
+    $('.exs-list-group').on('scroll', (e) => {
+        let list = e.currentTarget;
+        if (list.scrollTop + list.clientHeight >= list.scrollHeight - 200) {
+            LoadFolderExercisesPage();
+        }
+    });
+
+
     // Choose exercise
     $('.exercises-list').on('click', '.exs-elem', (e) => {
         if ($(e.target).is('button') || $(e.target).hasClass('icon-custom') || $(e.target).is('input')) {
@@ -1,3 +1,125 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from references.models import UserTeam
+from exercises.models import UserFolder, AdminFolder, UserExercise, AdminExercise, UserExerciseParamTeam
+import exercises.v_api as v_api
+import api.benchmark as benchmark
+import api.testing as testing
 
-# Create your tests here.
+
+
+@override_settings(API_PARALLEL_LOADERS=False, CACHES=testing.LOCMEM_CACHES)
+class ExercisesQueriesTest(testing.TableSelectsMixin, TestCase):
+    """
+    Each entity is fetched once: exercise, folder and team by one query each, exercise's folder is loaded with exercise.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = testing.create_test_data()
+        cls.team = UserTeam.objects.filter(user_id=cls.user).order_by('id').first()
+        cls.root_folder = UserFolder.objects.filter(user=cls.user, parent=0).order_by('id').first()
+        cls.folder = UserFolder.objects.filter(user=cls.user, parent=cls.root_folder.id).order_by('id').first()
+        cls.exs = UserExercise.objects.filter(user=cls.user).order_by('id').first()
+        cls.nfb_exs = AdminExercise.objects.filter(
+            folder__short_name__startswith=benchmark.BENCH_FOLDER_MARKER
+        ).order_by('id').first()
+
+    def setUp(self):
+        cache.clear()
+
+    def call(self, func, method, params):
+        request = testing.make_request(self.user, method, params, self.team)
+        return testing.capture_queries(func, request, self.user, self.team.id)
+
+    def test_get_exs_all(self):
+        params = {'folder': self.root_folder.id, 'f_type': v_api.FOLDER_TEAM}
+        response, queries = self.call(v_api.GET_get_exs_all, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+
+    def test_get_exs_all_page(self):
+        params = {'folder': self.root_folder.id, 'f_type': v_api.FOLDER_TEAM, 'limit': 2}
+        response, queries = self.call(v_api.GET_get_exs_all, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+
+    def test_get_exs_one(self):
+        params = {'exs': self.exs.id, 'f_type': v_api.FOLDER_TEAM}
+        response, queries = self.call(v_api.GET_get_exs_one, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+        self.assertSelects(queries, UserExerciseParamTeam, 1)
+        self.assertSelects(queries, UserFolder, 0)
+
+    def test_get_exs_one_nfb(self):
+        params = {'exs': self.nfb_exs.id, 'f_type': v_api.FOLDER_NFB}
+        response, queries = self.call(v_api.GET_get_exs_one, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, AdminExercise, 1)
+        self.assertSelects(queries, AdminFolder, 0)
+
+    def test_get_exs_graphic_content(self):
+        params = {'exs': self.exs.id, 'f_type': v_api.FOLDER_TEAM}
+        response, queries = self.call(v_api.GET_get_exs_graphic_content, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+
+    def test_get_exs_facets(self):
+        params = {'folder': self.root_folder.id, 'f_type': v_api.FOLDER_TEAM}
+        response, queries = self.call(v_api.GET_get_exs_facets, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        # one scan of exercises and one grouped query for each facet.
+        self.assertSelects(queries, UserExercise, 1 + len(v_api.EXS_FACETS_FIELDS))
+        response, queries = self.call(v_api.GET_get_exs_facets, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 0)
+
+    def test_get_nfb_library(self):
+        response, queries = self.call(v_api.GET_get_nfb_library, "GET", {})
+        self.assertEqual(response.status_code, 200)
+        # library is sent from snapshot, which is built once per version.
+        response, queries = self.call(v_api.GET_get_nfb_library, "GET", {})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, AdminExercise, 0)
+
+    def test_copy_exs(self):
+        params = {'exs': self.nfb_exs.id, 'folder': self.folder.id, 'type': v_api.FOLDER_NFB}
+        response, queries = self.call(v_api.POST_copy_exs, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, AdminExercise, 1)
+        self.assertSelects(queries, UserFolder, 1)
+        self.assertSelects(queries, UserTeam, 1)
+
+    def test_move_exs(self):
+        params = {'exs': self.exs.id, 'folder': self.folder.id}
+        response, queries = self.call(v_api.POST_move_exs, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+        self.assertSelects(queries, UserFolder, 1)
+
+    def test_edit_exs(self):
+        params = {
+            'exs': self.exs.id, 'type': v_api.FOLDER_TEAM, 'data[folder_main]': self.folder.id,
+            'data[title]': "Edited", 'data[description]': "", 'data[scheme_1]': "", 'data[scheme_2]': "",
+            'data[video_1]': "", 'data[video_2]': "", 'data[animation_1]': "", 'data[animation_2]': "",
+        }
+        response, queries = self.call(v_api.POST_edit_exs, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+        self.assertSelects(queries, UserFolder, 1)
+        self.assertSelects(queries, UserTeam, 1)
+        self.assertSelects(queries, UserExerciseParamTeam, 1)
+
+    def test_delete_exs(self):
+        params = {'exs': self.exs.id, 'type': v_api.FOLDER_TEAM}
+        response, queries = self.call(v_api.POST_delete_exs, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
+        self.assertFalse(UserExercise.objects.filter(id=self.exs.id).exists())
+
+    def test_edit_exs_user_params(self):
+        params = {'exs': self.exs.id, 'type': v_api.FOLDER_TEAM, 'data[key]': "favorite", 'data[value]': 1}
+        response, queries = self.call(v_api.POST_edit_exs_user_params, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserExercise, 1)
@@ -7,5 +7,6 @@ urlpatterns = [
     path('exercise', views.exercise, name="exercise"),
     path('folders', views.folders, name="folders"),
     path('exercises_api', views.exercises_api, name="exercises_api"),
+    path('exercises_api_async', views.exercises_api_async, name="exercises_api_async"),
     path('folders_api', views.folders_api, name="folders_api")
 ]
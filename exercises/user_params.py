@@ -0,0 +1,205 @@
+from array import array
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from exercises.models import UserExerciseParam
+from api.write_behind import WriteBehindBuffer
+import exercises.versions as exs_versions
+
+
+USER_PARAMS_FLAGS = [
+    "watched", "favorite", "like", "dislike",
+    "video_1_watched", "video_2_watched", "animation_1_watched", "animation_2_watched",
+]
+LISTING_FLAGS = ["favorite", "video_1_watched", "video_2_watched", "animation_1_watched", "animation_2_watched"]
+EXS_FIELDS = ["exercise_user", "exercise_club", "exercise_nfb"]
+BATCH_SIZE = 500
+FLAGS_KEY_PREFIX = "exs_user_flags"
+FLAGS_TIMEOUT_DEFAULT = 60 * 60
+
+
+
+def write_user_params(batch):
+    """
+    Write user's params of exercises by bulk operations: existing rows are updated by one bulk_update()
+    for each exercise's type, missing rows are created by one bulk_create().
+
+    :param batch: Updates with keys (user_id, exercise's field, exercise's ID), check EXS_FIELDS.
+    :type batch: dict[tuple, dict[str, bool]]
+
+    """
+    by_field = {}
+    flags_keys = set()
+    for (user_id, exs_field, exs_id), values in batch.items():
+        by_field.setdefault(exs_field, {})[(user_id, exs_id)] = values
+        flags_keys.add(get_flags_key(user_id, exs_field))
+
+    def invalidate_flags():
+        # cached arrays have version in their keys, arrays of old version expire by timeout.
+        for flags_key in flags_keys:
+            exs_versions.bump_version(flags_key)
+
+    with transaction.atomic():
+        transaction.on_commit(invalidate_flags)
+        for exs_field, updates in by_field.items():
+            user_ids = set(key[0] for key in updates)
+            exs_ids = set(key[1] for key in updates)
+            existing = {}
+            found_params = UserExerciseParam.objects.filter(
+                user__in=user_ids, **{f"{exs_field}__in": exs_ids}
+            ).order_by('id')
+            for params in found_params:
+                existing.setdefault((params.user_id, getattr(params, f"{exs_field}_id")), params)
+            params_to_update = []
+            params_to_create = []
+            changed_fields = set()
+            for (user_id, exs_id), values in updates.items():
+                params = existing.get((user_id, exs_id))
+                if params is None:
+                    params_to_create.append(UserExerciseParam(user_id=user_id, **{f"{exs_field}_id": exs_id}, **values))
+                    continue
+                for key, value in values.items():
+                    setattr(params, key, value)
+                changed_fields.update(values)
+                params_to_update.append(params)
+            if len(params_to_update) > 0:
+                UserExerciseParam.objects.bulk_update(params_to_update, list(changed_fields), batch_size=BATCH_SIZE)
+            if len(params_to_create) > 0:
+                UserExerciseParam.objects.bulk_create(params_to_create, batch_size=BATCH_SIZE)
+
+
+def get_flags_key(user_id, exs_field):
+    return f"{FLAGS_KEY_PREFIX}:{user_id}:{exs_field}"
+
+
+def get_flags_version(user_id, exs_field):
+    """
+    Return version of user's flags, it is changed each time when user's params are written.
+
+    :return: Version.
+    :rtype: [int]
+
+    """
+    return exs_versions.get_version(get_flags_key(user_id, exs_field))
+
+
+def load_user_flags(user_id, exs_field):
+    """
+    Return sorted arrays of exercises' IDs for each flag from LISTING_FLAGS and array "ids" of exercises,
+    which have user's params. Arrays are packed to bytes for cache.
+
+    :param user_id: User's ID.
+    :type user_id: [int]
+    :param exs_field: Exercise's field of UserExerciseParam, check EXS_FIELDS.
+    :type exs_field: [str]
+    :return: Packed arrays by flag's name.
+    :rtype: dict[str, bytes]
+
+    """
+    arrays = {name: array('q') for name in ["ids"] + LISTING_FLAGS}
+    rows = UserExerciseParam.objects.filter(user=user_id, **{f"{exs_field}__isnull": False}) \
+        .order_by(exs_field, 'id').values_list(f"{exs_field}_id", *LISTING_FLAGS)
+    last_id = None
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        if row[0] == last_id:
+            # duplicated params, the first row is used like get_one_or_none() does.
+            continue
+        last_id = row[0]
+        arrays['ids'].append(row[0])
+        for ind, name in enumerate(LISTING_FLAGS, start=1):
+            if row[ind]:
+                arrays[name].append(row[0])
+    return {name: values.tobytes() for name, values in arrays.items()}
+
+
+def get_user_flags(user_id, exs_field):
+    """
+    Return sets of exercises' IDs for user's flags, so listing checks flags by set's membership
+    instead of UserExerciseParam's query for each exercise. Sorted arrays are cached for
+    settings.EXS_USER_FLAGS_TIMEOUT seconds, key contains version of flags, so arrays are invalidated
+    when user's params are written. Version is read before loading, so arrays loaded during concurrent write
+    are saved with old version and aren't used after write.
+
+    :param user_id: User's ID.
+    :type user_id: [int]
+    :param exs_field: Exercise's field of UserExerciseParam, check EXS_FIELDS.
+    :type exs_field: [str]
+    :return: Sets of IDs by flag's name and set "ids" of exercises with params.
+    :rtype: dict[str, set[int]]
+
+    """
+    flags_key = f"{get_flags_key(user_id, exs_field)}:{get_flags_version(user_id, exs_field)}"
+    packed = cache.get(flags_key)
+    if packed is None:
+        packed = load_user_flags(user_id, exs_field)
+        cache.set(flags_key, packed, getattr(settings, "EXS_USER_FLAGS_TIMEOUT", FLAGS_TIMEOUT_DEFAULT))
+    res = {}
+    for name, values in packed.items():
+        ids = array('q')
+        ids.frombytes(values)
+        res[name] = set(ids)
+    return res
+
+
+def get_flags_params(user_flags, exs_id):
+    """
+    Return user's params of exercise from sets of get_user_flags() or None if exercise hasn't params.
+
+    :param user_flags: Sets of IDs by flag's name.
+    :type user_flags: dict[str, set[int]]
+    :param exs_id: Exercise's ID.
+    :type exs_id: [int]
+    :return: User's params with flags from LISTING_FLAGS or None.
+    :rtype: dict[str, bool] or None
+
+    """
+    if exs_id not in user_flags['ids']:
+        return None
+    return {name: exs_id in user_flags[name] for name in LISTING_FLAGS}
+
+
+user_params_buffer = WriteBehindBuffer("exercises.user_params", write_user_params)
+
+
+def set_user_params(user_id, exs_field, exs_id, values):
+    """
+    Change user's params of exercise. Values are written by write-behind buffer, check WriteBehindBuffer.
+
+    :param user_id: User's ID.
+    :type user_id: [int]
+    :param exs_field: Exercise's field of UserExerciseParam, check EXS_FIELDS.
+    :type exs_field: [str]
+    :param exs_id: Exercise's ID.
+    :type exs_id: [int]
+    :param values: Flags with new values, for example: {'favorite': True}.
+    :type values: dict[str, bool]
+
+    """
+    user_params_buffer.add((user_id, exs_field, exs_id), values)
+
+
+def get_user_params(user_params, user_id, exs_field, exs_id):
+    """
+    Return user's params of exercise with pending values of write-behind buffer.
+
+    :param user_params: User's params loaded by queryset.values() or None.
+    :type user_params: dict[str] or None
+    :param user_id: User's ID.
+    :type user_id: [int]
+    :param exs_field: Exercise's field of UserExerciseParam, check EXS_FIELDS.
+    :type exs_field: [str]
+    :param exs_id: Exercise's ID.
+    :type exs_id: [int]
+    :return: User's params or None if they don't exist.
+    :rtype: dict[str] or None
+
+    """
+    pending = user_params_buffer.get((user_id, exs_field, exs_id))
+    if len(pending) == 0:
+        return user_params
+    if user_params is None:
+        user_params = {key: False for key in USER_PARAMS_FLAGS}
+    else:
+        user_params = dict(user_params)
+    user_params.update(pending)
+    return user_params
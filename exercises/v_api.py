@@ -1,22 +1,51 @@
+import base64
 import datetime
-from django.http import JsonResponse
+import hashlib
+import itertools
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet, Q, F, Value, Count
+from django.http import StreamingHttpResponse, HttpResponseNotModified
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce, NullIf, Replace
 from users.models import User
 from exercises.models import UserFolder, ClubFolder, AdminFolder, UserExercise, ClubExercise, AdminExercise, ExerciseVideo
 from exercises.models import UserExerciseParam, UserExerciseParamTeam
+from exercises.models import EXS_TITLE_LANGS, make_title_key
+import exercises.user_params as exs_user_params
+import exercises.nfb_library as nfb_library
+import exercises.versions as exs_versions
 from references.models import ExsGoal, ExsBall, ExsTeamCategory, ExsAgeCategory, ExsTrainPart, ExsCognitiveLoad
 from references.models import ExsKeyword, ExsStressType, ExsPurpose, ExsCoaching
 from references.models import ExsCategory, ExsAdditionalData, ExsTitleName
 from references.models import UserSeason, ClubSeason, UserTeam, ClubTeam
 from video.models import Video
-from nanofootball.views import util_check_access
+from api.permissions import util_check_access
+from api.queries import get_one_or_none, get_scoped_one, get_object_values
 from video.views import delete_video_obj_nf
 from trainings.models import UserTraining, ClubTraining
+from api.responses import ApiJsonResponse, get_list_response
+import api.concurrency as concurrency
+import api.languages as languages
 
 
 LANG_CODE_DEFAULT = "en"
 FOLDER_TEAM = "team_folders"
 FOLDER_NFB = "nfb_folders"
 FOLDER_CLUB = "club_folders"
+EXERCISES_CHUNK_SIZE = 500
+EXERCISES_PAGE_SIZE_MAX = 500
+EXS_TRIM_DROP_KEYS = ['title_for_sort'] + [f"title_key_{lang_code}" for lang_code in EXS_TITLE_LANGS]
+EXS_NEW_DAYS = 15
+EXS_FACETS_FIELDS = {
+    'goal': "ref_goal_id",
+    'ball': "ref_ball_id",
+    'team_category': "ref_team_category_id",
+    'age_category': "ref_age_category_id",
+}
+EXS_FACETS_KEY_PREFIX = "exs_facets"
+EXS_FACETS_TIMEOUT_DEFAULT = 10 * 60
 
 
 
@@ -128,11 +157,7 @@ def set_value_as_ref(request, name, def_value = None):
         res = ExsTrainPart.objects.filter(id=ref_id)
     elif name == "data[ref_cognitive_load]":
         res = ExsCognitiveLoad.objects.filter(id=ref_id)
-    if res and res.exists() and res[0].id != None:
-        res = res[0]
-    else:
-        res = None
-    return res
+    return get_one_or_none(res)
 
 
 def set_value_as_list(request, name, name2 = None, def_value = None):
@@ -223,6 +248,31 @@ def set_as_object(request, data, name, lang):
     return data
 
 
+def get_title_sort_expression(lang_code):
+    """
+    Return database expression for sorting exercises by title. For languages from EXS_TITLE_LANGS
+    indexed column "title_key_<lang>" is used, it is kept by AbstractExercise.save().
+    For other languages title is taken from JSON by current language's code with fallback to LANG_CODE_DEFAULT, spaces are removed.
+
+    :param lang_code: String key of any language. For example: "engilsh" -> "en", "russian" -> "ru".
+    :type lang_code: [str]
+    :return: Expression for annotate() or order_by().
+    :rtype: [Expression]
+
+    """
+    if lang_code in EXS_TITLE_LANGS:
+        return F(f"title_key_{lang_code}")
+    return Replace(
+        Coalesce(
+            NullIf(KeyTextTransform(lang_code, 'title'), Value("")),
+            KeyTextTransform(LANG_CODE_DEFAULT, 'title'),
+            Value("")
+        ),
+        Value(" "),
+        Value("")
+    )
+
+
 def get_exercises_params(request, user, team):
     """
     Return data of User folders, NFB Folders, References.
@@ -230,7 +280,7 @@ def get_exercises_params(request, user, team):
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
     :param user: The current user of the system, who is currently authorized.
-    :type user: <QuerySet>Model.object[User], not only ONE (Use Models.objects.filter NOT Models.objects.get to get user).
+    :type user: Model.object[User] or None
     :param team: The current team, that is selected by the user.
     :type team: [int]
     :return: List of three elements: Folders, NFB Folders, References.
@@ -241,8 +291,8 @@ def get_exercises_params(request, user, team):
     club_folders = []
     nfb_folders = []
     refs = {}
-    if user.exists() and user[0].id != None:
-        if util_check_access(user[0], {
+    if user is not None:
+        if util_check_access(user, {
             'perms_user': ["exercises.view_userfolder"], 
             'perms_club': ["exercises.view_clubfolder"]
         }):
@@ -250,25 +300,13 @@ def get_exercises_params(request, user, team):
                 folders = ClubFolder.objects.filter(club=request.user.club_id, visible=True).values()
                 club_folders = ClubFolder.objects.filter(club=request.user.club_id, visible=True).values()
             else:
-                folders = UserFolder.objects.filter(user=user[0], team=team, visible=True).values()
-    nfb_folders = AdminFolder.objects.filter(visible=True).values()
+                folders = UserFolder.objects.filter(user=user, team=team, visible=True).values()
+    library = nfb_library.get_snapshot()
+    nfb_folders = [dict(elem) for elem in library.folders]
     for elem in folders:
         elem['root'] = False if elem['parent'] and elem['parent'] != 0 else True
-    for elem in nfb_folders:
-        elem['root'] = False if elem['parent'] and elem['parent'] != 0 else True
-    refs['exs_goal'] = ExsGoal.objects.filter().values()
-    refs['exs_ball'] = ExsBall.objects.filter().values()
-    refs['exs_team_category'] = ExsTeamCategory.objects.filter().values()
-    refs['exs_age_category'] = ExsAgeCategory.objects.filter().values()
-    refs['exs_train_part'] = ExsTrainPart.objects.filter().values()
-    refs['exs_cognitive_load'] = ExsCognitiveLoad.objects.filter().values()
-    refs['exs_additional_data'] = ExsAdditionalData.objects.filter().values()
-    refs['exs_keyword'] = ExsKeyword.objects.filter().values()
-    refs['exs_stress_type'] = ExsStressType.objects.filter().values()
-    refs['exs_purpose'] = ExsPurpose.objects.filter().values()
-    refs['exs_coaching'] = ExsCoaching.objects.filter().values()
-    refs['exs_category'] = ExsCategory.objects.filter().values()
-    refs['exs_title_names'] = ExsTitleName.objects.filter().values()
+    # references are read from snapshot of library instead of query for each table.
+    refs = library.get_refs()
     refs = set_refs_translations(refs, request.LANGUAGE_CODE)
     return [folders, club_folders, nfb_folders, refs]
 
@@ -339,7 +377,7 @@ def get_exs_animation_data(data):
     return res
 
 
-def get_exs_video_data2(data, exs, folder_type, club_id):
+def get_exs_video_data2(data, exs, folder_type, club_id, videos=None):
     """
     Return changed data with fields: "video_1", "video_2", "animation_1", "animation_2".
     Exercise has linked videos. Using exercise object and folder's type function add these new keys.
@@ -350,17 +388,20 @@ def get_exs_video_data2(data, exs, folder_type, club_id):
     :type exs: Model.object[UserExercise] or Model.object[ClubExercise] or Model.object[AdminExercise].
     :param folder_type: The current folder, that is selected by the user.
     :type folder_type: [str]
+    :param videos: Already loaded linked videos. If it is None then videos are loaded by exercise.
+    :type videos: list[Model.object[ExerciseVideo]] or None
     :return: Updated exercise.
     :rtype: Model.Field[object]
 
     """
-    videos = []
-    if folder_type == FOLDER_NFB:
-        videos = exs.videos.through.objects.filter(exercise_nfb=exs)
-    elif folder_type == FOLDER_TEAM and club_id is None:
-        videos = exs.videos.through.objects.filter(exercise_user=exs)
-    elif folder_type == FOLDER_CLUB or folder_type == FOLDER_TEAM and club_id is not None:
-        videos = exs.videos.through.objects.filter(exercise_club=exs)
+    if videos is None:
+        videos = []
+        if folder_type == FOLDER_NFB:
+            videos = exs.videos.through.objects.filter(exercise_nfb=exs)
+        elif folder_type == FOLDER_TEAM and club_id is None:
+            videos = exs.videos.through.objects.filter(exercise_user=exs)
+        elif folder_type == FOLDER_CLUB or folder_type == FOLDER_TEAM and club_id is not None:
+            videos = exs.videos.through.objects.filter(exercise_club=exs)
     for video in videos:
         t_key = ""
         if video.type == 1:
@@ -378,27 +419,82 @@ def get_exs_video_data2(data, exs, folder_type, club_id):
     return data
 
 
-def get_excerises_data(folder_id = -1, folder_type = "", req = None, cur_user = None, cur_team = None):
+def set_exs_media_flags(exercise):
     """
-    Return list of exercise objects. If filter options exist then current list will be filtered.
-    Filter options are defined via next parameters of request: filter["filter_name"].
+    Set flags "has_video_1", "has_video_2", "has_animation_1", "has_animation_2" of exercise by its video and animation data.
+
+    :param exercise: Exercise object with keys "video_data" and "animation_data".
+    :type exercise: dict[str]
+
+    """
+    exercise['has_video_1'] = False
+    exercise['has_video_2'] = False
+    exercise['has_animation_1'] = False
+    exercise['has_animation_2'] = False
+    videos_arr = get_exs_video_data(exercise['video_data'])
+    anims_arr = get_exs_video_data(exercise['animation_data'])
+    if isinstance(anims_arr, dict):
+        anims_arr = anims_arr['default']
+    if len(videos_arr) == 2:
+        if videos_arr[0] != -1:
+            exercise['has_video_1'] = True
+        if videos_arr[1] != -1:
+            exercise['has_video_2'] = True
+    if len(anims_arr) == 2:
+        if anims_arr[0] != -1:
+            exercise['has_animation_1'] = True
+        if anims_arr[1] != -1:
+            exercise['has_animation_2'] = True
+
+
+def set_exs_user_status(exercise, user_params):
+    """
+    Set user's flags of exercise and statuses "watched_status" (any existing video or animation is watched)
+    and "favorite_status". Media flags have to be set by set_exs_media_flags().
+
+    :param exercise: Exercise object.
+    :type exercise: dict[str]
+    :param user_params: User's params of exercise or None.
+    :type user_params: dict[str] or None
+
+    """
+    if user_params is not None:
+        exercise['favorite'] = user_params['favorite']
+        exercise['video_1_watched'] = user_params['video_1_watched']
+        exercise['video_2_watched'] = user_params['video_2_watched']
+        exercise['animation_1_watched'] = user_params['animation_1_watched']
+        exercise['animation_2_watched'] = user_params['animation_2_watched']
+    watched_status = 0
+    if 'video_1_watched' in exercise:
+        if exercise['has_video_1'] and exercise['video_1_watched']:
+            watched_status = 1
+    if 'video_2_watched' in exercise:
+        if exercise['has_video_2'] and exercise['video_2_watched']:
+            watched_status = 1
+    if 'animation_1_watched' in exercise:
+        if exercise['has_animation_1'] and exercise['animation_1_watched']:
+            watched_status = 1
+    if 'animation_2_watched' in exercise:
+        if exercise['has_animation_2'] and exercise['animation_2_watched']:
+            watched_status = 1
+    favorite_status = 0
+    if 'favorite' in exercise:
+        favorite_status = 1 if exercise['favorite'] else 0
+    exercise['watched_status'] = watched_status
+    exercise['favorite_status'] = favorite_status
+
+
+def get_exercises_filters(req):
+    """
+    Return filter options of exercises' list from request's parameters filter["filter_name"].
+    Value -1 (or "" for search) means that filter isn't used.
 
-    :param folder_id: Folder's ID.
-    :type folder_id: [int]
-    :param folder_type: The current folder, that is selected by the user.
-    :type folder_type: [str]
     :param req: Django HttpRequest.
-    :type req: [HttpRequest] or None
-    :param cur_user: The current user of the system, who is currently authorized.
-    :type cur_user: Model.object[User] or None
-    :param cur_team: The current team, that is selected by the user.
-    :type cur_team: [int]
-    :return: List of filtered exercises (as objects).
-    :rtype: list[object]
+    :type req: [HttpRequest]
+    :return: Dictionary with keys "goal", "ball", "watched", "favorite", "new_exs", "search".
+    :rtype: dict[str]
 
     """
-    def days_between(date):
-        return abs((datetime.date.today() - date).days)
     filter_goal = -1
     filter_ball = -1
     filter_watched = -1
@@ -447,22 +543,44 @@ def get_excerises_data(folder_id = -1, folder_type = "", req = None, cur_user =
             filter_search = req.POST.get("filter[_search]", "")
     except:
         pass
+    return {
+        'goal': filter_goal,
+        'ball': filter_ball,
+        'watched': filter_watched,
+        'favorite': filter_favorite,
+        'new_exs': filter_new_exs,
+        'search': filter_search,
+    }
+
+
+def get_folder_exercises(folder_id, folder_type, req, cur_team):
+    """
+    Return queryset of exercises in folder or in its children if folder has children.
+
+    :param folder_id: Folder's ID.
+    :type folder_id: [int]
+    :param folder_type: The current folder, that is selected by the user.
+    :type folder_type: [str]
+    :param req: Django HttpRequest.
+    :type req: [HttpRequest]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: Queryset of exercises or None if folder isn't found.
+    :rtype: [QuerySet] or None
 
+    """
     f_exercises = []
     c_folder = None
     child_folders = None
     if folder_type == FOLDER_TEAM:
+        c_folder = get_scoped_one(req, UserFolder, ClubFolder, None, {'club': req.user.club_id}, id=folder_id)
+        if c_folder is None:
+            # return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=200)
+            return None
         if req.user.club_id is not None:
-            c_folder = ClubFolder.objects.filter(id=folder_id, club=req.user.club_id)
-        else:
-            c_folder = UserFolder.objects.filter(id=folder_id)
-        if not c_folder.exists() or c_folder[0].id == None:
-            # return JsonResponse({"err": "Folder not found.", "success": False}, status=200)
-            return []
-        if req.user.club_id is not None:
-            child_folders = ClubFolder.objects.filter(parent=c_folder[0].id, club=req.user.club_id)
+            child_folders = ClubFolder.objects.filter(parent=c_folder.id, club=req.user.club_id)
         else:
-            child_folders = UserFolder.objects.filter(parent=c_folder[0].id)
+            child_folders = UserFolder.objects.filter(parent=c_folder.id)
         if child_folders.count() > 0:
             if req.user.club_id is not None:
                 f_exercises = ClubExercise.objects.filter(folder__in = child_folders, team=cur_team)
@@ -470,107 +588,413 @@ def get_excerises_data(folder_id = -1, folder_type = "", req = None, cur_user =
                 f_exercises = UserExercise.objects.filter(folder__in = child_folders)
         else:
             if req.user.club_id is not None:
-                f_exercises = ClubExercise.objects.filter(folder = c_folder[0], team=cur_team)
+                f_exercises = ClubExercise.objects.filter(folder = c_folder, team=cur_team)
             else:
-                f_exercises = UserExercise.objects.filter(folder = c_folder[0])
+                f_exercises = UserExercise.objects.filter(folder = c_folder)
     elif folder_type == FOLDER_NFB:
-        c_folder = AdminFolder.objects.filter(id=folder_id)
-        if not c_folder.exists() or c_folder[0].id == None:
-            # return JsonResponse({"err": "Folder not found.", "success": False}, status=200)
-            return []
-        child_folders = AdminFolder.objects.filter(parent=c_folder[0].id)
-        if child_folders.count() > 0:
-            f_exercises = AdminExercise.objects.filter(folder__in = child_folders)
-        else:
-            f_exercises = AdminExercise.objects.filter(folder = c_folder[0])
+        folder_ids = nfb_library.get_snapshot().get_folder_ids(folder_id)
+        if len(folder_ids) == 0:
+            # return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=200)
+            return None
+        f_exercises = AdminExercise.objects.filter(folder__in = folder_ids)
     elif folder_type == FOLDER_CLUB:
         if req.user.club_id is not None:
-            c_folder = ClubFolder.objects.filter(id=folder_id, club=req.user.club_id)
-            if not c_folder.exists() or c_folder[0].id == None:
-                # return JsonResponse({"err": "Folder not found.", "success": False}, status=200)
-                return []
-            child_folders = ClubFolder.objects.filter(parent=c_folder[0].id, club=req.user.club_id)
+            c_folder = get_one_or_none(ClubFolder.objects.filter(id=folder_id, club=req.user.club_id))
+            if c_folder is None:
+                # return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=200)
+                return None
+            child_folders = ClubFolder.objects.filter(parent=c_folder.id, club=req.user.club_id)
             if child_folders.count() > 0:
                 f_exercises = ClubExercise.objects.filter(folder__in = child_folders)
             else:
-                f_exercises = ClubExercise.objects.filter(folder = c_folder[0])
-    f_exercises = [entry for entry in f_exercises.values()]
-    for exercise in f_exercises:
-        exercise['search_title'] = get_by_language_code(exercise['title'], req.LANGUAGE_CODE).lower()
-        exercise['has_video_1'] = False
-        exercise['has_video_2'] = False
-        exercise['has_animation_1'] = False
-        exercise['has_animation_2'] = False
-        videos_arr = get_exs_video_data(exercise['video_data'])
-        anims_arr = get_exs_video_data(exercise['animation_data'])
-        if isinstance(anims_arr, dict):
-            anims_arr = anims_arr['default']
-        if len(videos_arr) == 2:
-            if videos_arr[0] != -1:
-                exercise['has_video_1'] = True
-            if videos_arr[1] != -1:
-                exercise['has_video_2'] = True
-        if len(anims_arr) == 2:
-            if anims_arr[0] != -1:
-                exercise['has_animation_1'] = True
-            if anims_arr[1] != -1:
-                exercise['has_animation_2'] = True
-        user_params = None
+                f_exercises = ClubExercise.objects.filter(folder = c_folder)
+    if not isinstance(f_exercises, QuerySet):
+        return None
+    return f_exercises
+
+
+def filter_exercises(f_exercises, req, filters, exclude=()):
+    """
+    Return queryset with goal, ball, "new" and search filters. Search finds titles, which start with search's text.
+    It is applied in the database for languages from EXS_TITLE_LANGS by prefix of indexed column "title_key_<lang>"
+    (LIKE 'text%' uses index, unlike LIKE '%text%'), for other languages search's text is returned for checking in Python.
+
+    :param f_exercises: Queryset of exercises.
+    :type f_exercises: [QuerySet]
+    :param req: Django HttpRequest.
+    :type req: [HttpRequest]
+    :param filters: Filter options, check get_exercises_filters().
+    :type filters: dict[str]
+    :param exclude: Names of filters, which aren't applied, for example: ["goal"] for goal's facet.
+    :type exclude: list[str]
+    :return: Filtered queryset and search's text in lower case or "" if search is applied in the database.
+    :rtype: tuple[QuerySet, str]
+
+    """
+    if filters['goal'] != -1 and "goal" not in exclude:
+        f_exercises = f_exercises.filter(ref_goal_id=filters['goal'])
+    if filters['ball'] != -1 and "ball" not in exclude:
+        f_exercises = f_exercises.filter(ref_ball_id=filters['ball'])
+    if filters['new_exs'] != -1 and "new_exs" not in exclude:
+        f_exercises = f_exercises.filter(date_creation__gt=get_exs_new_date())
+    filter_search = filters['search'].lower()
+    if filter_search != "" and req.LANGUAGE_CODE in EXS_TITLE_LANGS:
+        f_exercises = f_exercises.filter(**{f"title_key_{req.LANGUAGE_CODE}__startswith": make_title_key({req.LANGUAGE_CODE: filter_search}, req.LANGUAGE_CODE)})
+        filter_search = ""
+    return f_exercises, filter_search
+
+
+def iter_exercises_data(folder_id = -1, folder_type = "", req = None, cur_user = None, cur_team = None, after = None, chunk_size = EXERCISES_CHUNK_SIZE):
+    """
+    Return generator of exercise objects sorted by title. If filter options exist then exercises will be filtered.
+    Filter options are defined via next parameters of request: filter["filter_name"].
+    Exercises are read by chunks from queryset, goal, ball, "new" and search filters are applied in the database.
+    If <after> is set then exercises start after this position of sorting (keyset pagination).
+    User's flags (favorite, watched) are taken from cached per-user arrays instead of query for each exercise.
+
+    :param folder_id: Folder's ID.
+    :type folder_id: [int]
+    :param folder_type: The current folder, that is selected by the user.
+    :type folder_type: [str]
+    :param req: Django HttpRequest.
+    :type req: [HttpRequest] or None
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User] or None
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param after: Title's sorting key and ID of the last exercise of previous page. Check decode_exs_cursor().
+    :type after: tuple[str, int] or None
+    :param chunk_size: Amount of exercises read from the database by one chunk.
+    :type chunk_size: [int]
+    :return: Generator of filtered exercises (as objects).
+    :rtype: generator[object]
+
+    """
+    filters = get_exercises_filters(req)
+    filter_watched = filters['watched']
+    filter_favorite = filters['favorite']
+    f_exercises = get_folder_exercises(folder_id, folder_type, req, cur_team)
+    if f_exercises is None:
+        return
+    f_exercises, filter_search = filter_exercises(f_exercises, req, filters)
+    f_exercises = f_exercises.annotate(title_for_sort=get_title_sort_expression(req.LANGUAGE_CODE)).order_by('title_for_sort', 'id')
+    if after is not None:
+        f_exercises = f_exercises.filter(Q(title_for_sort__gt=after[0]) | Q(title_for_sort=after[0], id__gt=after[1]))
+    exs_field = get_exs_params_field(req, folder_type)
+    user_flags = exs_user_params.get_user_flags(cur_user.id, exs_field)
+    for exercise in f_exercises.values().iterator(chunk_size=chunk_size):
+        if filter_search != "":
+            exercise['search_title'] = get_by_language_code(exercise['title'], req.LANGUAGE_CODE).lower()
+        set_exs_media_flags(exercise)
+        if folder_type == FOLDER_NFB and cur_user.is_superuser:
+            notes = get_one_or_none(UserExerciseParamTeam.objects.filter(exercise_nfb=exercise['id']).only('id', 'note'))
+            if notes is not None:
+                notes = notes.note
+                if notes and req.LANGUAGE_CODE in notes and notes[req.LANGUAGE_CODE] and len(notes[req.LANGUAGE_CODE]) > 0:
+                    exercise['has_notes'] = True
+        user_params = exs_user_params.get_flags_params(user_flags, exercise['id'])
+        user_params = exs_user_params.get_user_params(user_params, cur_user.id, exs_field, exercise['id'])
+        set_exs_user_status(exercise, user_params)
+        if filter_watched != -1 and exercise['watched_status'] != filter_watched:
+            continue
+        if filter_favorite != -1 and exercise['favorite_status'] != filter_favorite:
+            continue
+        if filter_search != "" and not exercise['search_title'].startswith(filter_search):
+            continue
+        yield exercise
+
+
+def get_excerises_data(folder_id = -1, folder_type = "", req = None, cur_user = None, cur_team = None):
+    """
+    Return list of exercise objects. If filter options exist then current list will be filtered.
+    Check iter_exercises_data() for more information.
+
+    :return: List of filtered exercises (as objects).
+    :rtype: list[object]
+
+    """
+    return list(iter_exercises_data(folder_id, folder_type, req, cur_user, cur_team))
+
+
+def iter_exs_list_data(request, found_exercises, folder_type):
+    """
+    Return generator of short exercise objects for exercises' list. Exercises come already sorted by title.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param found_exercises: Exercises from iter_exercises_data().
+    :type found_exercises: generator[object]
+    :param folder_type: The current folder, that is selected by the user.
+    :type folder_type: [str]
+    :return: Generator of exercise objects.
+    :rtype: generator[object]
+
+    """
+    goal_codes = nfb_library.get_snapshot().goal_codes
+    for exercise in found_exercises:
+        exs_title = get_by_language_code(exercise['title'], request.LANGUAGE_CODE)
+        exs_data = {
+            'id': exercise['id'], 
+            'folder': exercise['folder_id'], 
+            'title': exs_title if isinstance(exs_title, str) else "",
+            'has_video_1': exercise['has_video_1'],
+            'has_video_2': exercise['has_video_2'],
+            'has_animation_1': exercise['has_animation_1'],
+            'has_animation_2': exercise['has_animation_2']
+        }
         if folder_type == FOLDER_TEAM:
-            if req.user.club_id is not None:
-                user_params = UserExerciseParam.objects.filter(exercise_club=exercise['id'], user=cur_user)
-            else:
-                user_params = UserExerciseParam.objects.filter(exercise_user=exercise['id'], user=cur_user)
+            exs_data['user'] = exercise['user_id']
         elif folder_type == FOLDER_NFB:
-            user_params = UserExerciseParam.objects.filter(exercise_nfb=exercise['id'], user=cur_user)
-            if cur_user.is_superuser:
-                notes = UserExerciseParamTeam.objects.filter(exercise_nfb=exercise['id']).only('id', 'note')
-                if notes.exists() and notes[0].id != None:
-                    notes = notes[0].note
-                    if notes and req.LANGUAGE_CODE in notes and notes[req.LANGUAGE_CODE] and len(notes[req.LANGUAGE_CODE]) > 0:
-                        exercise['has_notes'] = True
+            exs_data['user'] = "NFB"
         elif folder_type == FOLDER_CLUB:
-            user_params = UserExerciseParam.objects.filter(exercise_club=exercise['id'], user=cur_user)
-        if user_params != None and user_params.exists() and user_params[0].id != None:
-            user_params = user_params.values()[0]
-            exercise['favorite'] = user_params['favorite']
-            exercise['video_1_watched'] = user_params['video_1_watched']
-            exercise['video_2_watched'] = user_params['video_2_watched']
-            exercise['animation_1_watched'] = user_params['animation_1_watched']
-            exercise['animation_2_watched'] = user_params['animation_2_watched']
-        watched_status = 0
-        if 'video_1_watched' in exercise:
-            if exercise['has_video_1'] and exercise['video_1_watched']:
-                watched_status = 1
-        if 'video_2_watched' in exercise:
-            if exercise['has_video_2'] and exercise['video_2_watched']:
-                watched_status = 1
-        if 'animation_1_watched' in exercise:
-            if exercise['has_animation_1'] and exercise['animation_1_watched']:
-                watched_status = 1
-        if 'animation_2_watched' in exercise:
-            if exercise['has_animation_2'] and exercise['animation_2_watched']:
-                watched_status = 1
-        favorite_status = 0
-        if 'favorite' in exercise:
-            favorite_status = 1 if exercise['favorite'] else 0
-        exercise['watched_status'] = watched_status
-        exercise['favorite_status'] = favorite_status
-
-    if filter_goal != -1:
-        f_exercises = list(filter(lambda c: c['ref_goal_id'] == filter_goal, f_exercises))
-    if filter_ball != -1:
-        f_exercises = list(filter(lambda c: c['ref_ball_id'] == filter_ball, f_exercises))
-    if filter_watched != -1:
-        f_exercises = list(filter(lambda c: c['watched_status'] == filter_watched, f_exercises))
-    if filter_favorite != -1:
-        f_exercises = list(filter(lambda c: c['favorite_status'] == filter_favorite, f_exercises))
-    if filter_new_exs != -1:
-        f_exercises = list(filter(lambda c: days_between(c['date_creation']) < 15, f_exercises))
+            pass
+        exs_data['favorite'] = exercise['favorite'] if 'favorite' in exercise else None
+        exs_data['video_1_watched'] = exercise['video_1_watched'] if 'video_1_watched' in exercise else None
+        exs_data['video_2_watched'] = exercise['video_2_watched'] if 'video_2_watched' in exercise else None
+        exs_data['animation_1_watched'] = exercise['animation_1_watched'] if 'animation_1_watched' in exercise else None
+        exs_data['animation_2_watched'] = exercise['animation_2_watched'] if 'animation_2_watched' in exercise else None
+        exs_data['goal_code'] = goal_codes.get(exercise['ref_goal_id'])
+        exs_data['ball_val'] = exercise['ref_ball_id']
+        exs_data['has_notes'] = exercise['has_notes'] if 'has_notes' in exercise else None
+        exs_data['title_for_sort'] = exercise['title_for_sort']
+        yield exs_data
+
+
+def encode_exs_cursor(exercise, lang_code):
+    """
+    Return cursor of exercises' page, which points to position after given exercise.
+
+    :param exercise: Exercise object from iter_exs_list_data().
+    :type exercise: dict[str]
+    :param lang_code: The current language's code, sorting key depends on it.
+    :type lang_code: [str]
+    :return: Cursor as URL-safe string.
+    :rtype: [str]
+
+    """
+    value = json.dumps([lang_code, exercise['title_for_sort'], exercise['id']])
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_exs_cursor(cursor, lang_code):
+    """
+    Return title's sorting key and exercise's ID from cursor or None if cursor is wrong
+    or was created for another language.
+
+    :param cursor: Cursor from encode_exs_cursor().
+    :type cursor: [str]
+    :param lang_code: The current language's code.
+    :type lang_code: [str]
+    :return: Title's sorting key and exercise's ID.
+    :rtype: tuple[str, int] or None
+
+    """
+    try:
+        c_lang, c_key, c_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if c_lang != lang_code:
+            return None
+        return (str(c_key), int(c_id))
+    except:
+        return None
+
+
+def get_exs_page_params(request):
+    """
+    Return page's size and cursor of request. Page's size is 0 if pagination isn't used.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Page's size and cursor (empty string for the first page).
+    :rtype: tuple[int, str]
+
+    """
+    limit = 0
+    try:
+        limit = int(request.GET.get("limit", 0))
+    except:
+        pass
+    limit = max(0, min(limit, EXERCISES_PAGE_SIZE_MAX))
+    return limit, request.GET.get("cursor", "")
+
+
+def get_exs_list_page(request, cur_user, cur_team, folder_id, folder_type, limit, after):
+    """
+    Return one page of exercises' list and cursor of the next page. Only <limit> + 1 exercises are read,
+    so the first page doesn't wait for the whole folder.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param folder_id: Folder's ID.
+    :type folder_id: [int]
+    :param folder_type: The current folder, that is selected by the user.
+    :type folder_type: [str]
+    :param limit: Page's size.
+    :type limit: [int]
+    :param after: Position after the previous page or None for the first page.
+    :type after: tuple[str, int] or None
+    :return: List of exercise objects and cursor of the next page or None if it is the last page.
+    :rtype: tuple[list[object], [str] or None]
+
+    """
+    found_exercises = iter_exercises_data(folder_id, folder_type, request, cur_user, cur_team, after, min(limit + 1, EXERCISES_CHUNK_SIZE))
+    exs_data = iter_exs_list_data(request, found_exercises, folder_type)
+    page = list(itertools.islice(exs_data, limit + 1))
+    exs_data.close()
+    found_exercises.close()
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_exs_cursor(page[-1], request.LANGUAGE_CODE)
+    return page, next_cursor
+
+
+def get_exs_new_date():
+    """
+    Return date after which exercise is "new" for filter "new_exs".
+
+    :return: Date.
+    :rtype: [date]
+
+    """
+    return datetime.date.today() - datetime.timedelta(days=EXS_NEW_DAYS)
+
+
+def check_exs_filters(exercise, filters, exclude=()):
+    """
+    Check goal, ball and "new" filters for exercise loaded by queryset.values(), like filter_exercises() does in the database.
+
+    :param exercise: Exercise object with keys "ref_goal_id", "ref_ball_id" and "date_creation".
+    :type exercise: dict[str]
+    :param filters: Filter options, check get_exercises_filters().
+    :type filters: dict[str]
+    :param exclude: Names of filters, which aren't checked.
+    :type exclude: list[str]
+    :return: True if exercise passes filters.
+    :rtype: [bool]
+
+    """
+    if filters['goal'] != -1 and "goal" not in exclude and exercise['ref_goal_id'] != filters['goal']:
+        return False
+    if filters['ball'] != -1 and "ball" not in exclude and exercise['ref_ball_id'] != filters['ball']:
+        return False
+    if filters['new_exs'] != -1 and "new_exs" not in exclude and exercise['date_creation'] <= get_exs_new_date():
+        return False
+    return True
+
+
+def get_exs_facets_version(request, cur_user, folder_type, exs_field):
+    """
+    Return version of data, which facets of exercises' list are built from: NFB library's version or version
+    of user's (club's) exercises and folders, and version of user's flags.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param folder_type: The current folder's type.
+    :type folder_type: [str]
+    :param exs_field: Exercise's field of UserExerciseParam, check get_exs_params_field().
+    :type exs_field: [str]
+    :return: Version.
+    :rtype: [str]
+
+    """
+    if folder_type == FOLDER_NFB:
+        exs_version = nfb_library.get_version()
+    else:
+        exs_version = exs_versions.get_version(exs_versions.get_owner_scope(cur_user.id, request.user.club_id_id))
+    return f"{exs_version}.{exs_user_params.get_flags_version(cur_user.id, exs_field)}"
+
+
+def get_exs_facets(request, cur_user, cur_team, folder_id, folder_type):
+    """
+    Return counts of exercises in folder (or in its children) for each value of goal, ball, team's category
+    and age's category, for watched and favorite statuses and for "new" exercises. Counts take into account
+    all active filters except filter of the facet itself, so client shows how many exercises each choice gives.
+    References' facets are counted by grouped queries in the database. User's statuses depend on media data
+    and user's flags, so they are counted in Python by one query of exercises' projections.
+    Result is cached for settings.EXS_FACETS_TIMEOUT seconds by user, folder, filters and data's version,
+    check get_exs_facets_version().
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param folder_id: Folder's ID.
+    :type folder_id: [int]
+    :param folder_type: The current folder, that is selected by the user.
+    :type folder_type: [str]
+    :return: Facets or None if folder isn't found.
+    :rtype: dict[str] or None
+
+    """
+    filters = get_exercises_filters(request)
+    exs_field = get_exs_params_field(request, folder_type)
+    key_data = [
+        cur_user.id, request.user.club_id_id, cur_team, folder_id, folder_type, request.LANGUAGE_CODE, filters,
+        get_exs_facets_version(request, cur_user, folder_type, exs_field),
+    ]
+    cache_key = f"{EXS_FACETS_KEY_PREFIX}:{hashlib.md5(json.dumps(key_data).encode()).hexdigest()}"
+    facets = cache.get(cache_key)
+    if facets is not None:
+        return facets
+    f_exercises = get_folder_exercises(folder_id, folder_type, request, cur_team)
+    if f_exercises is None:
+        return None
+    search_exercises, filter_search = filter_exercises(f_exercises, request, filters, exclude=("goal", "ball", "new_exs"))
+    fields = ['id', 'ref_goal_id', 'ref_ball_id', 'date_creation', 'video_data', 'animation_data']
     if filter_search != "":
-        filter_search = filter_search.lower()
-        f_exercises = list(filter(lambda c: filter_search in c['search_title'], f_exercises))
-    return f_exercises
+        fields.append('title')
+    user_flags = exs_user_params.get_user_flags(cur_user.id, exs_field)
+    watched = [0, 0]
+    favorite = [0, 0]
+    new_exs = 0
+    total = 0
+    status_ids = []
+    for exercise in search_exercises.values(*fields).order_by().iterator(chunk_size=EXERCISES_CHUNK_SIZE):
+        if filter_search != "" and not get_by_language_code(exercise['title'], request.LANGUAGE_CODE).lower().startswith(filter_search):
+            continue
+        set_exs_media_flags(exercise)
+        user_params = exs_user_params.get_flags_params(user_flags, exercise['id'])
+        user_params = exs_user_params.get_user_params(user_params, cur_user.id, exs_field, exercise['id'])
+        set_exs_user_status(exercise, user_params)
+        watched_passed = filters['watched'] == -1 or exercise['watched_status'] == filters['watched']
+        favorite_passed = filters['favorite'] == -1 or exercise['favorite_status'] == filters['favorite']
+        if watched_passed and favorite_passed:
+            status_ids.append(exercise['id'])
+        if not check_exs_filters(exercise, filters, exclude=("new_exs",)):
+            continue
+        if watched_passed and favorite_passed and exercise['date_creation'] > get_exs_new_date():
+            new_exs += 1
+        if not check_exs_filters(exercise, filters):
+            continue
+        if favorite_passed:
+            watched[exercise['watched_status']] += 1
+        if watched_passed:
+            favorite[exercise['favorite_status']] += 1
+        if watched_passed and favorite_passed:
+            total += 1
+    # statuses and search in Python can't be grouped in the database, so facets' queries are limited by found IDs.
+    check_ids = filter_search != "" or filters['watched'] != -1 or filters['favorite'] != -1
+    facets = {}
+    for name, field in EXS_FACETS_FIELDS.items():
+        facet_exercises, _ = filter_exercises(f_exercises, request, filters, exclude=(name,))
+        if check_ids:
+            facet_exercises = facet_exercises.filter(id__in=status_ids)
+        rows = facet_exercises.values(field).annotate(count=Count('id')).order_by(field)
+        facets[name] = [{'id': row[field], 'count': row['count']} for row in rows]
+    facets['watched'] = {"0": watched[0], "1": watched[1]}
+    facets['favorite'] = {"0": favorite[0], "1": favorite[1]}
+    facets['new_exs'] = new_exs
+    facets['total'] = total
+    cache.set(cache_key, facets, getattr(settings, "EXS_FACETS_TIMEOUT", EXS_FACETS_TIMEOUT_DEFAULT))
+    return facets
 
 
 def check_video(id):
@@ -583,10 +1007,154 @@ def check_video(id):
     :rtype: Model.object[Video]
 
     """
-    f_video = Video.objects.filter(id=id)
-    if f_video.exists() and f_video[0].id != None:
-        return f_video[0]
-    return None
+    return get_one_or_none(Video.objects.filter(id=id))
+
+
+def get_exs_params_field(request, folder_type):
+    """
+    Return exercise's field of UserExerciseParam for folder's type.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param folder_type: The current folder's type.
+    :type folder_type: [str]
+    :return: Field's name, for example: "exercise_user".
+    :rtype: [str]
+
+    """
+    if folder_type == FOLDER_NFB:
+        return "exercise_nfb"
+    if folder_type == FOLDER_TEAM and request.user.club_id is None:
+        return "exercise_user"
+    return "exercise_club"
+
+
+def get_exs_one_querysets(request, cur_user, cur_team, folder_type, exs_id):
+    """
+    Return querysets for exercise's card: exercise, user's params, team's params and linked videos.
+    Querysets depend only on exercise's ID, so they can be evaluated independently, even concurrently.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param folder_type: The current folder's type: FOLDER_TEAM, FOLDER_NFB or FOLDER_CLUB.
+    :type folder_type: [str]
+    :param exs_id: Exercise's ID.
+    :type exs_id: [int]
+    :return: Dictionary with keys "exs", "user_params", "team_params", "videos" or None if folder's type is wrong.
+    :rtype: dict[str, QuerySet] or None
+
+    """
+    res = None
+    club_id = request.user.club_id
+    if folder_type == FOLDER_TEAM and club_id is None:
+        res = {
+            'exs': UserExercise.objects.filter(id=exs_id, visible=True, user=cur_user),
+            'user_params': UserExerciseParam.objects.filter(exercise_user=exs_id, user=cur_user),
+            'team_params': UserExerciseParamTeam.objects.filter(exercise_user=exs_id, team=cur_team),
+            'videos': ExerciseVideo.objects.filter(exercise_user=exs_id),
+        }
+    elif folder_type == FOLDER_TEAM or folder_type == FOLDER_CLUB:
+        c_exs = ClubExercise.objects.none()
+        if club_id is not None:
+            c_exs = ClubExercise.objects.filter(id=exs_id, visible=True, club=club_id)
+            if folder_type == FOLDER_TEAM:
+                c_exs = c_exs.filter(team=cur_team)
+        res = {
+            'exs': c_exs,
+            'user_params': UserExerciseParam.objects.filter(exercise_club=exs_id, user=cur_user),
+            'team_params': UserExerciseParamTeam.objects.filter(exercise_club=exs_id, team_club=cur_team),
+            'videos': ExerciseVideo.objects.filter(exercise_club=exs_id),
+        }
+    elif folder_type == FOLDER_NFB:
+        res = {
+            'exs': AdminExercise.objects.filter(id=exs_id, visible=True),
+            'user_params': UserExerciseParam.objects.filter(exercise_nfb=exs_id, user=cur_user),
+            'team_params': UserExerciseParamTeam.objects.filter(exercise_nfb=exs_id),
+            'videos': ExerciseVideo.objects.filter(exercise_nfb=exs_id),
+        }
+    if res is not None:
+        res['exs'] = res['exs'].select_related('folder')
+        res['user_params'] = res['user_params'].values()
+        res['team_params'] = res['team_params'].values()
+        res['videos'] = res['videos'].select_related('video')
+    return res
+
+
+def get_exs_one_data(request, c_exs, folder_type, user_params, team_params, videos):
+    """
+    Return exercise's card from already loaded exercise, user's params, team's params and videos.
+    Function doesn't send queries.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param c_exs: The current exercise with loaded folder.
+    :type c_exs: Model.object[UserExercise] or Model.object[ClubExercise] or Model.object[AdminExercise]
+    :param folder_type: The current folder's type.
+    :type folder_type: [str]
+    :param user_params: User's params of exercise or None.
+    :type user_params: dict[str] or None
+    :param team_params: Team's params of exercise or None.
+    :type team_params: dict[str] or None
+    :param videos: Linked videos with loaded video objects.
+    :type videos: list[Model.object[ExerciseVideo]]
+    :return: Exercise's data.
+    :rtype: dict[str]
+
+    """
+    res_exs = get_object_values(c_exs)
+    res_exs['nfb'] = folder_type == FOLDER_NFB
+    res_exs['folder_parent_id'] = c_exs.folder.parent
+    if folder_type != FOLDER_NFB:
+        res_exs['copied_from_nfb'] = c_exs.old_id != None
+    if user_params is not None:
+        res_exs['favorite'] = user_params['favorite']
+        res_exs['video_1_watched'] = user_params['video_1_watched']
+        res_exs['video_2_watched'] = user_params['video_2_watched']
+        res_exs['animation_1_watched'] = user_params['animation_1_watched']
+        res_exs['animation_2_watched'] = user_params['animation_2_watched']
+    if team_params is not None:
+        res_exs['additional_data'] = get_by_language_code(team_params['additional_data'], request.LANGUAGE_CODE)
+        res_exs['keyword'] = get_by_language_code(team_params['keyword'], request.LANGUAGE_CODE)
+        res_exs['stress_type'] = get_by_language_code(team_params['stress_type'], request.LANGUAGE_CODE)
+        res_exs['purposes'] = get_by_language_code(team_params['purpose'], request.LANGUAGE_CODE)
+        res_exs['coaching'] = get_by_language_code(team_params['coaching'], request.LANGUAGE_CODE)
+        res_exs['notes'] = get_by_language_code(team_params['note'], request.LANGUAGE_CODE)
+    res_exs['title'] = get_by_language_code(res_exs['title'], request.LANGUAGE_CODE)
+    res_exs['description'] = get_by_language_code(res_exs['description'], request.LANGUAGE_CODE)
+    res_exs['scheme_data'] = get_exs_scheme_data(res_exs['scheme_data'])
+    res_exs['video_data'] = get_exs_video_data(res_exs['video_data'])
+    res_exs['animation_data'] = get_exs_animation_data(res_exs['animation_data'])
+    res_exs['ref_goal'] = res_exs['ref_goal_id']
+    res_exs['ref_ball'] = res_exs['ref_ball_id']
+    res_exs['ref_team_category'] = res_exs['ref_team_category_id']
+    res_exs['ref_age_category'] = res_exs['ref_age_category_id']
+    res_exs['ref_train_part'] = res_exs['ref_train_part_id']
+    res_exs['ref_cognitive_load'] = res_exs['ref_cognitive_load_id']
+    res_exs = get_exs_video_data2(res_exs, c_exs, folder_type, getattr(c_exs, "club_id", None), videos)
+    return res_exs
+
+
+def get_shared_exs_data(request, c_exs):
+    """
+    Return exercise's card for public page of shared link. Card doesn't depend on request's user:
+    exercise is taken from link, user's and team's params aren't added.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param c_exs: Exercise of shared link.
+    :type c_exs: Model.object[UserExercise]
+    :return: Exercise's data or None if exercise is hidden.
+    :rtype: dict[str] or None
+
+    """
+    if not c_exs.visible:
+        return None
+    videos = list(ExerciseVideo.objects.filter(exercise_user=c_exs.id).select_related('video'))
+    return get_exs_one_data(request, c_exs, FOLDER_TEAM, None, None, videos)
 
 
 # --------------------------------------------------
@@ -622,7 +1190,7 @@ def POST_copy_exs(request, cur_user, cur_team):
         'perms_user': ["exercises.change_userexercise", "exercises.add_userexercise"], 
         'perms_club': ["exercises.change_clubexercise", "exercises.add_clubexercise"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
     if request.user.club_id is not None:
         found_folder = ClubFolder.objects.filter(id=folder_id, club=request.user.club_id)
     else:
@@ -631,25 +1199,24 @@ def POST_copy_exs(request, cur_user, cur_team):
     c_exs = None
     new_exs = None
     found_team = None
-    if request.user.club_id is not None:
-        found_team = ClubTeam.objects.filter(id=cur_team, club_id=request.user.club_id)
-    else:
-        found_team = UserTeam.objects.filter(id=cur_team, user_id=cur_user)
-    if not found_team or not found_team.exists() or found_team[0].id == None:
-        return JsonResponse({"err": "Cant find team.", "success": False}, status=400)
-    if found_folder and found_folder.exists() and found_folder[0].id != None:
+    found_team = get_scoped_one(request, UserTeam, ClubTeam, {'user_id': cur_user}, {'club_id': request.user.club_id}, id=cur_team)
+    if found_team is None:
+        return ApiJsonResponse({"err": "Cant find team.", "success": False}, status=400)
+    found_folder = get_one_or_none(found_folder)
+    if found_folder is not None:
         res_data = {'err': "NULL"}
         if folder_type == FOLDER_NFB:
-            c_exs = AdminExercise.objects.filter(id=exs_id, visible=True)
-            if c_exs.exists() and c_exs[0].id != None:
+            c_exs = get_one_or_none(AdminExercise.objects.filter(id=exs_id, visible=True))
+            if c_exs is not None:
                 if request.user.club_id is not None:
-                    new_exs = ClubExercise(user=cur_user, club=request.user.club_id, team=found_team[0])
+                    new_exs = ClubExercise(user=cur_user, club=request.user.club_id, team=found_team)
                 else:
                     new_exs = UserExercise(user=cur_user)
-                for key in c_exs.values()[0]:
+                c_exs_values = get_object_values(c_exs)
+                for key in c_exs_values:
                     if key != "id" and key != "date_creation":
-                        setattr(new_exs, key, c_exs.values()[0][key])
-                new_exs.folder = found_folder[0]
+                        setattr(new_exs, key, c_exs_values[key])
+                new_exs.folder = found_folder
                 new_exs.old_id = exs_id
                 try:
                     new_exs.save()
@@ -658,17 +1225,17 @@ def POST_copy_exs(request, cur_user, cur_team):
                 except Exception as e:
                     print(e)
                     res_data = {'id': new_exs.id, 'err': str(e)}
-                exs_params = UserExerciseParamTeam.objects.filter(exercise_nfb=exs_id)
-                if exs_params.exists() and exs_params[0].id != None and success_status:
-                    if found_team and found_team.exists() and found_team[0].id != None:
+                exs_params = get_one_or_none(UserExerciseParamTeam.objects.filter(exercise_nfb=exs_id).values())
+                if exs_params is not None and success_status:
+                    if found_team is not None:
                         new_exs_params = None
                         if request.user.club_id is not None:
-                            new_exs_params = UserExerciseParamTeam(exercise_club=new_exs, team_club=found_team[0])
+                            new_exs_params = UserExerciseParamTeam(exercise_club=new_exs, team_club=found_team)
                         else:
-                            new_exs_params = UserExerciseParamTeam(exercise_user=new_exs, team=found_team[0])
-                        for key in exs_params.values()[0]:
+                            new_exs_params = UserExerciseParamTeam(exercise_user=new_exs, team=found_team)
+                        for key in exs_params:
                             if key != "id" and key != "exercise_user_id" and key != "exercise_club_id" and key != "exercise_nfb_id" and key != "team_id":
-                                setattr(new_exs_params, key, exs_params.values()[0][key])
+                                setattr(new_exs_params, key, exs_params[key])
                         try:
                             new_exs_params.save()
                             res_data['exs_params'] = new_exs_params.id
@@ -677,21 +1244,18 @@ def POST_copy_exs(request, cur_user, cur_team):
                             success_status = False
                             res_data = {'id': new_exs.id, 'err': str(e)}
         elif folder_type == FOLDER_TEAM:
-            c_exs = None
-            if request.user.club_id is not None:
-                c_exs = ClubExercise.objects.filter(id=exs_id, team=found_team[0], club=request.user.club_id)
-            else:
-                c_exs = UserExercise.objects.filter(id=exs_id, user=cur_user)
-            if c_exs.exists() and c_exs[0].id != None:
+            c_exs = get_scoped_one(request, UserExercise, ClubExercise, {'user': cur_user}, {'team': found_team, 'club': request.user.club_id}, id=exs_id)
+            if c_exs is not None:
                 new_exs = None
                 if request.user.club_id is not None:
-                    new_exs = ClubExercise(user=cur_user, club=request.user.club_id, team=found_team[0])
+                    new_exs = ClubExercise(user=cur_user, club=request.user.club_id, team=found_team)
                 else:
                     new_exs = UserExercise(user=cur_user)
-                for key in c_exs.values()[0]:
+                c_exs_values = get_object_values(c_exs)
+                for key in c_exs_values:
                     if key != "id" and key != "date_creation":
-                        setattr(new_exs, key, c_exs.values()[0][key])
-                new_exs.folder = found_folder[0]
+                        setattr(new_exs, key, c_exs_values[key])
+                new_exs.folder = found_folder
                 try:
                     new_exs.save()
                     res_data = {'id': new_exs.id}
@@ -704,14 +1268,14 @@ def POST_copy_exs(request, cur_user, cur_team):
             try:
                 videos = []
                 if folder_type == FOLDER_NFB:
-                    videos = c_exs[0].videos.through.objects.filter(exercise_nfb=c_exs[0])
+                    videos = c_exs.videos.through.objects.filter(exercise_nfb=c_exs)
                 elif folder_type == FOLDER_TEAM:
                     if request.user.club_id is not None:
-                        videos = c_exs[0].videos.through.objects.filter(exercise_club=c_exs[0])
+                        videos = c_exs.videos.through.objects.filter(exercise_club=c_exs)
                     else:
-                        videos = c_exs[0].videos.through.objects.filter(exercise_user=c_exs[0])
+                        videos = c_exs.videos.through.objects.filter(exercise_user=c_exs)
                 elif folder_type == FOLDER_CLUB:
-                    videos = c_exs[0].videos.through.objects.filter(exercise_club=c_exs[0])
+                    videos = c_exs.videos.through.objects.filter(exercise_club=c_exs)
                 for video in videos:
                     video.pk = None
                     video.exercise_nfb = None
@@ -727,8 +1291,8 @@ def POST_copy_exs(request, cur_user, cur_team):
             except Exception as e:
                 print(e)
                 res_data = {'err': str(e)}
-        return JsonResponse({"data": res_data, "success": success_status}, status=200)
-    return JsonResponse({"errors": "Can't copy exercise"}, status=400)
+        return ApiJsonResponse({"data": res_data, "success": success_status}, status=200)
+    return ApiJsonResponse({"errors": "Can't copy exercise"}, status=400)
 
 
 def POST_move_exs(request, cur_user, cur_team):
@@ -759,26 +1323,22 @@ def POST_move_exs(request, cur_user, cur_team):
         'perms_user': ["exercises.change_userexercise"], 
         'perms_club': ["exercises.change_clubexercise"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
     if request.user.club_id is not None:
          found_folder = ClubFolder.objects.filter(id=folder_id, club=request.user.club_id)
     else:
         found_folder = UserFolder.objects.filter(id=folder_id, user=cur_user)
-    if found_folder.exists() and found_folder[0].id != None:
-        found_exs = None
-        if request.user.club_id is not None:
-            found_exs = ClubExercise.objects.filter(id=exs_id, club=request.user.club_id, team=cur_team)
-        else:
-            found_exs = UserExercise.objects.filter(id=exs_id, user=cur_user)
-        if found_exs and found_exs.exists() and found_exs[0].id != None:
-            found_exs = found_exs[0]
-            found_exs.folder = found_folder[0]
+    found_folder = get_one_or_none(found_folder)
+    if found_folder is not None:
+        found_exs = get_scoped_one(request, UserExercise, ClubExercise, {'user': cur_user}, {'club': request.user.club_id, 'team': cur_team}, id=exs_id)
+        if found_exs is not None:
+            found_exs.folder = found_folder
             try:
                 found_exs.save()
-                return JsonResponse({"data": {"id": found_exs.id}, "success": True}, status=200)
+                return ApiJsonResponse({"data": {"id": found_exs.id}, "success": True}, status=200)
             except:
                 pass
-    return JsonResponse({"errors": "Can't move exercise"}, status=400)
+    return ApiJsonResponse({"errors": "Can't move exercise"}, status=400)
 
 
 def POST_edit_exs(request, cur_user, cur_team):
@@ -810,63 +1370,49 @@ def POST_edit_exs(request, cur_user, cur_team):
     c_exs = None
     access_denied = False
     copied_from_nfb = False
-    found_team = None
-    if request.user.club_id is not None:
-        found_team = ClubTeam.objects.filter(id=cur_team, club_id=request.user.club_id)
-    else:
-        found_team = UserTeam.objects.filter(id=cur_team, user_id=cur_user)
+    found_team = get_scoped_one(request, UserTeam, ClubTeam, {'user_id': cur_user}, {'club_id': request.user.club_id}, id=cur_team)
     if folder_type == FOLDER_TEAM:
-        if not found_team or not found_team.exists() or found_team[0].id == None:
-            return JsonResponse({"err": "Team not found.", "success": False}, status=400)
+        if found_team is None:
+            return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
         if not util_check_access(cur_user, {
             'perms_user': ["exercises.change_userexercise", "exercises.add_userexercise"], 
             'perms_club': ["exercises.change_clubexercise", "exercises.add_clubexercise"]
         }):
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        c_folder = None
-        if request.user.club_id is not None:
-            c_folder = ClubFolder.objects.filter(id=folder_id, club=request.user.club_id)
-        else:
-            c_folder = UserFolder.objects.filter(id=folder_id, user=cur_user)
-        if not c_folder.exists() or c_folder[0].id == None:
-            return JsonResponse({"err": "Folder not found.", "success": False}, status=400)
-        c_exs = None
-        if request.user.club_id is not None:
-            c_exs = ClubExercise.objects.filter(id=exs_id, club=request.user.club_id, team=found_team[0])
-        else:
-            c_exs = UserExercise.objects.filter(id=exs_id, user=cur_user)
-        if not c_exs.exists() or c_exs[0].id == None:
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+        c_folder = get_scoped_one(request, UserFolder, ClubFolder, {'user': cur_user}, {'club': request.user.club_id}, id=folder_id)
+        if c_folder is None:
+            return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=400)
+        c_exs = get_scoped_one(request, UserExercise, ClubExercise, {'user': cur_user}, {'club': request.user.club_id, 'team': found_team}, id=exs_id)
+        if c_exs is None:
             if request.user.club_id is not None:
-                c_exs = ClubExercise(user=cur_user, folder=c_folder[0], club=request.user.club_id, team=found_team[0])
+                c_exs = ClubExercise(user=cur_user, folder=c_folder, club=request.user.club_id, team=found_team)
             else:
-                c_exs = UserExercise(user=cur_user, folder=c_folder[0])
+                c_exs = UserExercise(user=cur_user, folder=c_folder)
         else:
-            c_exs = c_exs[0]
-            c_exs.folder = c_folder[0]
+            c_exs.folder = c_folder
             copied_from_nfb = c_exs.old_id != None
     elif folder_type == FOLDER_NFB:
         if not util_check_access(cur_user, {
             'perms_user': ["exercises.change_adminexercise", "exercises.add_adminexercise"], 
             'perms_club': ["exercises.change_adminexercise", "exercises.add_adminexercise"]
         }):
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        c_folder = AdminFolder.objects.filter(id=folder_id, visible=True)
-        if not c_folder.exists() or c_folder[0].id == None:
-            return JsonResponse({"err": "Folder not found.", "success": False}, status=400)
-        c_exs = AdminExercise.objects.filter(id=exs_id)
-        if not c_exs.exists() or c_exs[0].id == None:
-            c_exs = AdminExercise(folder=c_folder[0])
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+        c_folder = get_one_or_none(AdminFolder.objects.filter(id=folder_id, visible=True))
+        if c_folder is None:
+            return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=400)
+        c_exs = get_one_or_none(AdminExercise.objects.filter(id=exs_id))
+        if c_exs is None:
+            c_exs = AdminExercise(folder=c_folder)
         else:
-            c_exs = c_exs[0]
-            c_exs.folder = c_folder[0]
+            c_exs.folder = c_folder
     elif folder_type == FOLDER_CLUB:
-        if not found_team or not found_team.exists() or found_team[0].id == None:
-            return JsonResponse({"err": "Team not found.", "success": False}, status=400)
+        if found_team is None:
+            return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
         if access_denied:
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
         pass
     if c_exs == None:
-            return JsonResponse({"err": "Exercise not found.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Exercise not found.", "success": False}, status=400)
     print(request.POST)
     c_exs.title = set_by_language_code(c_exs.title, request.LANGUAGE_CODE, request.POST.get("data[title]", ""))
     c_exs.description = set_by_language_code(c_exs.description, request.LANGUAGE_CODE, request.POST.get("data[description]", ""))
@@ -906,7 +1452,7 @@ def POST_edit_exs(request, cur_user, cur_team):
         c_exs.save()
         res_data = f'Exs with id: [{c_exs.id}] is added / edited successfully.'
     except Exception as e:
-        return JsonResponse({"err": "Can't edit the exs.", "success": False}, status=200)
+        return ApiJsonResponse({"err": "Can't edit the exs.", "success": False}, status=200)
     
     video1_obj = check_video(video1_id)
     video2_obj = check_video(video2_id)
@@ -933,19 +1479,17 @@ def POST_edit_exs(request, cur_user, cur_team):
         res_data += f'Cant add link to <ExerciseVideo>.'
 
     if folder_type == FOLDER_TEAM:
-        if found_team.exists() and found_team[0].id != None:
+        if found_team is not None:
             c_exs_team_params = None
             if request.user.club_id is not None:
-                c_exs_team_params = UserExerciseParamTeam.objects.filter(team_club=found_team[0], exercise_club=c_exs)
+                c_exs_team_params = get_one_or_none(UserExerciseParamTeam.objects.filter(team_club=found_team, exercise_club=c_exs))
             else:
-                c_exs_team_params = UserExerciseParamTeam.objects.filter(team=found_team[0], exercise_user=c_exs)
-            if not c_exs_team_params.exists() or c_exs_team_params[0].id == None:
+                c_exs_team_params = get_one_or_none(UserExerciseParamTeam.objects.filter(team=found_team, exercise_user=c_exs))
+            if c_exs_team_params is None:
                 if request.user.club_id is not None:
-                    c_exs_team_params = UserExerciseParamTeam(team_club=found_team[0], exercise_club=c_exs)
+                    c_exs_team_params = UserExerciseParamTeam(team_club=found_team, exercise_club=c_exs)
                 else:
-                    c_exs_team_params = UserExerciseParamTeam(team=found_team[0], exercise_user=c_exs)
-            else:
-                c_exs_team_params = c_exs_team_params[0]
+                    c_exs_team_params = UserExerciseParamTeam(team=found_team, exercise_user=c_exs)
             c_exs_team_params.additional_data = set_as_object(request, c_exs_team_params.additional_data, "additional_data", request.LANGUAGE_CODE)
             c_exs_team_params.keyword = set_as_object(request, c_exs_team_params.keyword, "keyword", request.LANGUAGE_CODE)
             c_exs_team_params.stress_type = set_as_object(request, c_exs_team_params.stress_type, "stress_type", request.LANGUAGE_CODE)
@@ -958,11 +1502,9 @@ def POST_edit_exs(request, cur_user, cur_team):
             except:
                 res_data += '\nCant add team params for exs.'
     elif folder_type == FOLDER_NFB:
-        c_exs_team_params = UserExerciseParamTeam.objects.filter(exercise_nfb=c_exs)
-        if not c_exs_team_params.exists() or c_exs_team_params[0].id == None:
+        c_exs_team_params = get_one_or_none(UserExerciseParamTeam.objects.filter(exercise_nfb=c_exs))
+        if c_exs_team_params is None:
             c_exs_team_params = UserExerciseParamTeam(exercise_nfb=c_exs)
-        else:
-            c_exs_team_params = c_exs_team_params[0]
         c_exs_team_params.additional_data = set_as_object(request, c_exs_team_params.additional_data, "additional_data", request.LANGUAGE_CODE)
         c_exs_team_params.keyword = set_as_object(request, c_exs_team_params.keyword, "keyword", request.LANGUAGE_CODE)
         c_exs_team_params.stress_type = set_as_object(request, c_exs_team_params.stress_type, "stress_type", request.LANGUAGE_CODE)
@@ -976,7 +1518,7 @@ def POST_edit_exs(request, cur_user, cur_team):
             res_data += '\nCant add team params for exs.'
     elif folder_type == FOLDER_CLUB:
         pass
-    return JsonResponse({"data": res_data, "success": True}, status=200)
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
 
 
 def POST_delete_exs(request, cur_user, cur_team):
@@ -1011,31 +1553,30 @@ def POST_delete_exs(request, cur_user, cur_team):
             'perms_user': ["exercises.delete_userexercise"], 
             'perms_club': ["exercises.delete_clubexercise"]
         }):
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
         if request.user.club_id is not None:
-            c_exs = ClubExercise.objects.filter(id=exs_id, club=request.user.club_id, team=cur_team)
-            if c_exs.exists() and c_exs[0].id != None:
-                f_exs_in_training = ClubTraining.objects.filter(event_id__club_id=request.user.club_id, exercises__in=c_exs)
+            c_exs = get_one_or_none(ClubExercise.objects.filter(id=exs_id, club=request.user.club_id, team=cur_team))
+            if c_exs is not None:
+                f_exs_in_training = ClubTraining.objects.filter(event_id__club_id=request.user.club_id, exercises=c_exs)
         else:
-            c_exs = UserExercise.objects.filter(id=exs_id, user=cur_user)
-            print(c_exs[0])
-            if c_exs.exists() and c_exs[0].id != None:
-                f_exs_in_training = UserTraining.objects.filter(event_id__user_id=cur_user, exercises__in=c_exs)
+            c_exs = get_one_or_none(UserExercise.objects.filter(id=exs_id, user=cur_user))
+            if c_exs is not None:
+                f_exs_in_training = UserTraining.objects.filter(event_id__user_id=cur_user, exercises=c_exs)
     elif folder_type == FOLDER_NFB:
         if not util_check_access(cur_user, {
             'perms_user': ["exercises.delete_adminexercise"], 
             'perms_club': ["exercises.delete_adminexercise"]
         }):
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
         delete_type_access = True
-        c_exs = AdminExercise.objects.filter(id=exs_id)
+        c_exs = get_one_or_none(AdminExercise.objects.filter(id=exs_id))
     elif folder_type == FOLDER_CLUB:
         pass
-    if c_exs == None or not c_exs.exists() or c_exs[0].id == None:
-        return JsonResponse({"errors": "access_error"}, status=400)
+    if c_exs is None:
+        return ApiJsonResponse({"errors": "access_error"}, status=400)
     else:
-        if f_exs_in_training != None and f_exs_in_training.exists() and f_exs_in_training[0].event_id != None:
-            return JsonResponse({"errors": "access_error", "in_training": True}, status=400)
+        if f_exs_in_training != None and f_exs_in_training.exists():
+            return ApiJsonResponse({"errors": "access_error", "in_training": True}, status=400)
         try:
             if not delete_type_access:
                 c_exs.delete()
@@ -1043,7 +1584,7 @@ def POST_delete_exs(request, cur_user, cur_team):
                 if delete_type == 0:
                     c_exs.delete()
                 elif delete_type == 1 or delete_type == 2:
-                    exs_videos = c_exs[0].videos.through.objects.filter(exercise_nfb=c_exs[0])
+                    exs_videos = c_exs.videos.through.objects.filter(exercise_nfb=c_exs)
                     for video in exs_videos:
                         if video.video is not None:
                             ready_to_delete = delete_video_obj_nf(video.video)
@@ -1051,23 +1592,75 @@ def POST_delete_exs(request, cur_user, cur_team):
                                 video.video.delete()
                     if delete_type == 2:
                         c_exs.delete()
-            return JsonResponse({"data": {"id": exs_id}, "success": True}, status=200)
+            return ApiJsonResponse({"data": {"id": exs_id}, "success": True}, status=200)
         except Exception as e:
             print(e)
-            return JsonResponse({"errors": "Can't delete exercise"}, status=400)
+            return ApiJsonResponse({"errors": "Can't delete exercise"}, status=400)
+
+
+def POST_edit_exs_user_params(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on POST operation "Edit exercise's user parameters" (watched, favorite, like, ...).
+    Changes aren't written immediately, they are collected by write-behind buffer and written in bulk.
+    Check exercises.user_params for more information.
 
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    exs_id = -1
+    value = 0
+    folder_type = request.POST.get("type", "")
+    key = request.POST.get("data[key]", "")
+    try:
+        exs_id = int(request.POST.get("exs", -1))
+    except:
+        pass
+    try:
+        value = int(request.POST.get("data[value]", 0))
+    except:
+        pass
+    if request.POST.get("nfb", "0") == "1":
+        folder_type = FOLDER_NFB
+    values = {}
+    if key in exs_user_params.USER_PARAMS_FLAGS:
+        values[key] = value == 1
+    elif key == "watched_not":
+        if value == 1:
+            values['watched'] = False
+    else:
+        return ApiJsonResponse({"err": "Wrong parameter.", "success": False}, status=400)
+    if value == 1 and key == "like":
+        values['dislike'] = False
+    if value == 1 and key == "dislike":
+        values['like'] = False
+    querysets = get_exs_one_querysets(request, cur_user, cur_team, folder_type, exs_id)
+    if querysets is None or not querysets['exs'].exists():
+        return ApiJsonResponse({"err": "Exercise not found.", "success": False}, status=400)
+    if len(values) > 0:
+        exs_user_params.set_user_params(cur_user.id, get_exs_params_field(request, folder_type), exs_id, values)
+    return ApiJsonResponse({"data": {"id": exs_id, "key": key, "value": value}, "success": True}, status=200)
 
 
 def GET_get_exs_all(request, cur_user, cur_team):
     """
     Return JSON Response as result on GET operation "Get all exercises from folder".
+    Exercises are sorted by title in the database and sent by StreamingJsonResponse (by ApiJsonResponse under ASGI, check get_list_response()).
+    If parameter "limit" is set then only one page is returned with "next_cursor", which has to be sent
+    as parameter "cursor" for the next page.
 
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
     :param cur_user: The current user of the system, who is currently authorized.
     :type cur_user: Model.object[User]
-    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
-    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]]
+    :return: StreamingJsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: StreamingJsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"data": [obj], "success": [bool], "next_cursor": [str]}, status=[int]] or JsonResponse[{"err": [str]}, status=[int]]
 
     """
     folder_id = -1
@@ -1080,59 +1673,71 @@ def GET_get_exs_all(request, cur_user, cur_team):
         folder_type = request.GET.get("f_type", "")
     except:
         pass
-    res_exs = []
     if not util_check_access(cur_user, {
         'perms_user': ["exercises.view_userexercise"], 
         'perms_club': ["exercises.view_clubexercise"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-    found_exercises = get_excerises_data(folder_id, folder_type, request, cur_user, cur_team)
-    print(found_exercises)
-    for exercise in found_exercises:
-        exs_title = get_by_language_code(exercise['title'], request.LANGUAGE_CODE)
-        exs_data = {
-            'id': exercise['id'], 
-            'folder': exercise['folder_id'], 
-            'title': exs_title,
-            'has_video_1': exercise['has_video_1'],
-            'has_video_2': exercise['has_video_2'],
-            'has_animation_1': exercise['has_animation_1'],
-            'has_animation_2': exercise['has_animation_2']
-        }
-        videos_arr = get_exs_video_data(exercise['video_data'])
-        anims_arr = get_exs_video_data(exercise['animation_data'])
-        if isinstance(anims_arr, dict):
-            anims_arr = anims_arr['default']
-        if folder_type == FOLDER_TEAM:
-            exs_data['user'] = exercise['user_id']
-        elif folder_type == FOLDER_NFB:
-            exs_data['user'] = "NFB"
-        elif folder_type == FOLDER_CLUB:
-            pass
-        exs_data['favorite'] = exercise['favorite'] if 'favorite' in exercise else None
-        exs_data['video_1_watched'] = exercise['video_1_watched'] if 'video_1_watched' in exercise else None
-        exs_data['video_2_watched'] = exercise['video_2_watched'] if 'video_2_watched' in exercise else None
-        exs_data['animation_1_watched'] = exercise['animation_1_watched'] if 'animation_1_watched' in exercise else None
-        exs_data['animation_2_watched'] = exercise['animation_2_watched'] if 'animation_2_watched' in exercise else None
-        goal_shortcode = ExsGoal.objects.filter(id = exercise['ref_goal_id']).only('id', 'short_name')
-        if goal_shortcode.exists() and goal_shortcode[0].id != None:
-            goal_shortcode = goal_shortcode[0].short_name
-        else:
-            goal_shortcode = None
-        exs_data['goal_code'] = goal_shortcode
-        exs_data['ball_val'] = exercise['ref_ball_id']
-        exs_data['favorite'] = exercise['favorite'] if 'favorite' in exercise else None
-        exs_data['has_notes'] = exercise['has_notes'] if 'has_notes' in exercise else None
-        res_exs.append(exs_data)
-    # sorting list by title:
-    for elem in res_exs:
-        if isinstance(elem['title'], str):
-            elem['title_for_sort'] = elem['title'].replace(" ", "")
-        else:
-            elem['title'] = ""
-            elem['title_for_sort'] = ""
-    res_exs = sorted(res_exs, key=lambda d: d['title_for_sort'])
-    return JsonResponse({"data": res_exs, "success": True}, status=200)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    limit, cursor = get_exs_page_params(request)
+    if limit > 0:
+        after = None
+        if cursor != "":
+            after = decode_exs_cursor(cursor, request.LANGUAGE_CODE)
+            if after is None:
+                return ApiJsonResponse({"err": "Wrong cursor.", "success": False}, status=400)
+        page, next_cursor = get_exs_list_page(request, cur_user, cur_team, folder_id, folder_type, limit, after)
+        page = languages.trim_languages(page, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+        return ApiJsonResponse({"data": page, "success": True, "next_cursor": next_cursor}, status=200)
+    found_exercises = iter_exercises_data(folder_id, folder_type, request, cur_user, cur_team)
+    exs_data = iter_exs_list_data(request, found_exercises, folder_type)
+    return get_list_response(request, languages.iter_trimmed(exs_data, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS))
+
+
+async def GET_get_exs_all_async(request, cur_user, cur_team):
+    """
+    Async variant of GET_get_exs_all(), it supports pagination too. Exercises are loaded in worker thread
+    and sent by ApiJsonResponse, because StreamingJsonResponse's generator would send queries from event loop.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"err": [str]}, status=[int]]
+
+    """
+    folder_id = -1
+    folder_type = ""
+    try:
+        folder_id = int(request.GET.get("folder", -1))
+    except:
+        pass
+    try:
+        folder_type = request.GET.get("f_type", "")
+    except:
+        pass
+    if not await concurrency.run_sync(util_check_access, cur_user, {
+        'perms_user': ["exercises.view_userexercise"], 
+        'perms_club': ["exercises.view_clubexercise"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    limit, cursor = get_exs_page_params(request)
+    if limit > 0:
+        after = None
+        if cursor != "":
+            after = decode_exs_cursor(cursor, request.LANGUAGE_CODE)
+            if after is None:
+                return ApiJsonResponse({"err": "Wrong cursor.", "success": False}, status=400)
+        page, next_cursor = await concurrency.run_sync(get_exs_list_page, request, cur_user, cur_team, folder_id, folder_type, limit, after)
+        page = languages.trim_languages(page, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+        return ApiJsonResponse({"data": page, "success": True, "next_cursor": next_cursor}, status=200)
+    exs_data = await concurrency.run_sync(
+        lambda: list(iter_exs_list_data(request, iter_exercises_data(folder_id, folder_type, request, cur_user, cur_team), folder_type))
+    )
+    exs_data = languages.trim_languages(exs_data, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+    return ApiJsonResponse({"data": exs_data, "success": True}, status=200)
 
 
 def GET_get_exs_one(request, cur_user, cur_team, additional={}):
@@ -1140,6 +1745,7 @@ def GET_get_exs_one(request, cur_user, cur_team, additional={}):
     Return JSON Response or object as result on GET operation "Get one exercise".
     If keys "f_type" and "exs" will be in <additional> dictionary then function return Object or None
     else JSON Response.
+    Exercise, user's params, team's params and videos are loaded concurrently by independent loaders.
 
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
@@ -1164,75 +1770,7 @@ def GET_get_exs_one(request, cur_user, cur_team, additional={}):
         folder_type = additional['f_type']
         exs_id = additional['exs']
         is_as_object = True
-    res_exs = {}
-    c_exs = None
-    if folder_type == FOLDER_TEAM:
-        if not util_check_access(cur_user, {
-            'perms_user': ["exercises.view_userexercise"], 
-            'perms_club': ["exercises.view_clubexercise"]
-        }):
-            if is_as_object:
-                return None
-            else:
-                return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        if request.user.club_id is not None:
-            c_exs = ClubExercise.objects.filter(id=exs_id, visible=True, club=request.user.club_id, team=cur_team)
-        else:
-            c_exs = UserExercise.objects.filter(id=exs_id, visible=True, user=cur_user)
-        if c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
-            res_exs['nfb'] = False
-            res_exs['folder_parent_id'] = c_exs[0].folder.parent
-            res_exs['copied_from_nfb'] = c_exs[0].old_id != None
-        user_params = None
-        if request.user.club_id is not None:
-            user_params = UserExerciseParam.objects.filter(exercise_club=c_exs[0].id, user=cur_user)
-        else:
-            user_params = UserExerciseParam.objects.filter(exercise_user=c_exs[0].id, user=cur_user)
-        if user_params.exists() and user_params[0].id != None:
-            user_params = user_params.values()[0]
-            res_exs['favorite'] = user_params['favorite']
-            res_exs['video_1_watched'] = user_params['video_1_watched']
-            res_exs['video_2_watched'] = user_params['video_2_watched']
-            res_exs['animation_1_watched'] = user_params['animation_1_watched']
-            res_exs['animation_2_watched'] = user_params['animation_2_watched']
-        team_params = None
-        if request.user.club_id is not None:
-            team_params = UserExerciseParamTeam.objects.filter(exercise_club=c_exs[0].id, team_club=cur_team)
-        else:
-            team_params = UserExerciseParamTeam.objects.filter(exercise_user=c_exs[0].id, team=cur_team)
-        if team_params.exists() and team_params[0].id != None:
-            team_params = team_params.values()[0]
-            res_exs['additional_data'] = get_by_language_code(team_params['additional_data'], request.LANGUAGE_CODE)
-            res_exs['keyword'] = get_by_language_code(team_params['keyword'], request.LANGUAGE_CODE)
-            res_exs['stress_type'] = get_by_language_code(team_params['stress_type'], request.LANGUAGE_CODE)
-            res_exs['purposes'] = get_by_language_code(team_params['purpose'], request.LANGUAGE_CODE)
-            res_exs['coaching'] = get_by_language_code(team_params['coaching'], request.LANGUAGE_CODE)
-            res_exs['notes'] = get_by_language_code(team_params['note'], request.LANGUAGE_CODE)
-    elif folder_type == FOLDER_NFB:
-        c_exs = AdminExercise.objects.filter(id=exs_id, visible=True)
-        if c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
-            res_exs['nfb'] = True
-            res_exs['folder_parent_id'] = c_exs[0].folder.parent
-        user_params = UserExerciseParam.objects.filter(exercise_nfb=c_exs[0].id, user=cur_user)
-        if user_params.exists() and user_params[0].id != None:
-            user_params = user_params.values()[0]
-            res_exs['favorite'] = user_params['favorite']
-            res_exs['video_1_watched'] = user_params['video_1_watched']
-            res_exs['video_2_watched'] = user_params['video_2_watched']
-            res_exs['animation_1_watched'] = user_params['animation_1_watched']
-            res_exs['animation_2_watched'] = user_params['animation_2_watched']
-        team_params = UserExerciseParamTeam.objects.filter(exercise_nfb=c_exs[0].id)
-        if team_params.exists() and team_params[0].id != None:
-            team_params = team_params.values()[0]
-            res_exs['additional_data'] = get_by_language_code(team_params['additional_data'], request.LANGUAGE_CODE)
-            res_exs['keyword'] = get_by_language_code(team_params['keyword'], request.LANGUAGE_CODE)
-            res_exs['stress_type'] = get_by_language_code(team_params['stress_type'], request.LANGUAGE_CODE)
-            res_exs['purposes'] = get_by_language_code(team_params['purpose'], request.LANGUAGE_CODE)
-            res_exs['coaching'] = get_by_language_code(team_params['coaching'], request.LANGUAGE_CODE)
-            res_exs['notes'] = get_by_language_code(team_params['note'], request.LANGUAGE_CODE)
-    elif folder_type == FOLDER_CLUB:
+    if folder_type == FOLDER_TEAM or folder_type == FOLDER_CLUB:
         if not util_check_access(cur_user, {
             'perms_user': ["exercises.view_userexercise"], 
             'perms_club': ["exercises.view_clubexercise"]
@@ -1240,56 +1778,141 @@ def GET_get_exs_one(request, cur_user, cur_team, additional={}):
             if is_as_object:
                 return None
             else:
-                return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        if request.user.club_id is not None:
-            c_exs = ClubExercise.objects.filter(id=exs_id, visible=True, club=request.user.club_id)
-        if c_exs and c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
-            res_exs['nfb'] = False
-            res_exs['folder_parent_id'] = c_exs[0].folder.parent
-            res_exs['copied_from_nfb'] = c_exs[0].old_id != None
-        user_params = None
-        if request.user.club_id is not None:
-            user_params = UserExerciseParam.objects.filter(exercise_club=c_exs[0].id, user=cur_user)
-        if user_params and user_params.exists() and user_params[0].id != None:
-            user_params = user_params.values()[0]
-            res_exs['favorite'] = user_params['favorite']
-            res_exs['video_1_watched'] = user_params['video_1_watched']
-            res_exs['video_2_watched'] = user_params['video_2_watched']
-            res_exs['animation_1_watched'] = user_params['animation_1_watched']
-            res_exs['animation_2_watched'] = user_params['animation_2_watched']
-        team_params = None
-        if request.user.club_id is not None:
-            team_params = UserExerciseParamTeam.objects.filter(exercise_club=c_exs[0].id, team_club=cur_team)
-        if team_params and team_params.exists() and team_params[0].id != None:
-            team_params = team_params.values()[0]
-            res_exs['additional_data'] = get_by_language_code(team_params['additional_data'], request.LANGUAGE_CODE)
-            res_exs['keyword'] = get_by_language_code(team_params['keyword'], request.LANGUAGE_CODE)
-            res_exs['stress_type'] = get_by_language_code(team_params['stress_type'], request.LANGUAGE_CODE)
-            res_exs['purposes'] = get_by_language_code(team_params['purpose'], request.LANGUAGE_CODE)
-            res_exs['coaching'] = get_by_language_code(team_params['coaching'], request.LANGUAGE_CODE)
-            res_exs['notes'] = get_by_language_code(team_params['note'], request.LANGUAGE_CODE)
-    else:
+                return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    querysets = get_exs_one_querysets(request, cur_user, cur_team, folder_type, exs_id)
+    c_exs = None
+    if querysets is not None:
+        c_exs, user_params, team_params, videos = concurrency.run_parallel(
+            lambda: get_one_or_none(querysets['exs']),
+            lambda: get_one_or_none(querysets['user_params']),
+            lambda: get_one_or_none(querysets['team_params']),
+            lambda: list(querysets['videos'])
+        )
+    if c_exs is None:
         if is_as_object:
             return None
         else:
-            return JsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
-    res_exs['title'] = get_by_language_code(res_exs['title'], request.LANGUAGE_CODE)
-    res_exs['description'] = get_by_language_code(res_exs['description'], request.LANGUAGE_CODE)
-    res_exs['scheme_data'] = get_exs_scheme_data(res_exs['scheme_data'])
-    res_exs['video_data'] = get_exs_video_data(res_exs['video_data'])
-    res_exs['animation_data'] = get_exs_animation_data(res_exs['animation_data'])
-    res_exs['ref_goal'] = res_exs['ref_goal_id']
-    res_exs['ref_ball'] = res_exs['ref_ball_id']
-    res_exs['ref_team_category'] = res_exs['ref_team_category_id']
-    res_exs['ref_age_category'] = res_exs['ref_age_category_id']
-    res_exs['ref_train_part'] = res_exs['ref_train_part_id']
-    res_exs['ref_cognitive_load'] = res_exs['ref_cognitive_load_id']
-    res_exs = get_exs_video_data2(res_exs, c_exs[0], folder_type, request.user.club_id)
+            return ApiJsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
+    user_params = exs_user_params.get_user_params(user_params, cur_user.id, get_exs_params_field(request, folder_type), c_exs.id)
+    res_exs = get_exs_one_data(request, c_exs, folder_type, user_params, team_params, videos)
     if is_as_object:
         return res_exs
     else:
-        return JsonResponse({"data": res_exs, "success": True}, status=200)
+        res_exs = languages.trim_languages(res_exs, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+        return ApiJsonResponse({"data": res_exs, "success": True}, status=200)
+
+
+async def GET_get_exs_one_async(request, cur_user, cur_team):
+    """
+    Async variant of GET_get_exs_one(). Exercise, user's params, team's params, videos and permissions
+    are loaded concurrently in worker threads.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    exs_id = -1
+    folder_type = request.GET.get("f_type", "")
+    try:
+        exs_id = int(request.GET.get("exs", -1))
+    except:
+        pass
+    querysets = get_exs_one_querysets(request, cur_user, cur_team, folder_type, exs_id)
+    if querysets is None:
+        return ApiJsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
+    loaders = [
+        concurrency.get_first(querysets['exs']),
+        concurrency.get_first(querysets['user_params']),
+        concurrency.get_first(querysets['team_params']),
+        concurrency.get_list(querysets['videos']),
+    ]
+    if folder_type == FOLDER_TEAM or folder_type == FOLDER_CLUB:
+        loaders.append(concurrency.run_sync(util_check_access, cur_user, {
+            'perms_user': ["exercises.view_userexercise"], 
+            'perms_club': ["exercises.view_clubexercise"]
+        }))
+    results = await concurrency.gather(*loaders)
+    c_exs, user_params, team_params, videos = results[:4]
+    if len(results) > 4 and not results[4]:
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    if c_exs is None:
+        return ApiJsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
+    user_params = exs_user_params.get_user_params(user_params, cur_user.id, get_exs_params_field(request, folder_type), c_exs.id)
+    res_exs = get_exs_one_data(request, c_exs, folder_type, user_params, team_params, videos)
+    res_exs = languages.trim_languages(res_exs, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+    return ApiJsonResponse({"data": res_exs, "success": True}, status=200)
+
+
+def GET_get_nfb_library(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on GET operation "Get NFB library". Library is sent from immutable snapshot
+    with ETag of library's version. If client sends version as parameter "v" then response can be cached forever,
+    else client has to revalidate it by ETag. Check exercises.nfb_library for more information.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data" (version, folders, exercises, goal_codes, balls) and "success" flag or response "Not Modified".
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or HttpResponseNotModified
+
+    """
+    snapshot = nfb_library.get_snapshot()
+    if request.headers.get('If-None-Match') == snapshot.etag:
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(snapshot.iter_content(), content_type='application/json')
+        response['Content-Length'] = len(snapshot.get_section("content"))
+    response['ETag'] = snapshot.etag
+    if request.GET.get("v") == snapshot.version:
+        response['Cache-Control'] = "private, max-age=31536000, immutable"
+    else:
+        response['Cache-Control'] = "private, no-cache"
+    return response
+
+
+def GET_get_exs_facets(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on GET operation "Get facets of exercises in folder".
+    Parameters are the same as for "get_exs_all": "folder", "f_type" and filter["filter_name"].
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data" (goal, ball, team_category, age_category, watched, favorite, new_exs, total) and "success" flag (True or False).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"err": [str]}, status=[int]]
+
+    """
+    folder_id = -1
+    folder_type = ""
+    try:
+        folder_id = int(request.GET.get("folder", -1))
+    except:
+        pass
+    try:
+        folder_type = request.GET.get("f_type", "")
+    except:
+        pass
+    if not util_check_access(cur_user, {
+        'perms_user': ["exercises.view_userexercise"], 
+        'perms_club': ["exercises.view_clubexercise"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    facets = get_exs_facets(request, cur_user, cur_team, folder_id, folder_type)
+    if facets is None:
+        return ApiJsonResponse({"err": "Folder not found.", "success": False}, status=400)
+    return ApiJsonResponse({"data": facets, "success": True}, status=200)
 
 
 def GET_get_exs_graphic_content(request, cur_user, cur_team):
@@ -1319,33 +1942,26 @@ def GET_get_exs_graphic_content(request, cur_user, cur_team):
             'perms_user': ["exercises.view_userexercise"], 
             'perms_club': ["exercises.view_clubexercise"]
         }):
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        if request.user.club_id is not None:
-            c_exs = ClubExercise.objects.filter(id=exs_id, visible=True, club=request.user.club_id, team=cur_team)
-        else:
-            c_exs = UserExercise.objects.filter(id=exs_id, visible=True, user=cur_user)
-        if c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+        c_exs = get_scoped_one(request, UserExercise, ClubExercise, {'user': cur_user}, {'club': request.user.club_id, 'team': cur_team}, id=exs_id, visible=True)
     elif folder_type == FOLDER_NFB:
-        c_exs = AdminExercise.objects.filter(id=exs_id, visible=True)
-        if c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
+        c_exs = get_one_or_none(AdminExercise.objects.filter(id=exs_id, visible=True))
     elif folder_type == FOLDER_CLUB:
         if request.user.club_id is not None:
             if not util_check_access(cur_user, {
                 'perms_club': ["exercises.view_clubexercise"]
             }):
-                return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-        c_exs = ClubExercise.objects.filter(id=exs_id, visible=True, club=request.user.club_id)
-        if c_exs.exists() and c_exs[0].id != None:
-            res_exs = c_exs.values()[0]
+                return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+        c_exs = get_one_or_none(ClubExercise.objects.filter(id=exs_id, visible=True, club=request.user.club_id))
     else:
-        return JsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
-    if c_exs is not None and c_exs.exists() and c_exs[0].id != None:
+        return ApiJsonResponse({"errors": "Exercise not found.", "success": False}, status=400)
+    if c_exs is not None:
+        res_exs = get_object_values(c_exs)
         res_exs['description'] = get_by_language_code(res_exs['description'], request.LANGUAGE_CODE)
         res_exs['scheme_data'] = get_exs_scheme_data(res_exs['scheme_data'])
         res_exs['video_data'] = get_exs_video_data(res_exs['video_data'])
         res_exs['animation_data'] = get_exs_animation_data(res_exs['animation_data'])
-        res_exs = get_exs_video_data2(res_exs, c_exs[0], folder_type, request.user.club_id)
-    return JsonResponse({"data": res_exs, "success": True}, status=200)
+        res_exs = get_exs_video_data2(res_exs, c_exs, folder_type, request.user.club_id)
+        res_exs = languages.trim_languages(res_exs, languages.get_trim_language(request), EXS_TRIM_DROP_KEYS)
+    return ApiJsonResponse({"data": res_exs, "success": True}, status=200)
 
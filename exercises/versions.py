@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from exercises.models import UserFolder, ClubFolder, UserExercise, ClubExercise
+
+
+VERSION_KEY_PREFIX = "exs_version"
+
+
+
+def get_owner_scope(user_id=None, club_id=None):
+    """
+    Return scope of exercises' owner: club's exercises and folders are shared by club's users,
+    other exercises and folders belong to user.
+
+    :param user_id: User's ID.
+    :type user_id: [int] or None
+    :param club_id: Club's ID.
+    :type club_id: [int] or None
+    :return: Scope, for example: "club:5" or "user:12".
+    :rtype: [str]
+
+    """
+    if club_id is not None:
+        return f"club:{club_id}"
+    return f"user:{user_id}"
+
+
+def get_version_key(scope):
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def get_version(scope):
+    """
+    Return current version of owner's exercises. It is used in cache keys of data built from exercises,
+    for example: facets of exercises' list.
+
+    :param scope: Owner's scope, check get_owner_scope().
+    :type scope: [str]
+    :return: Version.
+    :rtype: [int]
+
+    """
+    return cache.get(get_version_key(scope), 0)
+
+
+def bump_version_key(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, None)
+
+
+def bump_version(scope):
+    """
+    Change version of owner's exercises after current transaction is committed, all cached data of this owner
+    become invalid. Data cached by concurrent request before commit keeps old version, so it isn't used.
+
+    :param scope: Owner's scope, check get_owner_scope().
+    :type scope: [str]
+
+    """
+    version_key = get_version_key(scope)
+    transaction.on_commit(lambda: bump_version_key(version_key))
+
+
+def bump_user_version(sender, instance, **kwargs):
+    bump_version(get_owner_scope(user_id=instance.user_id))
+
+
+def bump_club_version(sender, instance, **kwargs):
+    bump_version(get_owner_scope(club_id=instance.club_id))
+
+
+for sender, receiver in [
+    (UserFolder, bump_user_version),
+    (UserExercise, bump_user_version),
+    (ClubFolder, bump_club_version),
+    (ClubExercise, bump_club_version),
+]:
+    post_save.connect(receiver, sender=sender, dispatch_uid=f"exs_versions_save_{sender.__name__}")
+    post_delete.connect(receiver, sender=sender, dispatch_uid=f"exs_versions_delete_{sender.__name__}")
@@ -1,16 +1,20 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.db.models import Q, Count, F
-from users.models import User
+from api.middleware import get_cur_user, get_cur_team
 from exercises.models import UserFolder, ClubFolder, AdminFolder, UserExercise, ClubExercise, AdminExercise
 from references.models import UserSeason, UserTeam
 from video.models import VideoSource
 from taggit.models import Tag
-from nanofootball.views import util_check_access
-import exercises.v_api as v_api
+from api.permissions import util_check_access
+from api.lazy import LazyModule
+import api.concurrency as concurrency
 from system_icons.views import get_ui_elements
 
 
+v_api = LazyModule("exercises.v_api")
+
+
 
 def exercises(request):
     """
@@ -34,16 +38,12 @@ def exercises(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["exercises.view_userexercise"], 'perms_club': ["exercises.view_clubexercise"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
     found_folders = []
     found_club_folders = []
     found_nfb_folders = []
@@ -85,16 +85,12 @@ def exercise(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["exercises.view_userexercise"], 'perms_club': ["exercises.view_clubexercise"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
     c_id = -1
     c_nfb = 0
     is_new_exs = request.GET.get("id", -1) == "new"
@@ -105,16 +101,16 @@ def exercise(request):
     folder_type = request.GET.get("type", "")
     found_exercise = None
     if folder_type == v_api.FOLDER_TEAM:
-        if cur_user.exists():
+        if cur_user is not None:
             if request.user.club_id is not None:
                 found_exercise = ClubExercise.objects.filter(id=c_id, club=request.user.club_id).values()
             else:
-                found_exercise = UserExercise.objects.filter(id=c_id, user=cur_user[0]).values()
+                found_exercise = UserExercise.objects.filter(id=c_id, user=cur_user).values()
     elif folder_type == v_api.FOLDER_NFB:
-        if cur_user.exists() and cur_user[0].is_superuser:
+        if cur_user is not None and cur_user.is_superuser:
             found_exercise = AdminExercise.objects.filter(id=c_id).values()
     elif folder_type == v_api.FOLDER_CLUB:
-        if cur_user.exists():
+        if cur_user is not None:
             if request.user.club_id is not None:
                 found_exercise = ClubExercise.objects.filter(id=c_id, club=request.user.club_id).values()
     if not found_exercise and not is_new_exs:
@@ -161,22 +157,18 @@ def folders(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["exercises.view_userfolder"], 'perms_club': ["exercises.view_clubfolder"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
     found_folders = []
-    if cur_user.exists() and cur_user[0].id != None:
+    if cur_user is not None:
         if request.user.club_id is not None:
             found_folders = ClubFolder.objects.filter(club=request.user.club_id)
         else:
-            found_folders = UserFolder.objects.filter(user=cur_user[0], team=cur_team)
+            found_folders = UserFolder.objects.filter(user=cur_user, team=cur_team)
     return render(request, 'exercises/base_folders.html', {
         'folders': found_folders, 
         'folders_only_view': False, 
@@ -204,6 +196,8 @@ def exercises_api(request):
     * 'get_exs_all' -> Get all exercises from selected folder.
     * 'get_exs_one' -> Get one exercise by ID.
     * 'get_exs_graphic_content' -> Get graphic content (video, animation, schemas) of exercise.
+    * 'get_nfb_library' -> Get snapshot of NFB library (folders, exercises, goals and balls).
+    * 'get_exs_facets' -> Get counts of exercises in selected folder for each filter's value.
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
     :return: Return an JsonResponse with next parameteres:\n
@@ -223,13 +217,9 @@ def exercises_api(request):
         delete_exs_status = 0
         edit_exs_user_params_status = 0
         count_exs_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
-        if not cur_user.exists() or cur_user[0].id == None:
+        cur_user = get_cur_user(request)
+        cur_team = get_cur_team(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
         try:
             copy_exs_status = int(request.POST.get("copy_exs", 0))
@@ -256,29 +246,27 @@ def exercises_api(request):
         except:
             pass
         if copy_exs_status == 1:
-            return v_api.POST_copy_exs(request, cur_user[0], cur_team)
+            return v_api.POST_copy_exs(request, cur_user, cur_team)
         elif move_exs_status == 1:
-            return v_api.POST_move_exs(request, cur_user[0], cur_team)
+            return v_api.POST_move_exs(request, cur_user, cur_team)
         elif edit_exs_status == 1:
-            return v_api.POST_edit_exs(request, cur_user[0], cur_team)
+            return v_api.POST_edit_exs(request, cur_user, cur_team)
         elif delete_exs_status == 1:
-            return v_api.POST_delete_exs(request, cur_user[0], cur_team)
+            return v_api.POST_delete_exs(request, cur_user, cur_team)
         elif edit_exs_user_params_status == 1:
-            return v_api.POST_edit_exs_user_params(request, cur_user[0], cur_team)
+            return v_api.POST_edit_exs_user_params(request, cur_user, cur_team)
         elif count_exs_status == 1:
-            return v_api.POST_count_exs(request, cur_user[0], cur_team)
+            return v_api.POST_count_exs(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     elif request.method == "GET" and is_ajax:
         get_exs_all_status = 0
         get_exs_one_status = 0
         get_exs_graphic_content_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
-        if not cur_user.exists() or cur_user[0].id == None:
+        get_nfb_library_status = 0
+        get_exs_facets_status = 0
+        cur_user = get_cur_user(request)
+        cur_team = get_cur_team(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
         try:
             get_exs_all_status = int(request.GET.get("get_exs_all", 0))
@@ -292,12 +280,69 @@ def exercises_api(request):
             get_exs_graphic_content_status = int(request.GET.get("get_exs_graphic_content", 0))
         except:
             pass
+        try:
+            get_nfb_library_status = int(request.GET.get("get_nfb_library", 0))
+        except:
+            pass
+        try:
+            get_exs_facets_status = int(request.GET.get("get_exs_facets", 0))
+        except:
+            pass
         if get_exs_all_status == 1:
-            return v_api.GET_get_exs_all(request, cur_user[0], cur_team)
+            return v_api.GET_get_exs_all(request, cur_user, cur_team)
         elif get_exs_one_status == 1:
-            return v_api.GET_get_exs_one(request, cur_user[0], cur_team)
+            return v_api.GET_get_exs_one(request, cur_user, cur_team)
         elif get_exs_graphic_content_status == 1:
-            return v_api.GET_get_exs_graphic_content(request, cur_user[0], cur_team)
+            return v_api.GET_get_exs_graphic_content(request, cur_user, cur_team)
+        elif get_nfb_library_status == 1:
+            return v_api.GET_get_nfb_library(request, cur_user, cur_team)
+        elif get_exs_facets_status == 1:
+            return v_api.GET_get_exs_facets(request, cur_user, cur_team)
+        return JsonResponse({"errors": "access_error"}, status=400)
+    else:
+        return JsonResponse({"errors": "access_error"}, status=400)
+
+
+async def exercises_api_async(request):
+    """
+    Async analogue of exercises_api() for read operations, it has to be served under ASGI.
+    Data is loaded by worker threads concurrently, so the event loop isn't blocked.
+        In case of any error client will get next response: JsonResponse({"errors": "access_error"}, status=400).\n
+    Existing parameteres (Controlling Variable for any parameter is: 'parameter'_status):\n
+    * 'get_exs_all' -> Get all exercises from selected folder.
+    * 'get_exs_one' -> Get one exercise by ID.
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Return an JsonResponse with next parameteres:\n
+    * 'errors' -> Error text in case getting any error.
+    * 'status' -> Response code.
+    * 'data' -> Requiered data depending on the request method and the parameter sent, if status code is OK.
+    :rtype: [JsonResponse]
+
+    """
+    context = await concurrency.get_request_context(request)
+    if not context['is_authenticated']:
+        return JsonResponse({"errors": "authenticate_err"}, status=400)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.method == "GET" and is_ajax:
+        get_exs_all_status = 0
+        get_exs_one_status = 0
+        cur_user = context['cur_user']
+        cur_team = context['cur_team']
+        if cur_user is None:
+            return JsonResponse({"errors": "trouble_with_user"}, status=400)
+        try:
+            get_exs_all_status = int(request.GET.get("get_exs_all", 0))
+        except:
+            pass
+        try:
+            get_exs_one_status = int(request.GET.get("get_exs_one", 0))
+        except:
+            pass
+        if get_exs_all_status == 1:
+            return await v_api.GET_get_exs_all_async(request, cur_user, cur_team)
+        elif get_exs_one_status == 1:
+            return await v_api.GET_get_exs_one_async(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     else:
         return JsonResponse({"errors": "access_error"}, status=400)
@@ -328,11 +373,7 @@ def folders_api(request):
     is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
     if request.method == "POST" and is_ajax:
         c_id = -1
-        cur_team = -1
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         parent_id = None
         edit_status = 0
         delete_status = 0
@@ -357,26 +398,22 @@ def folders_api(request):
             change_order_status = int(request.POST.get("change_order", 0))
         except:
             pass
-        cur_user = User.objects.filter(email=request.user).only("id")
-        if not cur_user.exists() or cur_user[0].id == None:
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
         if edit_status == 1:
-            return v_api.POST_edit_folder(request, cur_user[0], cur_team, c_id, parent_id)
+            return v_api.POST_edit_folder(request, cur_user, cur_team, c_id, parent_id)
         elif delete_status == 1:
-            return v_api.POST_delete_folder(request, cur_user[0], c_id)
+            return v_api.POST_delete_folder(request, cur_user, c_id)
         elif change_order_status == 1:
-            return v_api.POST_change_order_folder(request, cur_user[0])
+            return v_api.POST_change_order_folder(request, cur_user)
         return JsonResponse({"errors": "access_error"}, status=400)
     elif request.method == "GET" and is_ajax:
-        cur_team = -1
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         nfb_folders_status = 0
         nfb_folders_set_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        if not cur_user.exists() or cur_user[0].id == None:
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
         try:
             nfb_folders_status = int(request.GET.get("nfb_folders", 0))
@@ -387,9 +424,9 @@ def folders_api(request):
         except:
             pass
         if nfb_folders_status == 1:
-            return v_api.GET_nfb_folders(request, cur_user[0])
+            return v_api.GET_nfb_folders(request, cur_user)
         elif nfb_folders_set_status == 1:
-            return v_api.GET_nfb_folders_set(request, cur_user[0], cur_team)
+            return v_api.GET_nfb_folders_set(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     else:
         return JsonResponse({"errors": "access_error"}, status=400)
@@ -1,3 +1,133 @@
+import json
 from django.test import TestCase
+from references.models import UserTeam, UserSeason
+from events.models import UserEvent, EventVideoLink
+from players.models import UserPlayer, PlayerCard
+from matches.models import UserMatch, UserProtocol
+import matches.v_api as v_api
+import api.testing as testing
 
-# Create your tests here.
+
+
+class MatchesQueriesTest(testing.TableSelectsMixin, TestCase):
+    """
+    Each entity is fetched once: match and protocol by one query, related objects are loaded with them.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = testing.create_test_data()
+        cls.team = UserTeam.objects.filter(user_id=cls.user).order_by('id').first()
+        cls.season = UserSeason.objects.filter(user_id=cls.user).order_by('id').first()
+        cls.match = UserMatch.objects.filter(team_id=cls.team).order_by('event_id').first()
+        cls.protocols = list(UserProtocol.objects.filter(match=cls.match).order_by('id'))
+        cls.protocol = cls.protocols[0]
+
+    def call(self, func, method, params, with_team=True):
+        request = testing.make_request(self.user, method, params, self.team)
+        if with_team:
+            return testing.capture_queries(func, request, self.user, self.team.id)
+        return testing.capture_queries(func, request, self.user)
+
+    def test_get_matches(self):
+        response, queries = self.call(v_api.GET_get_matches, "GET", {'season': self.season.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserSeason, 1)
+        self.assertSelects(queries, UserMatch, 1)
+        for model in [UserEvent, EventVideoLink, UserTeam]:
+            self.assertSelects(queries, model, 0)
+
+    def test_get_match(self):
+        response, queries = self.call(v_api.GET_get_match, "GET", {'id': self.match.event_id_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserMatch, 1)
+        for model in [UserEvent, EventVideoLink, UserTeam]:
+            self.assertSelects(queries, model, 0)
+
+    def test_get_match_not_found(self):
+        response, queries = self.call(v_api.GET_get_match, "GET", {'id': -1})
+        self.assertEqual(response.status_code, 400)
+        self.assertSelects(queries, UserMatch, 1)
+
+    def test_get_match_protocol(self):
+        response, queries = self.call(v_api.GET_get_match_protocol, "GET", {'id': self.match.event_id_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserProtocol, 1)
+        for model in [UserPlayer, EventVideoLink]:
+            self.assertSelects(queries, model, 0)
+
+    def test_get_match_video_event(self):
+        response, queries = self.call(v_api.GET_get_match_video_event, "GET", {'id': self.match.event_id_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserEvent, 1)
+        self.assertSelects(queries, EventVideoLink, 1)
+
+    def test_get_match_video_protocol(self):
+        response, queries = self.call(v_api.GET_get_match_video_protocol, "GET", {'id': self.protocol.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserProtocol, 1)
+        self.assertSelects(queries, EventVideoLink, 0)
+
+    def test_edit_match(self):
+        data = {
+            'date': "2022-01-01", 'time': "12:00", 'duration': 90, 'goals': 1, 'penalty': 0, 'opponent_name': "Opponent",
+            'o_goals': 0, 'o_penalty': 0, 'place': "", 'tournament': "", 'm_type': 0, 'm_format': "",
+        }
+        params = {'id': self.match.event_id_id, 'data': json.dumps(data)}
+        response, queries = self.call(v_api.POST_edit_match, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserMatch, 1)
+        self.assertSelects(queries, UserEvent, 0)
+        self.assertSelects(queries, UserTeam, 0)
+
+    def test_delete_match(self):
+        response, queries = self.call(v_api.POST_delete_match, "POST", {'id': self.match.event_id_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserEvent, 1)
+        self.assertFalse(UserMatch.objects.filter(event_id=self.match.event_id_id).exists())
+
+    def test_edit_players_protocol(self):
+        params = {'protocol_id': self.protocol.id, 'key': "goal", 'value': 1}
+        response, queries = self.call(v_api.POST_edit_players_protocol, "POST", params, with_team=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserProtocol, 1)
+        self.protocol.refresh_from_db()
+        self.assertEqual(self.protocol.goal, 1)
+
+    def test_add_players_protocol(self):
+        player = UserPlayer.objects.create(user=self.user, team=self.team, card=PlayerCard.objects.create(), surname="New", name="Player")
+        params = {'match_id': self.match.event_id_id, 'team_id': self.team.id, 'data': json.dumps([player.id])}
+        request = testing.make_request(self.user, "POST", params, self.team)
+        response, queries = testing.capture_queries(v_api.POST_add_delete_players_protocol, request, self.user, True)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserMatch, 1)
+        self.assertSelects(queries, UserPlayer, 1)
+        self.assertSelects(queries, UserProtocol, 1)
+
+    def test_delete_players_protocol(self):
+        params = {'match_id': self.match.event_id_id, 'team_id': self.team.id, 'data': json.dumps([self.protocol.id])}
+        request = testing.make_request(self.user, "POST", params, self.team)
+        response, queries = testing.capture_queries(v_api.POST_add_delete_players_protocol, request, self.user, False)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserProtocol, 1)
+        self.assertFalse(UserProtocol.objects.filter(id=self.protocol.id).exists())
+
+    def test_edit_players_protocol_order(self):
+        params = {'protocols[]': [protocol.id for protocol in reversed(self.protocols)]}
+        response, queries = self.call(v_api.POST_edit_players_protocol_order, "POST", params, with_team=False)
+        self.assertEqual(response.status_code, 200)
+        # each protocol is read once.
+        self.assertSelects(queries, UserProtocol, len(self.protocols))
+
+    def test_edit_match_video_event(self):
+        params = {'id': self.match.event_id_id, 'links[]': ["https://video.local/1"], 'notes[]': [""]}
+        response, queries = self.call(v_api.POST_edit_match_video_event, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserEvent, 1)
+        self.assertSelects(queries, EventVideoLink, 1)
+
+    def test_edit_match_video_protocol(self):
+        params = {'id': self.protocol.id, 'links[]': ["https://video.local/1"], 'notes[]': [""]}
+        response, queries = self.call(v_api.POST_edit_match_video_protocol, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserProtocol, 1)
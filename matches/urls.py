@@ -7,5 +7,6 @@ from matches import views
 urlpatterns = [
     path('', views.matches, name="base_matches"),
     path('match', views.match, name="base_match"),
-    path('matches_api', views.matches_api, name="matches_api")
+    path('matches_api', views.matches_api, name="matches_api"),
+    path('matches_api_async', views.matches_api_async, name="matches_api_async")
 ]
@@ -1,17 +1,22 @@
-from django.http import JsonResponse
 from django.forms.models import model_to_dict
+from api.responses import ApiJsonResponse, get_list_response
 import json
 import re
 from datetime import datetime, date, timedelta
-from references.models import UserTeam, ClubTeam
+from references.models import UserTeam, ClubTeam, UserSeason, ClubSeason
 from events.models import UserEvent, ClubEvent, EventVideoLink
 from matches.models import UserMatch, ClubMatch, UserProtocol, ClubProtocol
 from references.models import PlayerProtocolStatus
 from players.models import UserPlayer, ClubPlayer
-from nanofootball.views import util_check_access
+from api.permissions import util_check_access
+from api.queries import get_one_or_none, get_scoped_one, get_object_values
+import api.concurrency as concurrency
+import api.languages as languages
+import api.refs_cache as refs_cache
 
 
 LANG_CODE_DEFAULT = "en"
+MATCHES_CHUNK_SIZE = 500
 
 def get_by_language_code(value, code):
     """
@@ -313,6 +318,19 @@ def set_refs_translations(data, lang_code):
     return data
 
 
+def load_matches_refs():
+    """
+    Return data of Matches' References without translations. Tables are taken from cache of references, check api.refs_cache.
+
+    :return: Dictionary of references.
+    :rtype: dict[list[object]]
+
+    """
+    refs = {}
+    refs['player_protocol_status'] = refs_cache.get_ref_values(PlayerProtocolStatus, tags__matches=1)
+    return refs
+
+
 def get_matches_refs(request):
     """
     Return data of Matches' References with translations.
@@ -323,8 +341,7 @@ def get_matches_refs(request):
     :rtype: dict[list[object]]
 
     """
-    refs = {}
-    refs['player_protocol_status'] = PlayerProtocolStatus.objects.filter(tags__matches=1).values()
+    refs = load_matches_refs()
     for elem in refs['player_protocol_status']:
         elem['is_red'] = "matches_red" in elem['tags'] and elem['tags']['matches_red'] == 1
     refs = set_refs_translations(refs, request.LANGUAGE_CODE)
@@ -349,6 +366,244 @@ def count_videos(data):
     return counter
 
 
+def get_video_link_data(video_link):
+    """
+    Return links and notes of video link's object.
+
+    :param video_link: Video link's object.
+    :type video_link: Model.object[EventVideoLink] or None
+    :return: Dictionary with links and notes.
+    :rtype: dict['links': list[str], 'notes': list[str]]
+
+    """
+    res_data = {'links': [], 'notes': []}
+    try:
+        res_data["links"] = video_link.json_link
+        res_data["notes"] = video_link.description
+    except:
+        pass
+    return res_data
+
+
+def get_season_matches(request, cur_user, cur_team, cur_season):
+    """
+    Return queryset of matches of current team in selected season or None if season not found.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param cur_season: The current season, that is selected by the user.
+    :type cur_season: [int]
+    :return: Matches' queryset or None.
+    :rtype: [QuerySet] or None
+
+    """
+    f_season = None
+    if request.user.club_id is not None:
+        f_season = ClubSeason.objects.filter(id=cur_season, club_id=request.user.club_id).first()
+    else:
+        f_season = UserSeason.objects.filter(id=cur_season, user_id=cur_user).first()
+    if not f_season or f_season.id == None:
+        return None
+    date_range = [
+        datetime.combine(f_season.date_with, datetime.min.time()),
+        datetime.combine(f_season.date_by, datetime.max.time())
+    ]
+    if request.user.club_id is not None:
+        f_matches = ClubMatch.objects.filter(team_id=cur_team, event_id__club_id=request.user.club_id, event_id__date__range=date_range)
+    else:
+        f_matches = UserMatch.objects.filter(team_id=cur_team, event_id__user_id=cur_user, event_id__date__range=date_range)
+    return f_matches.select_related('team_id', 'event_id', 'event_id__video_link')
+
+
+def iter_matches_data(request, f_matches):
+    """
+    Return generator of match objects for matches' list. Queryset is read by chunks.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param f_matches: Matches' queryset. Check get_season_matches().
+    :type f_matches: [QuerySet]
+    :return: Generator of match objects.
+    :rtype: generator[object]
+
+    """
+    for match in f_matches.iterator(chunk_size=MATCHES_CHUNK_SIZE):
+        match_obj = model_to_dict(match)
+        match_obj['team_name'] = match.team_id.name
+        match_obj['date_timestamp'] = get_date_timestamp_from_datetime(match.event_id.date)
+        match_obj['date'] = get_date_str_from_datetime(match.event_id.date, request.LANGUAGE_CODE)
+        match_obj['date_day'] = get_day_from_datetime(match.event_id.date, request.LANGUAGE_CODE)
+        match_obj['date_time'] = get_time_from_datetime(match.event_id.date)
+        match_res = get_match_result(match_obj)
+        match_obj['result'] = match_res[0]
+        match_obj['goals_equal'] = match_res[1]
+        match_obj['duration'] = get_duration_normal_format(match.duration)
+        match_obj['goals'] = match.goals if (match.goals != 0 or match.o_goals != 0) else '-'
+        match_obj['o_goals'] = match.o_goals if (match.goals != 0 or match.o_goals != 0) else '-'
+        match_obj['penalty'] = match.penalty if (match.penalty != 0 or match.o_penalty != 0) else '-'
+        match_obj['o_penalty'] = match.o_penalty if (match.penalty != 0 or match.o_penalty != 0) else '-'
+        match_videos = {'links': [], 'notes': []}
+        try:
+            match_videos["links"] = match.event_id.video_link.json_link
+        except:
+            pass
+        match_obj['videos_count'] = count_videos(match_videos)
+        yield match_obj
+
+
+def get_match_snapshot(request, match):
+    """
+    Return match's header and protocol prepared for showing without database. Snapshot is saved in shared link,
+    so it contains only JSON compatible values. Dates and statuses are translated at current request's language.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param match: Match's object.
+    :type match: Model.object[UserMatch] or Model.object[ClubMatch]
+    :return: Dictionary with keys "match" and "protocol".
+    :rtype: dict['match': [obj], 'protocol': list[obj]]
+
+    """
+    match_obj = {
+        'id': match.event_id.id,
+        'team_name': match.team_id.name,
+        'opponent_name': match.opponent,
+        'date': get_date_str_from_datetime(match.event_id.date, request.LANGUAGE_CODE),
+        'time': get_time_from_datetime(match.event_id.date),
+        'duration': get_duration_normal_format(match.duration),
+        'goals': match.goals,
+        'o_goals': match.o_goals,
+        'penalty': match.penalty,
+        'o_penalty': match.o_penalty,
+        'place': match.place,
+        'tournament': match.tournament,
+        'm_type': match.m_type,
+        'm_format': match.m_format,
+    }
+    match_obj['result'] = get_match_result(match_obj)[0]
+    if isinstance(match, ClubMatch):
+        protocol = ClubProtocol.objects.filter(match=match)
+    else:
+        protocol = UserProtocol.objects.filter(match=match)
+    protocol_data = []
+    for protocol_elem in protocol.select_related('player', 'p_status'):
+        tmp_status = get_protocol_status(request, protocol_elem.p_status)
+        protocol_data.append({
+            'is_opponent': protocol_elem.is_opponent,
+            'p_num': protocol_elem.p_num,
+            'player_name': f"{protocol_elem.player.surname} {protocol_elem.player.name}",
+            'minute_from': protocol_elem.minute_from,
+            'minute_to': protocol_elem.minute_to,
+            'goal': protocol_elem.goal,
+            'penalty': protocol_elem.penalty,
+            'p_pass': protocol_elem.p_pass,
+            'yellow_card': protocol_elem.yellow_card,
+            'red_card': protocol_elem.red_card,
+            'estimation': protocol_elem.estimation,
+            'is_captain': protocol_elem.is_captain,
+            'is_goalkeeper': protocol_elem.is_goalkeeper,
+            'status_full': tmp_status['full'],
+            'status_short': tmp_status['short'],
+        })
+    return {'match': match_obj, 'protocol': protocol_data}
+
+
+
+def get_match_queryset(request, cur_team, match_id):
+    """
+    Return queryset of one match with loaded team, event and event's video link.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param match_id: Match's ID (ID of event).
+    :type match_id: [int]
+    :return: Queryset of match.
+    :rtype: [QuerySet]
+
+    """
+    match = None
+    if request.user.club_id is not None:
+        match = ClubMatch.objects.filter(event_id=match_id, team_id=cur_team)
+    else:
+        match = UserMatch.objects.filter(event_id=match_id, team_id=cur_team)
+    return match.select_related('team_id', 'event_id', 'event_id__video_link')
+
+
+def get_match_data(match):
+    """
+    Return match's data from match loaded by get_match_queryset(). Function doesn't send queries.
+
+    :param match: Match's object.
+    :type match: Model.object[UserMatch] or Model.object[ClubMatch]
+    :return: Match's data.
+    :rtype: dict[str]
+
+    """
+    res_data = get_object_values(match)
+    res_data['date'] = get_date_str_from_datetime(match.event_id.date, LANG_CODE_DEFAULT)
+    res_data['time'] = get_time_from_datetime(match.event_id.date)
+    res_data['duration'] = get_duration_normal_format(match.duration)
+    res_data['team_name'] = match.team_id.name
+    res_data['opponent_name'] = match.opponent
+    match_res = get_match_result(res_data)
+    res_data['result'] = match_res[0]
+    match_videos = get_video_link_data(match.event_id.video_link)
+    res_data['videos_count'] = count_videos(match_videos)
+    return res_data
+
+
+def get_match_protocol_queryset(request, match_id):
+    """
+    Return queryset of match's protocol with loaded players, statuses and video links.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param match_id: Match's ID (ID of event).
+    :type match_id: [int]
+    :return: Queryset of protocol.
+    :rtype: [QuerySet]
+
+    """
+    protocol = None
+    if request.user.club_id is not None:
+        protocol = ClubProtocol.objects.filter(match=match_id)
+    else:
+        protocol = UserProtocol.objects.filter(match=match_id)
+    return protocol.select_related('player', 'p_status', 'video_link')
+
+
+def get_match_protocol_data(request, protocol):
+    """
+    Return list of protocol's data from protocol loaded by get_match_protocol_queryset(). Function doesn't send queries.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param protocol: Protocol's objects.
+    :type protocol: list[Model.object[UserProtocol]] or list[Model.object[ClubProtocol]]
+    :return: List of protocol's data.
+    :rtype: list[dict]
+
+    """
+    res_data = []
+    for protocol_elem in protocol:
+        protocol_dict = model_to_dict(protocol_elem)
+        protocol_dict['player_name'] = f"{protocol_elem.player.surname} {protocol_elem.player.name}"
+        protocol_dict['player_name_full'] = f"{protocol_elem.player.surname} {protocol_elem.player.name} {protocol_elem.player.patronymic}"
+        tmp_status = get_protocol_status(request, protocol_elem.p_status)
+        protocol_dict['status_full'] = tmp_status['full']
+        protocol_dict['status_short'] = tmp_status['short']
+        protocol_dict['status_red'] = 1 if protocol_elem.p_status and 'matches_red' in protocol_elem.p_status.tags and protocol_elem.p_status.tags['matches_red'] == 1 else 0
+        protocol_videos = get_video_link_data(protocol_elem.video_link)
+        protocol_dict['videos_count'] = count_videos(protocol_videos)
+        res_data.append(protocol_dict)
+    return res_data
+
 
 # --------------------------------------------------
 # MATCHES API
@@ -377,24 +632,24 @@ def POST_edit_match(request, cur_user, cur_team):
         'perms_user': ["matches.change_usermatch", "matches.add_usermatch"], 
         'perms_club': ["matches.change_clubmatch", "matches.add_clubmatch"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
     post_data = request.POST.get("data", None)
     try:
         post_data = json.loads(post_data)
     except:
         post_data = None
     if not post_data:
-        return JsonResponse({"errors": "Can't parse post data"}, status=400)
+        return ApiJsonResponse({"errors": "Can't parse post data"}, status=400)
     adding_mode = False
     c_datetime = set_value_as_datetime(f"{post_data['date']} {post_data['time']}:00")
     c_match = None
     if request.user.club_id is not None:
-        c_match = ClubMatch.objects.filter(event_id=match_id, team_id=cur_team)
-        if not c_match.exists() or c_match[0].event_id == None:
+        c_match = get_one_or_none(ClubMatch.objects.filter(event_id=match_id, team_id=cur_team).select_related('event_id'))
+        if c_match is None:
             adding_mode = True
-            c_team = ClubTeam.objects.filter(id=cur_team)
-            if not c_team.exists() or c_team[0].id == None:
-                return JsonResponse({"err": "Team not found.", "success": False}, status=400)
+            c_team = get_one_or_none(ClubTeam.objects.filter(id=cur_team))
+            if c_team is None:
+                return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
             try:
                 if c_datetime:
                     new_event = ClubEvent(user_id=cur_user, date=c_datetime, club_id=request.user.club_id)
@@ -402,17 +657,15 @@ def POST_edit_match(request, cur_user, cur_team):
                     new_event = ClubEvent(user_id=cur_user, club_id=request.user.club_id)
                 new_event.save()
             except:
-                return JsonResponse({"errors": "Can't create event"}, status=400)
-            c_match = ClubMatch(team_id=c_team[0], event_id=new_event)
-        else:
-            c_match = c_match[0]
+                return ApiJsonResponse({"errors": "Can't create event"}, status=400)
+            c_match = ClubMatch(team_id=c_team, event_id=new_event)
     else:
-        c_match = UserMatch.objects.filter(event_id=match_id, team_id=cur_team)
-        if not c_match.exists() or c_match[0].event_id == None:
+        c_match = get_one_or_none(UserMatch.objects.filter(event_id=match_id, team_id=cur_team).select_related('event_id'))
+        if c_match is None:
             adding_mode = True
-            c_team = UserTeam.objects.filter(id=cur_team)
-            if not c_team.exists() or c_team[0].id == None:
-                return JsonResponse({"err": "Team not found.", "success": False}, status=400)
+            c_team = get_one_or_none(UserTeam.objects.filter(id=cur_team))
+            if c_team is None:
+                return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
             try:
                 if c_datetime:
                     new_event = UserEvent(user_id=cur_user, date=c_datetime)
@@ -420,12 +673,10 @@ def POST_edit_match(request, cur_user, cur_team):
                     new_event = UserEvent(user_id=cur_user)
                 new_event.save()
             except:
-                return JsonResponse({"errors": "Can't create event"}, status=400)
-            c_match = UserMatch(team_id=c_team[0], event_id=new_event)
-        else:
-            c_match = c_match[0]
+                return ApiJsonResponse({"errors": "Can't create event"}, status=400)
+            c_match = UserMatch(team_id=c_team, event_id=new_event)
     if c_match == None:
-        return JsonResponse({"err": "Match not found.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Match not found.", "success": False}, status=400)
     if c_datetime:
         c_match.event_id.date = c_datetime
     c_match.duration = set_value_as_duration(post_data['duration'])
@@ -442,8 +693,8 @@ def POST_edit_match(request, cur_user, cur_team):
         c_match.save()
         res_data = f'Match with id: [{c_match.event_id}] is added / edited successfully.'
     except Exception as e:
-        return JsonResponse({"err": "Can't edit or add the match.", "success": False}, status=200)
-    return JsonResponse({"data": res_data, "success": True}, status=200)
+        return ApiJsonResponse({"err": "Can't edit or add the match.", "success": False}, status=200)
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
 
 
 def POST_delete_match(request, cur_user, cur_team):
@@ -470,19 +721,16 @@ def POST_delete_match(request, cur_user, cur_team):
         'perms_user': ["matches.delete_usermatch"], 
         'perms_club': ["matches.delete_clubmatch"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-    if request.user.club_id is not None:
-        c_event = ClubEvent.objects.filter(id=match_id, club_id=request.user.club_id)
-    else:
-        c_event = UserEvent.objects.filter(id=match_id, user_id=cur_user)
-    if c_event == None or not c_event.exists() or c_event[0].id == None:
-        return JsonResponse({"errors": "access_error"}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    c_event = get_scoped_one(request, UserEvent, ClubEvent, {'user_id': cur_user}, {'club_id': request.user.club_id}, id=match_id)
+    if c_event is None:
+        return ApiJsonResponse({"errors": "access_error"}, status=400)
     else:
         try:
             c_event.delete()
-            return JsonResponse({"data": {"id": match_id}, "success": True}, status=200)
+            return ApiJsonResponse({"data": {"id": match_id}, "success": True}, status=200)
         except:
-            return JsonResponse({"errors": "Can't delete exercise"}, status=400)
+            return ApiJsonResponse({"errors": "Can't delete exercise"}, status=400)
 
 
 def POST_edit_players_protocol(request, cur_user):
@@ -519,9 +767,9 @@ def POST_edit_players_protocol(request, cur_user):
             f'{c_key}': c_value
         }
         if c_key in keys_with_values:
-            f_protocol = AnyProtocol.objects.filter(id=protocol_id)
-            if f_protocol.exists() and f_protocol[0].id != None:
-                if f_protocol[0].p_status and 'matches_reset' in f_protocol[0].p_status.tags and f_protocol[0].p_status.tags['matches_reset'] == 1:
+            f_protocol = get_one_or_none(AnyProtocol.objects.filter(id=protocol_id).select_related('p_status'))
+            if f_protocol is not None:
+                if f_protocol.p_status and 'matches_reset' in f_protocol.p_status.tags and f_protocol.p_status.tags['matches_reset'] == 1:
                     c_value = None
                     if c_key == "dislike" or c_key == "like":
                         c_value = False
@@ -538,11 +786,11 @@ def POST_edit_players_protocol(request, cur_user):
                 c_status_id = int(c_value)
             except:
                 pass
-            f_status = PlayerProtocolStatus.objects.filter(id=c_status_id, tags__matches=1)
+            f_status = get_one_or_none(PlayerProtocolStatus.objects.filter(id=c_status_id, tags__matches=1))
             is_reset_values = False
-            if f_status.exists() and f_status[0].id != None:
-                is_reset_values = 'matches_reset' in f_status[0].tags and f_status[0].tags['matches_reset'] == 1
-                update_dict = {'p_status': f_status[0].id}
+            if f_status is not None:
+                is_reset_values = 'matches_reset' in f_status.tags and f_status.tags['matches_reset'] == 1
+                update_dict = {'p_status': f_status.id}
             else:
                 update_dict = {'p_status': None}
             if is_reset_values:
@@ -552,21 +800,21 @@ def POST_edit_players_protocol(request, cur_user):
                     else:
                         update_dict[t_key] = False
         elif c_key == "is_captain" or c_key == "is_goalkeeper":
-            f_protocol = AnyProtocol.objects.filter(id=protocol_id)
-            if f_protocol.exists() and f_protocol[0].id != None:
-                t_val = getattr(f_protocol[0], c_key)
+            f_protocol = get_one_or_none(AnyProtocol.objects.filter(id=protocol_id))
+            if f_protocol is not None:
+                t_val = getattr(f_protocol, c_key)
                 update_dict[c_key] = not t_val
         elif c_key == "border_black" or c_key == "border_red":
-            f_protocol = AnyProtocol.objects.filter(id=protocol_id)
-            if f_protocol.exists() and f_protocol[0].id != None:
-                t_val = getattr(f_protocol[0], c_key)
+            f_protocol = get_one_or_none(AnyProtocol.objects.filter(id=protocol_id))
+            if f_protocol is not None:
+                t_val = getattr(f_protocol, c_key)
                 t_val = 1 if t_val == 0 else 0
                 update_dict[c_key] = t_val
         AnyProtocol.objects.filter(id=protocol_id).update(**update_dict)
     except Exception as e:
         print(e)
-        return JsonResponse({"err": "Can't edit match protocol.", "success": False}, status=400)
-    return JsonResponse({"data": update_dict, "success": True}, status=200)
+        return ApiJsonResponse({"err": "Can't edit match protocol.", "success": False}, status=400)
+    return ApiJsonResponse({"data": update_dict, "success": True}, status=200)
 
 
 def POST_add_delete_players_protocol(request, cur_user, to_add = True):
@@ -604,8 +852,9 @@ def POST_add_delete_players_protocol(request, cur_user, to_add = True):
     except:
         post_data = None
     if not post_data:
-        return JsonResponse({"errors": "Can't parse post data"}, status=400)
+        return ApiJsonResponse({"errors": "Can't parse post data"}, status=400)
     res_data = []
+    f_match = None
     for pl_id_str in post_data:
         pl_id = None
         try:
@@ -615,21 +864,16 @@ def POST_add_delete_players_protocol(request, cur_user, to_add = True):
         if not pl_id:
             continue
         if to_add:
-            f_player = None
-            f_match = None
-            if request.user.club_id is not None:
-                f_player = ClubPlayer.objects.filter(id=pl_id, team=team_id)
-                f_match = ClubMatch.objects.filter(event_id=match_id)
-            else:
-                f_player = UserPlayer.objects.filter(id=pl_id, user=cur_user, team=team_id)
-                f_match = UserMatch.objects.filter(event_id=match_id)
-            if f_player.exists() and f_player[0].id != None and f_match.exists() and f_match[0].event_id != None:
+            if f_match is None:
+                f_match = get_scoped_one(request, UserMatch, ClubMatch, event_id=match_id)
+            f_player = get_scoped_one(request, UserPlayer, ClubPlayer, {'user': cur_user}, id=pl_id, team=team_id)
+            if f_player is not None and f_match is not None:
                 protocol = None
                 created = False
                 if request.user.club_id is not None:
-                    protocol, created = ClubProtocol.objects.get_or_create(match=f_match[0], player=f_player[0])
+                    protocol, created = ClubProtocol.objects.get_or_create(match=f_match, player=f_player)
                 else:
-                    protocol, created = UserProtocol.objects.get_or_create(match=f_match[0], player=f_player[0])
+                    protocol, created = UserProtocol.objects.get_or_create(match=f_match, player=f_player)
                 if created:
                     try:
                         protocol.is_opponent = is_opponent
@@ -638,16 +882,12 @@ def POST_add_delete_players_protocol(request, cur_user, to_add = True):
                     except:
                         pass
                 else:
-                    res_data.append(f"Protocol with id: {protocol.id} (refer on player: {f_player[0].id} and on match: {f_match[0].event_id}) already existed.")
+                    res_data.append(f"Protocol with id: {protocol.id} (refer on player: {f_player.id} and on match: {f_match.event_id}) already existed.")
         else:
-            f_protocol = None
-            if request.user.club_id is not None:
-                f_protocol = ClubProtocol.objects.filter(id=pl_id)
-            else:
-                f_protocol = UserProtocol.objects.filter(id=pl_id)
-            if f_protocol != None and f_protocol.exists() and f_protocol[0].id != None:
+            f_protocol = get_scoped_one(request, UserProtocol, ClubProtocol, id=pl_id)
+            if f_protocol is not None:
                 try:
-                    f_protocol[0].delete()
+                    f_protocol.delete()
                     res_data.append(f"Protocol was deleted.")
                 except:
                     res_data.append(f"Protocol couldnt delete.")
@@ -659,7 +899,7 @@ def POST_add_delete_players_protocol(request, cur_user, to_add = True):
         is_success = False
         status = 400
         res_data = "RESULT IS EMPTY."
-    return JsonResponse({"data": res_data, "success": is_success}, status=status)
+    return ApiJsonResponse({"data": res_data, "success": is_success}, status=status)
 
 
 def POST_edit_players_protocol_order(request, cur_user):
@@ -696,7 +936,7 @@ def POST_edit_players_protocol_order(request, cur_user):
             except Exception as e:
                 temp_res_arr.append(f'Folder [{found_protocol.id}] -> ERROR / Not access or another reason')
     res_data = {'res_arr': temp_res_arr, 'type': "change_order"}
-    return JsonResponse({"data": res_data, "success": True}, status=200)
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
 
 
 def POST_edit_match_video_event(request, cur_user, cur_team):
@@ -724,20 +964,15 @@ def POST_edit_match_video_event(request, cur_user, cur_team):
     res_data = "ERROR."
     success_state = False
     status_state = 400
-    f_event = None
-    if request.user.club_id is not None:
-        f_event = ClubEvent.objects.filter(id=event_id)
-    else:
-        f_event = UserEvent.objects.filter(id=event_id)
-    if f_event != None and f_event.exists() and f_event[0].id != None:
-        f_event_video = f_event[0].video_link
+    f_event = get_scoped_one(request, UserEvent, ClubEvent, id=event_id)
+    if f_event is not None:
+        f_event_video = f_event.video_link
         if f_event_video == None:
             f_event_video = EventVideoLink()
         f_event_video.json_link = links_data
         f_event_video.description = notes_data
         try:
             f_event_video.save()
-            f_event = f_event[0]
             f_event.video_link = f_event_video
             f_event.save()
             success_state = True
@@ -747,7 +982,7 @@ def POST_edit_match_video_event(request, cur_user, cur_team):
             print(e)
             res_data = f"Event with video not saved: {f_event.id}"
             pass
-    return JsonResponse({"data": res_data, "success": success_state}, status=status_state)
+    return ApiJsonResponse({"data": res_data, "success": success_state}, status=status_state)
 
 
 def POST_edit_match_video_protocol(request, cur_user, cur_team):
@@ -775,20 +1010,15 @@ def POST_edit_match_video_protocol(request, cur_user, cur_team):
     res_data = "ERROR."
     success_state = False
     status_state = 400
-    f_protocol = None
-    if request.user.club_id is not None:
-        f_protocol = ClubProtocol.objects.filter(id=protocol_id)
-    else:
-        f_protocol = UserProtocol.objects.filter(id=protocol_id)
-    if f_protocol.exists() and f_protocol[0].id != None:
-        f_protocol_video = f_protocol[0].video_link
+    f_protocol = get_scoped_one(request, UserProtocol, ClubProtocol, id=protocol_id)
+    if f_protocol is not None:
+        f_protocol_video = f_protocol.video_link
         if f_protocol_video == None:
             f_protocol_video = EventVideoLink()
         f_protocol_video.json_link = links_data
         f_protocol_video.description = notes_data
         try:
             f_protocol_video.save()
-            f_protocol = f_protocol[0]
             f_protocol.video_link = f_protocol_video
             f_protocol.save()
             success_state = True
@@ -798,9 +1028,41 @@ def POST_edit_match_video_protocol(request, cur_user, cur_team):
             print(e)
             res_data = f"Event with video not saved: {f_protocol.id}"
             pass
-    return JsonResponse({"data": res_data, "success": success_state}, status=status_state)
+    return ApiJsonResponse({"data": res_data, "success": success_state}, status=status_state)
+
+
+
+
+def GET_get_matches(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on GET operation "Get matches of selected season".
+    Matches are sent by StreamingJsonResponse (by ApiJsonResponse under ASGI, check get_list_response()).
 
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: StreamingJsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: StreamingJsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
 
+    """
+    cur_season = -1
+    try:
+        cur_season = int(request.GET.get("season", request.session['season']))
+    except:
+        pass
+    if not util_check_access(cur_user, {
+        'perms_user': ["matches.view_usermatch"], 
+        'perms_club': ["matches.view_clubmatch"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    f_matches = get_season_matches(request, cur_user, cur_team, cur_season)
+    if f_matches is None:
+        return ApiJsonResponse({"errors": "Season not found.", "success": False}, status=400)
+    matches_data = iter_matches_data(request, f_matches)
+    return get_list_response(request, languages.iter_trimmed(matches_data, languages.get_trim_language(request)))
 
 
 def GET_get_match(request, cur_user, cur_team, return_JsonResponse=True):
@@ -826,41 +1088,62 @@ def GET_get_match(request, cur_user, cur_team, return_JsonResponse=True):
         match_id = int(request.GET.get("id", -1))
     except:
         pass
-    res_data = {}
-    match = None
     if not util_check_access(cur_user, {
         'perms_user': ["matches.view_usermatch"], 
         'perms_club': ["matches.view_clubmatch"]
     }):
         if return_JsonResponse:
-            return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
         else:
             return None
-    if request.user.club_id is not None:
-        match = ClubMatch.objects.filter(event_id=match_id, team_id=cur_team)
-    else:
-        match = UserMatch.objects.filter(event_id=match_id, team_id=cur_team)
-    if match.exists() and match[0].event_id != None:
-        res_data = match.values()[0]
-        res_data['date'] = get_date_str_from_datetime(match[0].event_id.date, LANG_CODE_DEFAULT)
-        res_data['time'] = get_time_from_datetime(match[0].event_id.date)
-        res_data['duration'] = get_duration_normal_format(match[0].duration)
-        res_data['team_name'] = match[0].team_id.name
-        res_data['opponent_name'] = match[0].opponent
-        match_res = get_match_result(res_data)
-        res_data['result'] = match_res[0]
-        match_videos = GET_get_match_video_event(request, cur_user, cur_team, False, match[0].event_id.id)
-        res_data['videos_count'] = count_videos(match_videos)
+    match = get_one_or_none(get_match_queryset(request, cur_team, match_id))
+    if match is not None:
+        res_data = get_match_data(match)
         if return_JsonResponse:
-            return JsonResponse({"data": res_data, "success": True}, status=200)
+            res_data = languages.trim_languages(res_data, languages.get_trim_language(request))
+            return ApiJsonResponse({"data": res_data, "success": True}, status=200)
         else:
             return res_data
     if return_JsonResponse:
-        return JsonResponse({"errors": "Match not found.", "success": False}, status=400)
+        return ApiJsonResponse({"errors": "Match not found.", "success": False}, status=400)
     else:
         return None
 
 
+async def GET_get_match_async(request, cur_user, cur_team):
+    """
+    Async variant of GET_get_match(). Match and permissions are loaded concurrently in worker threads.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    match_id = -1
+    try:
+        match_id = int(request.GET.get("id", -1))
+    except:
+        pass
+    has_access, match = await concurrency.gather(
+        concurrency.run_sync(util_check_access, cur_user, {
+            'perms_user': ["matches.view_usermatch"], 
+            'perms_club': ["matches.view_clubmatch"]
+        }),
+        concurrency.get_first(get_match_queryset(request, cur_team, match_id))
+    )
+    if not has_access:
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    if match is None:
+        return ApiJsonResponse({"errors": "Match not found.", "success": False}, status=400)
+    res_data = languages.trim_languages(get_match_data(match), languages.get_trim_language(request))
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
+
+
 def GET_get_match_protocol(request, cur_user, cur_team):
     """
     Return JSON Response or object as result on GET operation "Get protocol of selected match".
@@ -880,26 +1163,37 @@ def GET_get_match_protocol(request, cur_user, cur_team):
         match_id = int(request.GET.get("id", -1))
     except:
         pass
-    res_data = []
-    protocol = None
-    if request.user.club_id is not None:
-        protocol = ClubProtocol.objects.filter(match=match_id)
-    else:
-        protocol = UserProtocol.objects.filter(match=match_id)
-    if protocol.exists() and protocol[0].id != None:
-        for protocol_elem in protocol:
-            protocol_dict = model_to_dict(protocol_elem)
-            protocol_dict['player_name'] = f"{protocol_elem.player.surname} {protocol_elem.player.name}"
-            protocol_dict['player_name_full'] = f"{protocol_elem.player.surname} {protocol_elem.player.name} {protocol_elem.player.patronymic}"
-            tmp_status = get_protocol_status(request, protocol_elem.p_status)
-            protocol_dict['status_full'] = tmp_status['full']
-            protocol_dict['status_short'] = tmp_status['short']
-            protocol_dict['status_red'] = 1 if protocol_elem.p_status and 'matches_red' in protocol_elem.p_status.tags and protocol_elem.p_status.tags['matches_red'] == 1 else 0
-            protocol_videos = GET_get_match_video_protocol(request, cur_user, cur_team, False, protocol_elem.id)
-            protocol_dict['videos_count'] = count_videos(protocol_videos)
-            res_data.append(protocol_dict)
-        return JsonResponse({"data": res_data, "success": True}, status=200)
-    return JsonResponse({"errors": "Match protocol not found.", "success": False}, status=400)
+    protocol = list(get_match_protocol_queryset(request, match_id))
+    if len(protocol) > 0:
+        res_data = languages.trim_languages(get_match_protocol_data(request, protocol), languages.get_trim_language(request))
+        return ApiJsonResponse({"data": res_data, "success": True}, status=200)
+    return ApiJsonResponse({"errors": "Match protocol not found.", "success": False}, status=400)
+
+
+async def GET_get_match_protocol_async(request, cur_user, cur_team):
+    """
+    Async variant of GET_get_match_protocol(). Protocol is loaded in worker thread.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    match_id = -1
+    try:
+        match_id = int(request.GET.get("id", -1))
+    except:
+        pass
+    protocol = await concurrency.get_list(get_match_protocol_queryset(request, match_id))
+    if len(protocol) > 0:
+        res_data = languages.trim_languages(get_match_protocol_data(request, protocol), languages.get_trim_language(request))
+        return ApiJsonResponse({"data": res_data, "success": True}, status=200)
+    return ApiJsonResponse({"errors": "Match protocol not found.", "success": False}, status=400)
 
 
 def GET_get_match_video_event(request, cur_user, cur_team, returnJSONResponse=True, custom_id=None):
@@ -929,24 +1223,15 @@ def GET_get_match_video_event(request, cur_user, cur_team, returnJSONResponse=Tr
         pass
     if custom_id:
         event_id = custom_id
-    event = None
-    if request.user.club_id is not None:
-        event = ClubEvent.objects.filter(id=event_id)
-    else:
-        event = UserEvent.objects.filter(id=event_id)
-    if event.exists() and event[0].id != None:
-        res_data = {'links': [], 'notes': []}
-        try:
-            res_data["links"] = event[0].video_link.json_link
-            res_data["notes"] = event[0].video_link.description
-        except:
-            pass
+    event = get_scoped_one(request, UserEvent, ClubEvent, id=event_id)
+    if event is not None:
+        res_data = get_video_link_data(event.video_link)
         if returnJSONResponse:
-            return JsonResponse({"data": res_data, "success": True}, status=200)
+            return ApiJsonResponse({"data": res_data, "success": True}, status=200)
         else:
             return res_data
     if returnJSONResponse:
-        return JsonResponse({"errors": "Event video not found.", "success": False}, status=400)
+        return ApiJsonResponse({"errors": "Event video not found.", "success": False}, status=400)
     else:
         return None
 
@@ -978,24 +1263,15 @@ def GET_get_match_video_protocol(request, cur_user, cur_team, returnJSONResponse
         pass
     if custom_id:
         protocol_id = custom_id
-    protocol = None
-    if request.user.club_id is not None:
-        protocol = ClubProtocol.objects.filter(id=protocol_id)
-    else:
-        protocol = UserProtocol.objects.filter(id=protocol_id)
-    if protocol.exists() and protocol[0].id != None:
-        res_data = {'links': [], 'notes': []}
-        try:
-            res_data["links"] = protocol[0].video_link.json_link
-            res_data["notes"] = protocol[0].video_link.description
-        except:
-            pass
+    protocol = get_scoped_one(request, UserProtocol, ClubProtocol, id=protocol_id)
+    if protocol is not None:
+        res_data = get_video_link_data(protocol.video_link)
         if returnJSONResponse:
-            return JsonResponse({"data": res_data, "success": True}, status=200)
+            return ApiJsonResponse({"data": res_data, "success": True}, status=200)
         else:
             return res_data
     if returnJSONResponse:
-        return JsonResponse({"errors": "Protocol video not found.", "success": False}, status=400)
+        return ApiJsonResponse({"errors": "Protocol video not found.", "success": False}, status=400)
     else:
         return None
 
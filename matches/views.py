@@ -2,15 +2,19 @@ from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.forms.models import model_to_dict
 
-from users.models import User
+from api.middleware import get_cur_user, get_cur_team, get_cur_season
 from references.models import UserTeam, UserSeason, ClubTeam, ClubSeason
 from system_icons.views import get_ui_elements
 from matches.models import UserMatch, ClubMatch
-from nanofootball.views import util_check_access
-import matches.v_api as v_api
+from api.permissions import util_check_access
+from api.lazy import LazyModule
+import api.concurrency as concurrency
 from datetime import datetime
 
 
+v_api = LazyModule("matches.v_api")
+
+
 
 def matches(request):
     """
@@ -31,60 +35,17 @@ def matches(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["matches.view_usermatch"], 'perms_club': ["matches.view_clubmatch"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    cur_season = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
-    try:
-        cur_season = int(request.session['season'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
+    cur_season = get_cur_season(request)
     matches = []
-    f_season = None
-    if request.user.club_id is not None:
-        f_season = ClubSeason.objects.get(id=cur_season, club_id=request.user.club_id)
-    else:
-        f_season = UserSeason.objects.get(id=cur_season, user_id=cur_user[0])
-    if f_season and f_season.id != None:
-        if request.user.club_id is not None:
-            f_matches = ClubMatch.objects.filter(team_id=cur_team, event_id__club_id=request.user.club_id,
-                event_id__date__range=[
-                    datetime.combine(f_season.date_with, datetime.min.time()),
-                    datetime.combine(f_season.date_by, datetime.max.time())
-                ],
-            )
-        else:
-            f_matches = UserMatch.objects.filter(team_id=cur_team, event_id__user_id=cur_user[0],
-                event_id__date__range=[
-                    datetime.combine(f_season.date_with, datetime.min.time()),
-                    datetime.combine(f_season.date_by, datetime.max.time())
-                ],
-            )
-        for match in f_matches:
-            match_obj = model_to_dict(match)
-            match_obj['team_name'] = match.team_id.name
-            match_obj['date_timestamp'] = v_api.get_date_timestamp_from_datetime(match.event_id.date)
-            match_obj['date'] = v_api.get_date_str_from_datetime(match.event_id.date, request.LANGUAGE_CODE)
-            match_obj['date_day'] = v_api.get_day_from_datetime(match.event_id.date, request.LANGUAGE_CODE)
-            match_obj['date_time'] = v_api.get_time_from_datetime(match.event_id.date)
-            match_res = v_api.get_match_result(match_obj)
-            match_obj['result'] = match_res[0]
-            match_obj['goals_equal'] = match_res[1]
-            match_obj['duration'] = v_api.get_duration_normal_format(match.duration)
-            match_obj['goals'] = match.goals if (match.goals != 0 or match.o_goals != 0) else '-'
-            match_obj['o_goals'] = match.o_goals if (match.goals != 0 or match.o_goals != 0) else '-'
-            match_obj['penalty'] = match.penalty if (match.penalty != 0 or match.o_penalty != 0) else '-'
-            match_obj['o_penalty'] = match.o_penalty if (match.penalty != 0 or match.o_penalty != 0) else '-'
-            match_videos = v_api.GET_get_match_video_event(request, cur_user[0], cur_team, False, match.event_id.id)
-            match_obj['videos_count'] = v_api.count_videos(match_videos)
-            matches.append(match_obj)
+    f_matches = v_api.get_season_matches(request, cur_user, cur_team, cur_season)
+    if f_matches is not None:
+        matches = list(v_api.iter_matches_data(request, f_matches))
     refs = {}
     refs = v_api.get_matches_refs(request)
     return render(request, 'matches/base_matches.html', {
@@ -115,17 +76,13 @@ def match(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["matches.view_usermatch"], 'perms_club': ["matches.view_clubmatch"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
-    match = v_api.GET_get_match(request, cur_user[0], cur_team, False)
+    cur_team = get_cur_team(request)
+    match = v_api.GET_get_match(request, cur_user, cur_team, False)
     if match == None:
         return redirect("matches:base_matches")
     refs = {}
@@ -157,6 +114,7 @@ def matches_api(request):
     * 'get_match_protocol' -> Get one match's protocol by match's ID.
     * 'get_match_video_event' -> Get match's video by match's ID.
     * 'get_match_video_protocol' -> Get match's protocol's video by match's ID.
+    * 'get_matches' -> Get matches of current team in selected season.
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
     :return: Return an JsonResponse with next parameteres:\n
@@ -178,14 +136,10 @@ def matches_api(request):
         edit_players_protocol_order_status = 0
         edit_match_video_event_status = 0
         edit_match_video_protocol_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        if not cur_user.exists() or cur_user[0].id == None:
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         try:
             edit_match_status = int(request.POST.get("edit_match", 0))
         except:
@@ -219,35 +173,32 @@ def matches_api(request):
         except:
             pass
         if edit_match_status == 1:
-            return v_api.POST_edit_match(request, cur_user[0], cur_team)
+            return v_api.POST_edit_match(request, cur_user, cur_team)
         elif delete_match_status == 1:
-            return v_api.POST_delete_match(request, cur_user[0], cur_team)
+            return v_api.POST_delete_match(request, cur_user, cur_team)
         elif add_players_protocol_status == 1:
-            return v_api.POST_add_delete_players_protocol(request, cur_user[0], True)
+            return v_api.POST_add_delete_players_protocol(request, cur_user, True)
         elif delete_players_protocol_status == 1:
-            return v_api.POST_add_delete_players_protocol(request, cur_user[0], False)
+            return v_api.POST_add_delete_players_protocol(request, cur_user, False)
         elif edit_players_protocol_status == 1:
-            return v_api.POST_edit_players_protocol(request, cur_user[0])
+            return v_api.POST_edit_players_protocol(request, cur_user)
         elif edit_players_protocol_order_status == 1:
-            return v_api.POST_edit_players_protocol_order(request, cur_user[0])
+            return v_api.POST_edit_players_protocol_order(request, cur_user)
         elif edit_match_video_event_status == 1:
-            return v_api.POST_edit_match_video_event(request, cur_user[0], cur_team)
+            return v_api.POST_edit_match_video_event(request, cur_user, cur_team)
         elif edit_match_video_protocol_status == 1:
-            return v_api.POST_edit_match_video_protocol(request, cur_user[0], cur_team)
+            return v_api.POST_edit_match_video_protocol(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     elif request.method == "GET" and is_ajax:
         get_match_status = 0
         get_match_protocol_status = 0
         get_match_video_event_status = 0
         get_match_video_protocol_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        if not cur_user.exists() or cur_user[0].id == None:
+        get_matches_status = 0
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         try:
             get_match_status = int(request.GET.get("get_match", 0))
         except:
@@ -264,15 +215,65 @@ def matches_api(request):
             get_match_video_protocol_status = int(request.GET.get("get_match_video_protocol", 0))
         except:
             pass
+        try:
+            get_matches_status = int(request.GET.get("get_matches", 0))
+        except:
+            pass
         if get_match_status == 1:
-            return v_api.GET_get_match(request, cur_user[0], cur_team)
+            return v_api.GET_get_match(request, cur_user, cur_team)
         elif get_match_protocol_status == 1:
-            return v_api.GET_get_match_protocol(request, cur_user[0], cur_team)
+            return v_api.GET_get_match_protocol(request, cur_user, cur_team)
         elif get_match_video_event_status == 1:
-            return v_api.GET_get_match_video_event(request, cur_user[0], cur_team)
+            return v_api.GET_get_match_video_event(request, cur_user, cur_team)
         elif get_match_video_protocol_status == 1:
-            return v_api.GET_get_match_video_protocol(request, cur_user[0], cur_team)
+            return v_api.GET_get_match_video_protocol(request, cur_user, cur_team)
+        elif get_matches_status == 1:
+            return v_api.GET_get_matches(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     else:
         return JsonResponse({"errors": "access_error"}, status=400)
 
+
+async def matches_api_async(request):
+    """
+    Async analogue of matches_api() for read operations, it has to be served under ASGI.
+    Data is loaded by worker threads concurrently, so the event loop isn't blocked.
+        In case of any error client will get next response: JsonResponse({"errors": "access_error"}, status=400).\n
+    Existing parameteres (Controlling Variable for any parameter is: 'parameter'_status):\n
+    * 'get_match' -> Get one match by ID.
+    * 'get_match_protocol' -> Get one match's protocol by match's ID.
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Return an JsonResponse with next parameteres:\n
+    * 'errors' -> Error text in case getting any error.
+    * 'status' -> Response code.
+    * 'data' -> Requiered data depending on the request method and the parameter sent, if status code is OK.
+    :rtype: [JsonResponse]
+
+    """
+    context = await concurrency.get_request_context(request)
+    if not context['is_authenticated']:
+        return JsonResponse({"errors": "authenticate_err"}, status=400)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.method == "GET" and is_ajax:
+        get_match_status = 0
+        get_match_protocol_status = 0
+        cur_user = context['cur_user']
+        if cur_user is None:
+            return JsonResponse({"errors": "trouble_with_user"}, status=400)
+        cur_team = context['cur_team']
+        try:
+            get_match_status = int(request.GET.get("get_match", 0))
+        except:
+            pass
+        try:
+            get_match_protocol_status = int(request.GET.get("get_match_protocol", 0))
+        except:
+            pass
+        if get_match_status == 1:
+            return await v_api.GET_get_match_async(request, cur_user, cur_team)
+        elif get_match_protocol_status == 1:
+            return await v_api.GET_get_match_protocol_async(request, cur_user, cur_team)
+        return JsonResponse({"errors": "access_error"}, status=400)
+    else:
+        return JsonResponse({"errors": "access_error"}, status=400)
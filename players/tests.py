@@ -1,3 +1,123 @@
-from django.test import TestCase
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from users.models import User
+from references.models import UserTeam
+from players.models import UserPlayer, PlayerCard, PlayerCharacteristicsRows, PlayerCharacteristicUser
+import players.v_api as v_api
+import api.testing as testing
 
-# Create your tests here.
+
+
+class EditPlayerQueriesTest(TestCase):
+    """
+    POST_edit_player() saves characteristics in bulk, so amount of queries doesn't depend on amount of rows.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(email="players.tests@nanofootball.local", is_superuser=True, is_staff=True)
+        cls.user.set_unusable_password()
+        cls.user.save()
+        cls.team = UserTeam.objects.create(user_id=cls.user, name="Test team")
+        cls.player = UserPlayer.objects.create(
+            user=cls.user, team=cls.team, card=PlayerCard.objects.create(), surname="Ivanov", name="Ivan"
+        )
+        PlayerCharacteristicsRows.objects.bulk_create([
+            PlayerCharacteristicsRows(user=cls.user, is_nfb=False, parent=0, title={'en': f"Skill {i + 1}"}, order=i)
+            for i in range(41)
+        ])
+        cls.rows = list(PlayerCharacteristicsRows.objects.filter(user=cls.user).order_by('order'))
+
+    def make_request(self, rows):
+        request = RequestFactory().post("/players/players_api", {
+            'edit_player': 1,
+            'id': self.player.id,
+            'data[surname]': "Ivanov",
+            'data[name]': "Ivan",
+            'data[team]': self.team.id,
+            'data[characteristics_id]': [row.id for row in rows],
+            'data[characteristics_stars]': [5 for row in rows],
+            'data[characteristics_notes]': [f"Note {row.id}" for row in rows],
+        })
+        request.user = self.user
+        return request
+
+    def test_characteristics_queries_dont_depend_on_rows(self):
+        # the first request caches permissions' checks, so measured requests differ only by rows.
+        v_api.POST_edit_player(self.make_request([]), self.user, self.team.id)
+        with CaptureQueriesContext(connection) as one_row:
+            response = v_api.POST_edit_player(self.make_request(self.rows[:1]), self.user, self.team.id)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(len(one_row.captured_queries)):
+            response = v_api.POST_edit_player(self.make_request(self.rows[1:]), self.user, self.team.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PlayerCharacteristicUser.objects.filter(player=self.player).count(), 41)
+
+
+class PlayersQueriesTest(testing.TableSelectsMixin, TestCase):
+    """
+    Each entity is fetched once: player by one query, team and card are loaded with player.
+
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = testing.create_test_data()
+        cls.team = UserTeam.objects.filter(user_id=cls.user).order_by('id').first()
+        cls.player = UserPlayer.objects.filter(team=cls.team).order_by('id').first()
+
+    def call(self, func, method, params):
+        request = testing.make_request(self.user, method, params, self.team)
+        return testing.capture_queries(func, request, self.user, self.team.id)
+
+    def test_get_player(self):
+        response, queries = self.call(v_api.GET_get_player, "GET", {'id': self.player.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserPlayer, 1)
+        self.assertSelects(queries, PlayerCard, 0)
+        self.assertSelects(queries, UserTeam, 0)
+
+    def test_get_player_not_found(self):
+        response, queries = self.call(v_api.GET_get_player, "GET", {'id': -1})
+        self.assertEqual(response.status_code, 400)
+        self.assertSelects(queries, UserPlayer, 1)
+
+    def test_get_players_json(self):
+        response, queries = self.call(v_api.GET_get_players_json, "GET", {'length': 100})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserPlayer, 1)
+        self.assertSelects(queries, PlayerCard, 0)
+        self.assertSelects(queries, UserTeam, 0)
+
+    def test_get_characteristics_history(self):
+        params = {'players[]': list(UserPlayer.objects.filter(team=self.team).values_list('id', flat=True))}
+        response, queries = self.call(v_api.GET_get_characteristics_history, "GET", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, PlayerCharacteristicUser, 1)
+        self.assertSelects(queries, UserPlayer, 0)
+
+    def test_edit_player(self):
+        params = {'id': self.player.id, 'data[surname]': "Petrov", 'data[name]': "Ivan", 'data[team]': self.team.id}
+        response, queries = self.call(v_api.POST_edit_player, "POST", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserPlayer, 1)
+
+    def test_delete_player(self):
+        response, queries = self.call(v_api.POST_delete_player, "POST", {'id': self.player.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserPlayer, 1)
+
+    def test_import_players(self):
+        c_file = SimpleUploadedFile("players.csv", b"surname,name\nPetrov,Ivan\nSidorov,Pavel\nPopov,Oleg\n")
+        response, queries = self.call(v_api.POST_import_players, "POST", {'format': "csv", 'fileImport': c_file})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserTeam, 1)
+        self.assertSelects(queries, UserPlayer, 0)
+        self.assertSelects(queries, PlayerCard, 0)
+
+    def test_export_players(self):
+        response, queries = self.call(v_api.GET_export_players, "GET", {'format': "jsonl"})
+        self.assertEqual(response.status_code, 200)
+        self.assertSelects(queries, UserPlayer, 1)
+        self.assertSelects(queries, PlayerCard, 0)
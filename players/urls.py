@@ -5,5 +5,6 @@ from players import views
 urlpatterns = [
     path('', views.players, name="players"),
     path('player', views.player, name="player"),
-    path('players_api', views.players_api, name="players_api")
+    path('players_api', views.players_api, name="players_api"),
+    path('players_api_async', views.players_api_async, name="players_api_async")
 ]
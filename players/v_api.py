@@ -1,19 +1,47 @@
 from operator import is_
-from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.forms.models import model_to_dict
-from django.db.models import Q
+from django.db import transaction, connections, router
+from django.db.models import Q, F
+from django.db.models.functions import TruncWeek, TruncMonth
 from references.models import UserTeam, ClubTeam
 from players.models import UserPlayer, ClubPlayer, CardSection, PlayerCard, PlayersTableColumns
 from players.models import PlayerCharacteristicsRows, PlayerCharacteristicUser, PlayerCharacteristicClub
 from players.models import PlayerQuestionnairesRows, PlayerQuestionnaireUser, PlayerQuestionnaireClub
 from references.models import PlayerTeamStatus, PlayerPlayerStatus, PlayerLevel, PlayerPosition, PlayerFoot
-from nanofootball.views import util_check_access
+from api.permissions import util_check_access
+from api.queries import get_one_or_none, get_scoped_one, get_object_values
+from api.responses import ApiJsonResponse, get_list_response
+import api.concurrency as concurrency
+import api.languages as languages
+import api.refs_cache as refs_cache
 from datetime import datetime, date
+import csv
+import io
 import json
 
 
 
 LANG_CODE_DEFAULT = "en"
+HISTORY_RESOLUTIONS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_EXPORT_FORMATS = ["csv", "jsonl"]
+PLAYER_FIELDS = ['surname', 'name', 'patronymic']
+PLAYER_CARD_FIELDS = ['citizenship', 'club_from', 'growth', 'weight', 'game_num', 'birthsday', 'come', 'leave']
+PLAYER_CARD_INT_FIELDS = ['growth', 'weight', 'game_num']
+PLAYER_CARD_DATE_FIELDS = ['birthsday', 'come', 'leave']
+PLAYER_CARD_REFS = {
+    'ref_team_status': PlayerTeamStatus,
+    'ref_player_status': PlayerPlayerStatus,
+    'ref_level': PlayerLevel,
+    'ref_position': PlayerPosition,
+    'ref_foot': PlayerFoot,
+}
 
 
 def get_by_language_code(value, code):
@@ -155,8 +183,9 @@ def set_value_as_ref(request, name, ref_type, def_value = None):
         f_elem = PlayerPosition.objects.filter(id=c_id)
     if ref_type == "foot":
         f_elem = PlayerFoot.objects.filter(id=c_id)
-    if f_elem and f_elem.exists() and f_elem[0].id != None:
-        res = f_elem[0]
+    f_elem = get_one_or_none(f_elem)
+    if f_elem is not None:
+        res = f_elem
     return res
 
 
@@ -196,6 +225,23 @@ def set_value_as_date(request, name, def_value = None):
     return res   
 
 
+def load_players_refs():
+    """
+    Return data of Players' References without translations. Tables are taken from cache of references, check api.refs_cache.
+
+    :return: Dictionary of references.
+    :rtype: dict[list[object]]
+
+    """
+    refs = {}
+    refs['player_team_status'] = refs_cache.get_ref_values(PlayerTeamStatus)
+    refs['player_player_status'] = refs_cache.get_ref_values(PlayerPlayerStatus)
+    refs['player_level'] = refs_cache.get_ref_values(PlayerLevel)
+    refs['player_position'] = refs_cache.get_ref_values(PlayerPosition)
+    refs['player_foot'] = refs_cache.get_ref_values(PlayerFoot)
+    return refs
+
+
 def get_players_refs(request):
     """
     Return data of Players' References with translations.
@@ -206,16 +252,166 @@ def get_players_refs(request):
     :rtype: dict[list[object]]
 
     """
-    refs = {}
-    refs['player_team_status'] = PlayerTeamStatus.objects.filter().values()
-    refs['player_player_status'] = PlayerPlayerStatus.objects.filter().values()
-    refs['player_level'] = PlayerLevel.objects.filter().values()
-    refs['player_position'] = PlayerPosition.objects.filter().values()
-    refs['player_foot'] = PlayerFoot.objects.filter().values()
+    refs = load_players_refs()
     refs = set_refs_translations(refs, request.LANGUAGE_CODE)
     return refs
 
 
+def parse_rows_values(ids_list, values_lists):
+    """
+    Return dictionary where key is row's ID and value is list of values for this row.
+    Lists from request are parsed together by index, if row's ID is not correct then values are skipped.
+    If row's ID is repeated then the last values are taken.
+
+    :param ids_list: List of rows' IDs from request.
+    :type ids_list: list[str]
+    :param values_lists: Lists of values from request, every list has the same length with ids_list.
+    :type values_lists: list[list[str]]
+    :return: Dictionary of parsed values.
+    :rtype: dict[int: list[str]]
+
+    """
+    res = {}
+    if not isinstance(ids_list, list):
+        return res
+    for values in values_lists:
+        if not isinstance(values, list) or len(values) != len(ids_list):
+            return res
+    for _i in range(len(ids_list)):
+        c_id = -1
+        try:
+            c_id = int(ids_list[_i])
+        except:
+            pass
+        if c_id == -1:
+            continue
+        res[c_id] = [values[_i] for values in values_lists]
+    return res
+
+
+def upsert_player_characteristics(request, cur_user, c_player):
+    """
+    Return result string of saving player's characteristics. All rows are checked by one query,
+    existed values for current date are got by one query, then values are created and updated in bulk.
+    Function should be called inside transaction.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param c_player: Current player.
+    :type c_player: Model.object[UserPlayer] or Model.object[ClubPlayer]
+    :return: Result string.
+    :rtype: [str]
+
+    """
+    res_data = ""
+    rows_values = parse_rows_values(
+        request.POST.getlist("data[characteristics_id]"),
+        [request.POST.getlist("data[characteristics_stars]"), request.POST.getlist("data[characteristics_notes]")]
+    )
+    if len(rows_values) == 0:
+        return res_data
+    f_rows = None
+    f_characteristics = None
+    if request.user.club_id is not None:
+        f_rows = PlayerCharacteristicsRows.objects.filter(id__in=rows_values.keys(), is_nfb=False, club=request.user.club_id)
+    else:
+        f_rows = PlayerCharacteristicsRows.objects.filter(id__in=rows_values.keys(), is_nfb=False, user=cur_user)
+    f_rows = f_rows.in_bulk()
+    if len(f_rows) == 0:
+        return res_data
+    current_date = date.today()
+    if request.user.club_id is not None:
+        f_characteristics = PlayerCharacteristicClub.objects.filter(characteristics__in=f_rows.keys(), club=request.user.club_id, player=c_player, date_creation=current_date)
+    else:
+        f_characteristics = PlayerCharacteristicUser.objects.filter(characteristics__in=f_rows.keys(), user=cur_user, player=c_player, date_creation=current_date)
+    f_characteristics = {elem.characteristics_id: elem for elem in f_characteristics}
+    to_create = []
+    to_update = []
+    for c_id, f_row in f_rows.items():
+        c_value = 0
+        try:
+            c_value = int(rows_values[c_id][0])
+        except:
+            pass
+        c_note = rows_values[c_id][1]
+        c_characteristics = f_characteristics.get(c_id)
+        if c_characteristics:
+            c_characteristics.value = c_value
+            c_characteristics.notes = c_note
+            to_update.append(c_characteristics)
+        elif request.user.club_id is not None:
+            to_create.append(PlayerCharacteristicClub(characteristics=f_row, club=request.user.club_id, player=c_player, value=c_value, notes=c_note))
+        else:
+            to_create.append(PlayerCharacteristicUser(characteristics=f_row, user=cur_user, player=c_player, value=c_value, notes=c_note))
+    AnyCharacteristic = PlayerCharacteristicClub if request.user.club_id is not None else PlayerCharacteristicUser
+    if len(to_update) > 0:
+        AnyCharacteristic.objects.bulk_update(to_update, ['value', 'notes'])
+    if len(to_create) > 0:
+        AnyCharacteristic.objects.bulk_create(to_create)
+    res_data += f'\nAdded player characteristics for player: {len(to_create)}, updated: {len(to_update)}.'
+    return res_data
+
+
+def upsert_player_questionnaires(request, cur_user, c_player):
+    """
+    Return result string of saving player's questionnaires. All rows are checked by one query,
+    existed notes are got by one query, then notes are created and updated in bulk.
+    Function should be called inside transaction.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param c_player: Current player.
+    :type c_player: Model.object[UserPlayer] or Model.object[ClubPlayer]
+    :return: Result string.
+    :rtype: [str]
+
+    """
+    res_data = ""
+    rows_values = parse_rows_values(
+        request.POST.getlist("data[questionnaires_ids]"),
+        [request.POST.getlist("data[questionnaires_notes]")]
+    )
+    if len(rows_values) == 0:
+        return res_data
+    f_rows = None
+    f_questionnaires = None
+    if request.user.club_id is not None:
+        f_rows = PlayerQuestionnairesRows.objects.filter(id__in=rows_values.keys(), is_nfb=False, club=request.user.club_id)
+    else:
+        f_rows = PlayerQuestionnairesRows.objects.filter(id__in=rows_values.keys(), is_nfb=False, user=cur_user)
+    f_rows = f_rows.in_bulk()
+    if len(f_rows) == 0:
+        return res_data
+    if request.user.club_id is not None:
+        f_questionnaires = PlayerQuestionnaireClub.objects.filter(questionnaire__in=f_rows.keys(), club=request.user.club_id, player=c_player)
+    else:
+        f_questionnaires = PlayerQuestionnaireUser.objects.filter(questionnaire__in=f_rows.keys(), user=cur_user, player=c_player)
+    f_questionnaires = {elem.questionnaire_id: elem for elem in f_questionnaires}
+    to_create = []
+    to_update = []
+    for c_id, f_row in f_rows.items():
+        c_note = rows_values[c_id][0]
+        c_questionnaire = f_questionnaires.get(c_id)
+        if c_questionnaire:
+            c_questionnaire.notes = c_note
+            to_update.append(c_questionnaire)
+        elif request.user.club_id is not None:
+            to_create.append(PlayerQuestionnaireClub(questionnaire=f_row, club=request.user.club_id, player=c_player, notes=c_note))
+        else:
+            to_create.append(PlayerQuestionnaireUser(questionnaire=f_row, user=cur_user, player=c_player, notes=c_note))
+    AnyQuestionnaire = PlayerQuestionnaireClub if request.user.club_id is not None else PlayerQuestionnaireUser
+    if len(to_update) > 0:
+        AnyQuestionnaire.objects.bulk_update(to_update, ['notes'])
+    if len(to_create) > 0:
+        AnyQuestionnaire.objects.bulk_create(to_create)
+    res_data += f'\nAdded player questionnaires for player: {len(to_create)}, updated: {len(to_update)}.'
+    return res_data
+
+
 
 # --------------------------------------------------
 # PLAYERS API
@@ -244,29 +440,25 @@ def POST_edit_player(request, cur_user, cur_team):
         'perms_user': ["players.change_userplayer", "players.add_userplayer"], 
         'perms_club': ["players.change_clubplayer", "players.add_clubplayer"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
     if request.user.club_id is not None:
-        c_player = ClubPlayer.objects.filter(id=player_id, team=cur_team)
-        if not c_player.exists() or c_player[0].id == None:
-            c_team = ClubTeam.objects.filter(id=cur_team, club_id=request.user.club_id)
-            if not c_team.exists() or c_team[0].id == None:
-                return JsonResponse({"err": "Team not found.", "success": False}, status=400)
-            c_player = ClubPlayer(user=cur_user, team=c_team[0])
+        c_player = get_one_or_none(ClubPlayer.objects.filter(id=player_id, team=cur_team))
+        if c_player is None:
+            c_team = get_one_or_none(ClubTeam.objects.filter(id=cur_team, club_id=request.user.club_id))
+            if c_team is None:
+                return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
+            c_player = ClubPlayer(user=cur_user, team=c_team)
             is_new_player = True
-        else:
-            c_player = c_player[0]
     else:
-        c_player = UserPlayer.objects.filter(id=player_id, user=cur_user, team=cur_team)
-        if not c_player.exists() or c_player[0].id == None:
-            c_team = UserTeam.objects.filter(id=cur_team)
-            if not c_team.exists() or c_team[0].id == None:
-                return JsonResponse({"err": "Team not found.", "success": False}, status=400)
-            c_player = UserPlayer(user=cur_user, team=c_team[0])
+        c_player = get_one_or_none(UserPlayer.objects.filter(id=player_id, user=cur_user, team=cur_team))
+        if c_player is None:
+            c_team = get_one_or_none(UserTeam.objects.filter(id=cur_team))
+            if c_team is None:
+                return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
+            c_player = UserPlayer(user=cur_user, team=c_team)
             is_new_player = True
-        else:
-            c_player = c_player[0]
     if c_player == None:
-            return JsonResponse({"err": "Player not found.", "success": False}, status=400)
+            return ApiJsonResponse({"err": "Player not found.", "success": False}, status=400)
     print(request.POST)
     c_player.surname = request.POST.get("data[surname]", "")
     c_player.name = request.POST.get("data[name]", "")
@@ -275,12 +467,12 @@ def POST_edit_player(request, cur_user, cur_team):
     new_team_id = set_value_as_int(request, "data[team]", None)
     new_team = None
     if request.user.club_id is not None:
-        new_team = ClubTeam.objects.filter(id=new_team_id, club_id=request.user.club_id) if c_team == None else c_team
+        new_team = get_one_or_none(ClubTeam.objects.filter(id=new_team_id, club_id=request.user.club_id)) if c_team == None else c_team
     else:
-        new_team = UserTeam.objects.filter(id=new_team_id) if c_team == None else c_team
-    if new_team == None or not new_team.exists() or new_team[0].id == None:
-        return JsonResponse({"err": "Team not found.", "success": False}, status=400)
-    c_player.team = new_team[0]
+        new_team = get_one_or_none(UserTeam.objects.filter(id=new_team_id)) if c_team == None else c_team
+    if new_team is None:
+        return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
+    c_player.team = new_team
 
     img_photo = request.FILES.get('filePhoto')
     if img_photo is not None and img_photo:
@@ -290,7 +482,7 @@ def POST_edit_player(request, cur_user, cur_team):
         c_player.save()
         res_data = f'Player with id: [{c_player.id}] is added / edited successfully.'
     except Exception as e:
-        return JsonResponse({"err": "Can't edit or add the player.", "success": False}, status=200)
+        return ApiJsonResponse({"err": "Can't edit or add the player.", "success": False}, status=200)
     c_player_playercard = c_player.card
     if not c_player_playercard or not c_player_playercard.id == None:
         c_player_playercard = PlayerCard()
@@ -314,98 +506,14 @@ def POST_edit_player(request, cur_user, cur_team):
         res_data += '\nAdded player card for player.'
     except:
         res_data += '\nErr while saving player card.'
-    characteristics_ids = request.POST.getlist("data[characteristics_id]")
-    characteristics_stars = request.POST.getlist("data[characteristics_stars]")
-    characteristics_notes = request.POST.getlist("data[characteristics_notes]")
-    if isinstance(characteristics_ids, list) and isinstance(characteristics_stars, list) and isinstance(characteristics_notes, list):
-        if len(characteristics_ids) == len(characteristics_stars) and len(characteristics_stars) == len(characteristics_notes):
-            current_date = date.today()
-            current_date = current_date.strftime("%Y-%m-%d")
-            for _i in range(len(characteristics_ids)):
-                c_id = -1
-                c_value = 0
-                c_note = ""
-                try:
-                    c_id = int(characteristics_ids[_i])
-                except:
-                    pass
-                try:
-                    c_value = int(characteristics_stars[_i])
-                except:
-                    pass
-                try:
-                    c_note = characteristics_notes[_i]
-                except:
-                    pass
-                f_row = None
-                if request.user.club_id is not None:
-                    f_row = PlayerCharacteristicsRows.objects.filter(id=c_id, is_nfb=False, club=request.user.club_id)
-                else:
-                    f_row = PlayerCharacteristicsRows.objects.filter(id=c_id, is_nfb=False, user=cur_user)
-                if f_row != None and f_row.exists() and f_row[0].id != None:
-                    f_row = f_row[0]
-                    c_characteristics = None
-                    if request.user.club_id is not None:
-                        c_characteristics = PlayerCharacteristicClub.objects.filter(characteristics=f_row, club=request.user.club_id, player=c_player, date_creation=current_date)
-                        if c_characteristics.exists() and c_characteristics[0].id != None:
-                            c_characteristics = c_characteristics[0]
-                        else:
-                            c_characteristics = PlayerCharacteristicClub(characteristics=f_row, club=request.user.club_id, player=c_player)
-                    else:
-                        c_characteristics = PlayerCharacteristicUser.objects.filter(characteristics=f_row, user=cur_user, player=c_player, date_creation=current_date)
-                        if c_characteristics.exists() and c_characteristics[0].id != None:
-                            c_characteristics = c_characteristics[0]
-                        else:
-                            c_characteristics = PlayerCharacteristicUser(characteristics=f_row, user=cur_user, player=c_player)
-                    try:
-                        c_characteristics.value = c_value
-                        c_characteristics.notes = c_note
-                        c_characteristics.save()
-                        res_data += '\nAdded player characteristics for player.'
-                    except:
-                        res_data += '\nErr while saving player characteristics.'
-    questionnaires_ids = request.POST.getlist("data[questionnaires_ids]")
-    questionnaires_notes = request.POST.getlist("data[questionnaires_notes]")
-    if isinstance(questionnaires_ids, list) and isinstance(questionnaires_notes, list):
-        if len(questionnaires_ids) == len(questionnaires_notes):
-            for _i in range(len(questionnaires_ids)):
-                c_id = -1
-                c_note = ""
-                try:
-                    c_id = int(questionnaires_ids[_i])
-                except:
-                    pass
-                try:
-                    c_note = questionnaires_notes[_i]
-                except:
-                    pass
-                f_row = None
-                if request.user.club_id is not None:
-                    f_row = PlayerQuestionnairesRows.objects.filter(id=c_id, is_nfb=False, club=request.user.club_id)
-                else:
-                    f_row = PlayerQuestionnairesRows.objects.filter(id=c_id, is_nfb=False, user=cur_user)
-                if f_row != None and f_row.exists() and f_row[0].id != None:
-                    f_row = f_row[0]
-                    c_questionnaires = None
-                    if request.user.club_id is not None:
-                        c_questionnaires = PlayerQuestionnaireClub.objects.filter(questionnaire=f_row, club=request.user.club_id, player=c_player)
-                        if c_questionnaires.exists() and c_questionnaires[0].id != None:
-                            c_questionnaires = c_questionnaires[0]
-                        else:
-                            c_questionnaires = PlayerQuestionnaireClub(questionnaire=f_row, club=request.user.club_id, player=c_player)
-                    else:
-                        c_questionnaires = PlayerQuestionnaireUser.objects.filter(questionnaire=f_row, user=cur_user, player=c_player)
-                        if c_questionnaires.exists() and c_questionnaires[0].id != None:
-                            c_questionnaires = c_questionnaires[0]
-                        else:
-                            c_questionnaires = PlayerQuestionnaireUser(questionnaire=f_row, user=cur_user, player=c_player)
-                    try:
-                        c_questionnaires.notes = c_note
-                        c_questionnaires.save()
-                        res_data += '\nAdded player questionnaires for player.'
-                    except:
-                        res_data += '\nErr while saving player questionnaires.'
-    return JsonResponse({"data": res_data, "success": True}, status=200)
+    try:
+        with transaction.atomic():
+            res_data += upsert_player_characteristics(request, cur_user, c_player)
+            res_data += upsert_player_questionnaires(request, cur_user, c_player)
+    except Exception as e:
+        print(e)
+        res_data += '\nErr while saving player characteristics / questionnaires.'
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
 
 
 def POST_delete_player(request, cur_user, cur_team):
@@ -432,19 +540,16 @@ def POST_delete_player(request, cur_user, cur_team):
         'perms_user': ["players.delete_userplayer"], 
         'perms_club': ["players.delete_clubplayer"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
-    if request.user.club_id is not None:
-        c_player = ClubPlayer.objects.filter(id=player_id, team=cur_team)
-    else:
-        c_player = UserPlayer.objects.filter(id=player_id, user=cur_user, team=cur_team)
-    if c_player == None or not c_player.exists() or c_player[0].id == None:
-        return JsonResponse({"errors": "access_error"}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    c_player = get_scoped_one(request, UserPlayer, ClubPlayer, {'user': cur_user}, id=player_id, team=cur_team)
+    if c_player is None:
+        return ApiJsonResponse({"errors": "access_error"}, status=400)
     else:
         try:
             c_player.delete()
-            return JsonResponse({"data": {"id": player_id}, "success": True}, status=200)
+            return ApiJsonResponse({"data": {"id": player_id}, "success": True}, status=200)
         except:
-            return JsonResponse({"errors": "Can't delete exercise"}, status=400)
+            return ApiJsonResponse({"errors": "Can't delete exercise"}, status=400)
 
 
 
@@ -474,18 +579,19 @@ def GET_get_player(request, cur_user, cur_team):
         'perms_user': ["players.view_userplayer"], 
         'perms_club': ["players.view_clubplayer"]
     }):
-        return JsonResponse({"err": "Access denied.", "success": False}, status=400)
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
     if request.user.club_id is not None:
         player = ClubPlayer.objects.filter(id=player_id, team=cur_team)
     else:
         player = UserPlayer.objects.filter(id=player_id, user=cur_user, team=cur_team)
-    if player != None and player.exists() and player[0].id != None:
-        res_data = player.values()[0]
-        res_data['team'] = player[0].team.id
-        res_data['team_name'] = player[0].team.name
+    player = get_one_or_none(player.select_related('team', 'card'))
+    if player is not None:
+        res_data = get_object_values(player)
+        res_data['team'] = player.team.id
+        res_data['team_name'] = player.team.name
         res_data['photo'] = photo_url_convert(res_data['photo'])
-        if player[0].card and player[0].card.id != None:
-            player_card = model_to_dict(player[0].card)
+        if player.card and player.card.id != None:
+            player_card = model_to_dict(player.card)
             for key in player_card:
                 if key != "id":
                     res_data[key] = player_card[key]
@@ -495,17 +601,18 @@ def GET_get_player(request, cur_user, cur_team):
             f_characteristics_rows = PlayerCharacteristicsRows.objects.exclude(parent__isnull=True).filter(is_nfb=False, club=request.user.club_id)
         else:
             f_characteristics_rows = PlayerCharacteristicsRows.objects.exclude(parent__isnull=True).filter(is_nfb=False, user=cur_user)
-        if f_characteristics_rows != None and f_characteristics_rows.exists() and f_characteristics_rows[0].id != None:
+        if f_characteristics_rows != None:
             for f_row in f_characteristics_rows:
                 f_characteristics_elem = None
                 if request.user.club_id is not None:
-                    f_characteristics_elem = PlayerCharacteristicClub.objects.filter(characteristics=f_row, player=player[0]).order_by('-date_creation')
+                    f_characteristics_elem = PlayerCharacteristicClub.objects.filter(characteristics=f_row, player=player).order_by('-date_creation')
                 else:
-                    f_characteristics_elem = PlayerCharacteristicUser.objects.filter(characteristics=f_row, user=cur_user, player=player[0]).order_by('-date_creation')
-                if f_characteristics_elem != None and f_characteristics_elem.exists() and f_characteristics_elem[0].id != None:
+                    f_characteristics_elem = PlayerCharacteristicUser.objects.filter(characteristics=f_row, user=cur_user, player=player).order_by('-date_creation')
+                f_characteristics_elem = list(f_characteristics_elem[:2])
+                if len(f_characteristics_elem) > 0:
                     f_characteristic_one = f_characteristics_elem[0]
                     diff = "-"
-                    if len(f_characteristics_elem) > 1 and f_characteristics_elem[1].id != None:
+                    if len(f_characteristics_elem) > 1:
                         if f_characteristics_elem[0].value == f_characteristics_elem[1].value:
                             diff = "="
                         elif f_characteristics_elem[0].value > f_characteristics_elem[1].value:
@@ -524,28 +631,57 @@ def GET_get_player(request, cur_user, cur_team):
             f_questionnaires_rows = PlayerQuestionnairesRows.objects.filter(is_nfb=False, club=request.user.club_id)
         else:
             f_questionnaires_rows = PlayerQuestionnairesRows.objects.filter(is_nfb=False, user=cur_user)
-        if f_questionnaires_rows != None and f_questionnaires_rows.exists() and f_questionnaires_rows[0].id != None:
+        if f_questionnaires_rows != None:
             for f_row in f_questionnaires_rows:
                 f_questionnaire_elem = None
                 if request.user.club_id is not None:
-                    f_questionnaire_elem = PlayerQuestionnaireClub.objects.filter(questionnaire=f_row, player=player[0])
+                    f_questionnaire_elem = PlayerQuestionnaireClub.objects.filter(questionnaire=f_row, player=player)
                 else:
-                    f_questionnaire_elem = PlayerQuestionnaireUser.objects.filter(questionnaire=f_row, user=cur_user, player=player[0])
-                if f_questionnaire_elem.exists() and f_questionnaire_elem[0].id != None:
-                    f_questionnaire_one = f_questionnaire_elem[0]
+                    f_questionnaire_elem = PlayerQuestionnaireUser.objects.filter(questionnaire=f_row, user=cur_user, player=player)
+                f_questionnaire_one = get_one_or_none(f_questionnaire_elem)
+                if f_questionnaire_one is not None:
                     res_data['questionnaires'].append({
                         'row_id': f_row.id,
                         'notes': f_questionnaire_one.notes,
                     })
-        return JsonResponse({"data": res_data, "success": True}, status=200)
-    return JsonResponse({"errors": "Player not found.", "success": False}, status=400)
+        res_data = languages.trim_languages(res_data, languages.get_trim_language(request))
+        return ApiJsonResponse({"data": res_data, "success": True}, status=200)
+    return ApiJsonResponse({"errors": "Player not found.", "success": False}, status=400)
 
 
-def GET_get_players_json(request, cur_user, cur_team, is_for_table=True, return_JsonResponse=True):
+def iter_players_data(players):
     """
-    Return JSON Response or object as result on GET operation "Get players in JSON format".
-    If return_JsonResponse is False then function return Object
-    else JSON Response.
+    Return generator of players' objects for JSON. Queryset is read by chunks.
+
+    :param players: Players' queryset.
+    :type players: [QuerySet]
+    :return: Generator of players' objects.
+    :rtype: generator[object]
+
+    """
+    for player in players.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            'id': player.id,
+            'surname': player.surname,
+            'name': player.name,
+            'patronymic': player.patronymic,
+            'citizenship': player.card.citizenship if player.card else "",
+            'team': player.team.name if player.team else "",
+            'club_from': player.card.club_from if player.card else "",
+            'growth': player.card.growth if player.card else "",
+            'weight': player.card.weight if player.card else "",
+            'game_num': player.card.game_num if player.card else "",
+            'birthsday': player.card.birthsday if player.card else "",
+            'come': player.card.come if player.card else "",
+            'leave': player.card.leave if player.card else ""
+        }
+
+
+def get_players_queryset(request, cur_user, cur_team, is_for_table=True):
+    """
+    Return queryset of players for GET operation "Get players in JSON format". If is_for_table is True then
+    queryset is sorted, filtered and sliced by table's parameters: "start", "length", "order[0][column]",
+    "order[0][dir]", "search[value]". Team can be changed by parameter "team_id".
 
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
@@ -555,10 +691,8 @@ def GET_get_players_json(request, cur_user, cur_team, is_for_table=True, return_
     :type cur_team: [int]
     :param is_for_table: If it true then result will be with sorting, filtering, pagination for table.
     :type is_for_table: [bool]
-    :param return_JsonResponse: Controls returning type.
-    :type return_JsonResponse: [bool]
-    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code) or as object.
-    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]] or Object
+    :return: Queryset of players with loaded cards and teams.
+    :rtype: [QuerySet]
 
     """
     c_start = 0
@@ -596,44 +730,425 @@ def GET_get_players_json(request, cur_user, cur_team, is_for_table=True, return_
             cur_team = int(get_team)
         except:
             pass
+    players = None
+    if request.user.club_id is not None:
+        players = ClubPlayer.objects.filter(team=cur_team)
+    else:
+        players = UserPlayer.objects.filter(user=cur_user, team=cur_team)
+    if is_for_table:
+        if search_val and search_val != "":
+            players = players.filter(Q(surname__istartswith=search_val) | Q(name__istartswith=search_val) | Q(patronymic__istartswith=search_val) | Q(card__citizenship__istartswith=search_val) | Q(team__name__istartswith=search_val) | Q(card__club_from__istartswith=search_val))
+        players = players.order_by(f'{column_order_dir}{column_order}')[c_start:(c_start+c_length)]
+    return players.select_related('card', 'team')
+
+
+def GET_get_players_json(request, cur_user, cur_team, is_for_table=True, return_JsonResponse=True):
+    """
+    Return JSON Response or object as result on GET operation "Get players in JSON format".
+    If return_JsonResponse is False then function return Object
+    else JSON Response.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param is_for_table: If it true then result will be with sorting, filtering, pagination for table.
+    :type is_for_table: [bool]
+    :param return_JsonResponse: Controls returning type.
+    :type return_JsonResponse: [bool]
+    :return: StreamingJsonResponse with "data", "success" flag (True or False) and "status" (response code) or as object.
+    :rtype: StreamingJsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]] or Object
+
+    """
     players_data = []
     if not util_check_access(cur_user, {
         'perms_user': ["players.view_userplayer"], 
         'perms_club': ["players.view_clubplayer"]
     }):
         if return_JsonResponse:
-            return JsonResponse({"data": players_data, "success": True, "err": "Access denied."}, status=200)
+            return ApiJsonResponse({"data": players_data, "success": True, "err": "Access denied."}, status=200)
         else:
             return players_data
-    players = None
+    players_data = iter_players_data(get_players_queryset(request, cur_user, cur_team, is_for_table))
+    if return_JsonResponse:
+        return get_list_response(request, languages.iter_trimmed(players_data, languages.get_trim_language(request)))
+    else:
+        return list(players_data)
+
+
+async def GET_get_players_json_async(request, cur_user, cur_team, is_for_table=True):
+    """
+    Async variant of GET_get_players_json(). Players and permissions are loaded concurrently in worker threads.
+    Players are sent by ApiJsonResponse, because StreamingJsonResponse's generator would send queries from event loop.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :param is_for_table: If it true then result will be with sorting, filtering, pagination for table.
+    :type is_for_table: [bool]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]]
+
+    """
+    players = get_players_queryset(request, cur_user, cur_team, is_for_table)
+    has_access, players_data = await concurrency.gather(
+        concurrency.run_sync(util_check_access, cur_user, {
+            'perms_user': ["players.view_userplayer"], 
+            'perms_club': ["players.view_clubplayer"]
+        }),
+        concurrency.run_sync(lambda: list(iter_players_data(players)))
+    )
+    if not has_access:
+        return ApiJsonResponse({"data": [], "success": True, "err": "Access denied."}, status=200)
+    players_data = languages.trim_languages(players_data, languages.get_trim_language(request))
+    return ApiJsonResponse({"data": players_data, "success": True}, status=200)
+
+
+def GET_get_characteristics_history(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on GET operation "Get characteristics' history of players".
+    History is collected for one or many players by one ordered query. Values are grouped by characteristic's row and
+    downsampled to selected resolution: "day", "week" or "month". For every period the last saved value is taken.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+        Data structure: {"player_id": {"row_id": [{"date": [str], "value": [int], "notes": [str]}, ...], ...}, ...}
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    players_ids = []
+    for t_id in request.GET.getlist("players[]", []):
+        try:
+            players_ids.append(int(t_id))
+        except:
+            pass
+    try:
+        players_ids.append(int(request.GET.get("id")))
+    except:
+        pass
+    resolution = request.GET.get("resolution", "day")
+    if resolution not in HISTORY_RESOLUTIONS:
+        resolution = "day"
+    if not util_check_access(cur_user, {
+        'perms_user': ["players.view_userplayer"], 
+        'perms_club': ["players.view_clubplayer"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    if len(players_ids) == 0:
+        return ApiJsonResponse({"errors": "Players not found.", "success": False}, status=400)
+    f_history = None
     if request.user.club_id is not None:
-        players = ClubPlayer.objects.filter(team=cur_team)
+        f_history = PlayerCharacteristicClub.objects.filter(
+            player__in=players_ids, player__team=cur_team, club=request.user.club_id,
+            characteristics__is_nfb=False
+        )
     else:
-        players = UserPlayer.objects.filter(user=cur_user, team=cur_team)
-    if players is not None:
-        if is_for_table:
-            if search_val and search_val != "":
-                players = players.filter(Q(surname__istartswith=search_val) | Q(name__istartswith=search_val) | Q(patronymic__istartswith=search_val) | Q(card__citizenship__istartswith=search_val) | Q(team__name__istartswith=search_val) | Q(card__club_from__istartswith=search_val))
-            players = players.order_by(f'{column_order_dir}{column_order}')[c_start:(c_start+c_length)]
-        for _i, player in enumerate(players):
-            player_data = {
-                'id': player.id,
-                'surname': player.surname,
-                'name': player.name,
-                'patronymic': player.patronymic,
-                'citizenship': player.card.citizenship if player.card else "",
-                'team': player.team.name if player.team else "",
-                'club_from': player.card.club_from if player.card else "",
-                'growth': player.card.growth if player.card else "",
-                'weight': player.card.weight if player.card else "",
-                'game_num': player.card.game_num if player.card else "",
-                'birthsday': player.card.birthsday if player.card else "",
-                'come': player.card.come if player.card else "",
-                'leave': player.card.leave if player.card else ""
-            }
-            players_data.append(player_data)
-    if return_JsonResponse:
-        return JsonResponse({"data": players_data, "success": True}, status=200)
+        f_history = PlayerCharacteristicUser.objects.filter(
+            player__in=players_ids, player__team=cur_team, user=cur_user,
+            characteristics__is_nfb=False
+        )
+    trunc_func = HISTORY_RESOLUTIONS[resolution]
+    if trunc_func:
+        f_history = f_history.annotate(period=trunc_func('date_creation'))
     else:
-        return players_data
+        f_history = f_history.annotate(period=F('date_creation'))
+    f_history = f_history.order_by('player_id', 'characteristics_id', 'period', 'date_creation', 'id')
+    f_history = f_history.values_list('player_id', 'characteristics_id', 'period', 'value', 'notes')
+    res_data = {}
+    for player_id, row_id, period, value, notes in f_history:
+        player_history = res_data.setdefault(player_id, {})
+        row_history = player_history.setdefault(row_id, [])
+        period_str = period.strftime("%Y-%m-%d") if period else None
+        # rows are ordered by date inside period, so the last value in period replaces previous.
+        if len(row_history) > 0 and row_history[-1]['date'] == period_str:
+            row_history[-1]['value'] = value
+            row_history[-1]['notes'] = notes
+        else:
+            row_history.append({'date': period_str, 'value': value, 'notes': notes})
+    res_data = languages.trim_languages(res_data, languages.get_trim_language(request))
+    return ApiJsonResponse({"data": res_data, "success": True}, status=200)
+
+
+def parse_date_value(value):
+    """
+    Return Date or None. Transforming value to date using format "dd/mm/yyyy" or "yyyy-mm-dd".
+
+    :param value: Date string.
+    :type value: [str]
+    :return: Date or None if value has wrong format.
+    :rtype: [date] or None
 
+    """
+    for date_format in ["%d/%m/%Y", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except:
+            pass
+    return None
+
+
+def get_players_refs_ids():
+    """
+    Return dictionary of references' IDs for players' cards. Uses for validation of imported rows without queries per row.
+
+    :return: Dictionary where key is card's field and value is set of IDs.
+    :rtype: dict[str: set[int]]
+
+    """
+    refs_ids = {}
+    for key, ref_model in PLAYER_CARD_REFS.items():
+        refs_ids[key] = set(ref_model.objects.values_list('id', flat=True))
+    return refs_ids
+
+
+def iter_import_rows(c_file, file_format):
+    """
+    Return generator of rows (as dict) from uploaded file. File is read line by line, so whole file is not loaded in memory.
+
+    :param c_file: Uploaded file.
+    :type c_file: [UploadedFile]
+    :param file_format: Format of file: "csv" or "jsonl".
+    :type file_format: [str]
+    :return: Generator of rows.
+    :rtype: generator[dict]
+
+    """
+    text_stream = io.TextIOWrapper(c_file.file, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        for row in csv.DictReader(text_stream):
+            yield row
+    elif file_format == "jsonl":
+        for line in text_stream:
+            line = line.strip()
+            if line == "":
+                continue
+            try:
+                row = json.loads(line)
+            except:
+                row = None
+            yield row if isinstance(row, dict) else {}
+
+
+def make_import_player(row, refs_ids, cur_user, c_team, is_club):
+    """
+    Return list of two elements: new player and new player's card or None's and error.
+    Row is validated using references' IDs from memory.
+
+    :param row: Imported row.
+    :type row: [dict]
+    :param refs_ids: References' IDs. Check get_players_refs_ids().
+    :type refs_ids: dict[str: set[int]]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param c_team: Team for new player.
+    :type c_team: Model.object[UserTeam] or Model.object[ClubTeam]
+    :param is_club: Player is ClubPlayer or UserPlayer.
+    :type is_club: [bool]
+    :return: List of player, card and error string.
+    :rtype: list[Model.object, Model.object[PlayerCard], [str] or None]
+
+    """
+    surname = str(row.get('surname') or "").strip()
+    name = str(row.get('name') or "").strip()
+    if surname == "" or name == "":
+        return [None, None, "Surname and name are required."]
+    c_card = PlayerCard()
+    for key in PLAYER_CARD_FIELDS:
+        value = row.get(key)
+        if value == "":
+            value = None
+        if value is not None:
+            if key in PLAYER_CARD_INT_FIELDS:
+                try:
+                    value = int(value)
+                except:
+                    return [None, None, f"Wrong value for: {key}."]
+            elif key in PLAYER_CARD_DATE_FIELDS:
+                value = parse_date_value(str(value))
+                if value is None:
+                    return [None, None, f"Wrong date for: {key}, expected dd/mm/yyyy or yyyy-mm-dd."]
+            else:
+                value = str(value)
+        setattr(c_card, key, value)
+    for key in PLAYER_CARD_REFS:
+        value = row.get(key)
+        if value is None or value == "":
+            continue
+        try:
+            value = int(value)
+        except:
+            value = -1
+        if value not in refs_ids[key]:
+            return [None, None, f"Reference not found: {key}."]
+        setattr(c_card, f"{key}_id", value)
+    AnyPlayer = ClubPlayer if is_club else UserPlayer
+    c_player = AnyPlayer(user=cur_user, team=c_team, surname=surname[:30], name=name[:30])
+    patronymic = row.get('patronymic')
+    c_player.patronymic = str(patronymic)[:30] if patronymic else None
+    return [c_player, c_card, None]
+
+
+def save_import_batch(players_batch, cards_batch, is_club):
+    """
+    Return amount of saved players. Cards and players are created by bulk_create.
+    Players need cards' primary keys, if database doesn't return them after bulk_create (MySQL)
+    then cards are saved one by one.
+
+    :param players_batch: List of new players.
+    :type players_batch: list[Model.object]
+    :param cards_batch: List of new cards, the same length with players_batch.
+    :type cards_batch: list[Model.object[PlayerCard]]
+    :param is_club: Players are ClubPlayer or UserPlayer.
+    :type is_club: [bool]
+    :return: Amount of saved players.
+    :rtype: [int]
+
+    """
+    if len(players_batch) == 0:
+        return 0
+    if connections[router.db_for_write(PlayerCard)].features.can_return_rows_from_bulk_insert:
+        PlayerCard.objects.bulk_create(cards_batch)
+    else:
+        for c_card in cards_batch:
+            c_card.save()
+    for c_player, c_card in zip(players_batch, cards_batch):
+        c_player.card = c_card
+    AnyPlayer = ClubPlayer if is_club else UserPlayer
+    AnyPlayer.objects.bulk_create(players_batch)
+    return len(players_batch)
+
+
+def iter_export_rows(players, file_format):
+    """
+    Return generator of encoded lines for exported players. Queryset is read by chunks.
+
+    :param players: Players' queryset.
+    :type players: [QuerySet]
+    :param file_format: Format of file: "csv" or "jsonl".
+    :type file_format: [str]
+    :return: Generator of lines.
+    :rtype: generator[str]
+
+    """
+    columns = ['id'] + PLAYER_FIELDS + PLAYER_CARD_FIELDS + list(PLAYER_CARD_REFS.keys())
+    values_columns = ['id'] + PLAYER_FIELDS + [f"card__{key}" for key in PLAYER_CARD_FIELDS] + [f"card__{key}" for key in PLAYER_CARD_REFS]
+    players = players.values_list(*values_columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in players:
+            writer.writerow(row)
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+    elif file_format == "jsonl":
+        for row in players:
+            yield json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) + "\n"
+
+
+def POST_import_players(request, cur_user, cur_team):
+    """
+    Return JSON Response as result on POST operation "Import players".
+    File ("fileImport") is parsed line by line, references are checked in memory and new players with cards are
+    saved by batches in one transaction. If any row is not correct then nothing will be saved.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: JsonResponse with "data", "success" flag (True or False) and "status" (response code).
+    :rtype: JsonResponse[{"data": [obj], "success": [bool]}, status=[int]] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    file_format = request.POST.get("format", "csv")
+    c_file = request.FILES.get('fileImport')
+    if not util_check_access(cur_user, {
+        'perms_user': ["players.add_userplayer"], 
+        'perms_club': ["players.add_clubplayer"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    if file_format not in IMPORT_EXPORT_FORMATS or c_file is None:
+        return ApiJsonResponse({"errors": "Can't read import file."}, status=400)
+    is_club = request.user.club_id is not None
+    c_team = None
+    if is_club:
+        c_team = ClubTeam.objects.filter(id=cur_team, club_id=request.user.club_id).first()
+    else:
+        c_team = UserTeam.objects.filter(id=cur_team, user_id=cur_user).first()
+    if c_team is None:
+        return ApiJsonResponse({"err": "Team not found.", "success": False}, status=400)
+    refs_ids = get_players_refs_ids()
+    added_count = 0
+    row_index = 0
+    try:
+        with transaction.atomic():
+            players_batch = []
+            cards_batch = []
+            for row in iter_import_rows(c_file, file_format):
+                row_index += 1
+                c_player, c_card, c_err = make_import_player(row, refs_ids, cur_user, c_team, is_club)
+                if c_err:
+                    raise ValueError(f"Row {row_index}: {c_err}")
+                players_batch.append(c_player)
+                cards_batch.append(c_card)
+                if len(players_batch) >= IMPORT_BATCH_SIZE:
+                    added_count += save_import_batch(players_batch, cards_batch, is_club)
+                    players_batch = []
+                    cards_batch = []
+            added_count += save_import_batch(players_batch, cards_batch, is_club)
+    except ValueError as e:
+        return ApiJsonResponse({"errors": str(e), "success": False}, status=400)
+    except Exception as e:
+        print(e)
+        return ApiJsonResponse({"errors": "Can't import players.", "success": False}, status=400)
+    return ApiJsonResponse({"data": {"added": added_count}, "success": True}, status=200)
+
+
+def GET_export_players(request, cur_user, cur_team):
+    """
+    Return Streaming Response as result on GET operation "Export players".
+    Players of current team are read by chunks and sent as "csv" or "jsonl" file, so memory usage doesn't depend on players' amount.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param cur_team: The current team, that is selected by the user.
+    :type cur_team: [int]
+    :return: StreamingHttpResponse with file or JsonResponse with error.
+    :rtype: [StreamingHttpResponse] or JsonResponse[{"errors": [str]}, status=[int]]
+
+    """
+    file_format = request.GET.get("format", "csv")
+    if not util_check_access(cur_user, {
+        'perms_user': ["players.view_userplayer"], 
+        'perms_club': ["players.view_clubplayer"]
+    }):
+        return ApiJsonResponse({"err": "Access denied.", "success": False}, status=400)
+    if file_format not in IMPORT_EXPORT_FORMATS:
+        return ApiJsonResponse({"errors": "Format not found."}, status=400)
+    players = None
+    if request.user.club_id is not None:
+        players = ClubPlayer.objects.filter(team=cur_team, team__club_id=request.user.club_id)
+    else:
+        players = UserPlayer.objects.filter(user=cur_user, team=cur_team)
+    players = players.order_by('id')
+    content_type = "text/csv" if file_format == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(iter_export_rows(players, file_format), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="players.{file_format}"'
+    return response
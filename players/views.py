@@ -4,12 +4,16 @@ from operator import truediv
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 
-from users.models import User
+from api.middleware import get_cur_user, get_cur_team
 from references.models import UserSeason, UserTeam
 from players.models import UserPlayer, ClubPlayer, CardSection
 from system_icons.views import get_ui_elements
-from nanofootball.views import util_check_access
-import players.v_api as v_api
+from api.permissions import util_check_access
+from api.lazy import LazyModule
+import api.concurrency as concurrency
+
+
+v_api = LazyModule("players.v_api")
 
 
 
@@ -31,16 +35,12 @@ def players(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["players.view_userplayer"], 'perms_club': ["players.view_clubplayer"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
     refs = {}
     refs = v_api.get_players_refs(request)
     return render(request, 'players/base_players.html', {
@@ -71,27 +71,23 @@ def player(request):
     """
     if not request.user.is_authenticated:
         return redirect("authorization:login")
-    cur_user = User.objects.filter(email=request.user).only("club_id")
-    if not util_check_access(cur_user[0], 
+    cur_user = get_cur_user(request)
+    if not util_check_access(cur_user, 
         {'perms_user': ["players.view_userplayer"], 'perms_club': ["players.view_clubplayer"]}
     ):
         return redirect("users:profile")
-    cur_team = -1
-    try:
-        cur_team = int(request.session['team'])
-    except:
-        pass
+    cur_team = get_cur_team(request)
     selected_player_id = -1
     try:
         selected_player_id = int(request.GET.get('id', -1))
     except:
         pass
-    selected_player = UserPlayer.objects.filter(user=cur_user[0], id=selected_player_id)
+    selected_player = UserPlayer.objects.filter(user=cur_user, id=selected_player_id)
     if selected_player.exists() and selected_player[0].id != None:
         if selected_player[0].team:
             cur_team = selected_player[0].team.id
             request.session['team'] = str(cur_team)
-    players = v_api.GET_get_players_json(request, cur_user[0], cur_team, False, False)
+    players = v_api.GET_get_players_json(request, cur_user, cur_team, False, False)
     refs = {}
     refs = v_api.get_players_refs(request)
 
@@ -128,6 +124,7 @@ def players_api(request):
     * 'edit_questionnaires_rows' -> Edit questionnaires' rows.
     * 'add_questionnaires_rows' -> Add questionnaires' rows.
     * 'delete_questionnaires_rows' -> Delete questionnaires' rows.
+    * 'import_players' -> Import players with cards from CSV or JSON Lines file.
     * 'get_player' -> Get one player by ID.
     * 'get_card_sections' -> Get card sections.
     * 'get_players_json' -> Get all players by team in JSON format.
@@ -135,6 +132,8 @@ def players_api(request):
     * 'get_players_table_cols' -> Get players' table's columns.
     * 'get_characteristics_rows' -> Get characteristics' rows.
     * 'get_questionnaires_rows' -> Get questionnaires' rows.
+    * 'get_characteristics_history' -> Get characteristics' history of one or many players.
+    * 'export_players' -> Export players with cards of current team as CSV or JSON Lines file.
     :param request: Django HttpRequest.
     :type request: [HttpRequest]
     :return: Return an JsonResponse with next parameteres:\n
@@ -163,14 +162,11 @@ def players_api(request):
         edit_questionnaires_rows_status = 0
         add_questionnaires_rows_status = 0
         delete_questionnaires_rows_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        if not cur_user.exists() or cur_user[0].id == None:
+        import_players_status = 0
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         try:
             edit_player_status = int(request.POST.get("edit_player", 0))
         except:
@@ -231,36 +227,42 @@ def players_api(request):
             delete_questionnaires_rows_status = int(request.POST.get("delete_questionnaires_rows", 0))
         except:
             pass
+        try:
+            import_players_status = int(request.POST.get("import_players", 0))
+        except:
+            pass
         if edit_player_status == 1:
-            return v_api.POST_edit_player(request, cur_user[0], cur_team)
+            return v_api.POST_edit_player(request, cur_user, cur_team)
         elif delete_player_status == 1:
-            return v_api.POST_delete_player(request, cur_user[0], cur_team)
+            return v_api.POST_delete_player(request, cur_user, cur_team)
         elif edit_card_sections_status == 1:
-            return v_api.POST_edit_card_sections(request, cur_user[0])
+            return v_api.POST_edit_card_sections(request, cur_user)
         elif add_card_sections_status == 1:
-            return v_api.POST_add_delete_card_sections(request, cur_user[0])
+            return v_api.POST_add_delete_card_sections(request, cur_user)
         elif delete_card_sections_status == 1:
-            return v_api.POST_add_delete_card_sections(request, cur_user[0], False)
+            return v_api.POST_add_delete_card_sections(request, cur_user, False)
         elif edit_players_table_cols_status == 1:
-            return v_api.POST_edit_players_table_cols(request, cur_user[0])
+            return v_api.POST_edit_players_table_cols(request, cur_user)
         elif add_players_table_cols_status == 1:
-            return v_api.POST_add_delete_players_table_cols(request, cur_user[0])
+            return v_api.POST_add_delete_players_table_cols(request, cur_user)
         elif delete_players_table_cols_status == 1:
-            return v_api.POST_add_delete_players_table_cols(request, cur_user[0], False)
+            return v_api.POST_add_delete_players_table_cols(request, cur_user, False)
         elif edit_characteristics_rows_status == 1:
-            return v_api.POST_edit_characteristics_rows(request, cur_user[0])
+            return v_api.POST_edit_characteristics_rows(request, cur_user)
         elif add_characteristics_rows_status == 1:
-            return v_api.POST_add_delete_characteristics_rows(request, cur_user[0])
+            return v_api.POST_add_delete_characteristics_rows(request, cur_user)
         elif delete_characteristics_rows_status == 1:
-            return v_api.POST_add_delete_characteristics_rows(request, cur_user[0], False)
+            return v_api.POST_add_delete_characteristics_rows(request, cur_user, False)
         elif copy_characteristics_rows_status == 1:
-            return v_api.POST_copy_characteristics_rows(request, cur_user[0])
+            return v_api.POST_copy_characteristics_rows(request, cur_user)
         elif edit_questionnaires_rows_status == 1:
-            return v_api.POST_edit_questionnaires_rows(request, cur_user[0])
+            return v_api.POST_edit_questionnaires_rows(request, cur_user)
         elif add_questionnaires_rows_status == 1:
-            return v_api.POST_add_delete_questionnaires_rows(request, cur_user[0])
+            return v_api.POST_add_delete_questionnaires_rows(request, cur_user)
         elif delete_questionnaires_rows_status == 1:
-            return v_api.POST_add_delete_questionnaires_rows(request, cur_user[0], False)
+            return v_api.POST_add_delete_questionnaires_rows(request, cur_user, False)
+        elif import_players_status == 1:
+            return v_api.POST_import_players(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     elif request.method == "GET" and is_ajax:
         get_player_status = 0
@@ -270,14 +272,12 @@ def players_api(request):
         get_players_table_cols_status = 0
         get_characteristics_rows_status = 0
         get_questionnaires_rows_status = 0
-        cur_user = User.objects.filter(email=request.user).only("id")
-        cur_team = -1
-        if not cur_user.exists() or cur_user[0].id == None:
+        get_characteristics_history_status = 0
+        export_players_status = 0
+        cur_user = get_cur_user(request)
+        if cur_user is None:
             return JsonResponse({"errors": "trouble_with_user"}, status=400)
-        try:
-            cur_team = int(request.session['team'])
-        except:
-            pass
+        cur_team = get_cur_team(request)
         try:
             get_player_status = int(request.GET.get("get_player", 0))
         except:
@@ -306,21 +306,77 @@ def players_api(request):
             get_questionnaires_rows_status = int(request.GET.get("get_questionnaires_rows", 0))
         except:
             pass
+        try:
+            get_characteristics_history_status = int(request.GET.get("get_characteristics_history", 0))
+        except:
+            pass
+        try:
+            export_players_status = int(request.GET.get("export_players", 0))
+        except:
+            pass
         if get_player_status == 1:
-            return v_api.GET_get_player(request, cur_user[0], cur_team)
+            return v_api.GET_get_player(request, cur_user, cur_team)
         elif get_players_json_status == 1:
-            return v_api.GET_get_players_json(request, cur_user[0], cur_team, False)
+            return v_api.GET_get_players_json(request, cur_user, cur_team, False)
         elif get_players_json_table_status == 1:
-            return v_api.GET_get_players_json(request, cur_user[0], cur_team, True)
+            return v_api.GET_get_players_json(request, cur_user, cur_team, True)
         elif get_card_sections_status == 1:
-            return v_api.GET_get_card_sections(request, cur_user[0])
+            return v_api.GET_get_card_sections(request, cur_user)
         elif get_players_table_cols_status == 1:
-            return v_api.GET_get_players_table_cols(request, cur_user[0])
+            return v_api.GET_get_players_table_cols(request, cur_user)
         elif get_characteristics_rows_status == 1:
-            return v_api.GET_get_characteristics_rows(request, cur_user[0])
+            return v_api.GET_get_characteristics_rows(request, cur_user)
         elif get_questionnaires_rows_status == 1:
-            return v_api.GET_get_questionnaires_rows(request, cur_user[0])
+            return v_api.GET_get_questionnaires_rows(request, cur_user)
+        elif get_characteristics_history_status == 1:
+            return v_api.GET_get_characteristics_history(request, cur_user, cur_team)
+        elif export_players_status == 1:
+            return v_api.GET_export_players(request, cur_user, cur_team)
         return JsonResponse({"errors": "access_error"}, status=400)
     else:
         return JsonResponse({"errors": "access_error"}, status=400)
 
+
+async def players_api_async(request):
+    """
+    Async analogue of players_api() for read operations, it has to be served under ASGI.
+    Data is loaded by worker threads concurrently, so the event loop isn't blocked.
+        In case of any error client will get next response: JsonResponse({"errors": "access_error"}, status=400).\n
+    Existing parameteres (Controlling Variable for any parameter is: 'parameter'_status):\n
+    * 'get_players_json' -> Get all players of the current team.
+    * 'get_players_json_table' -> Get players for table with sorting, filtering and pagination.
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :return: Return an JsonResponse with next parameteres:\n
+    * 'errors' -> Error text in case getting any error.
+    * 'status' -> Response code.
+    * 'data' -> Requiered data depending on the request method and the parameter sent, if status code is OK.
+    :rtype: [JsonResponse]
+
+    """
+    context = await concurrency.get_request_context(request)
+    if not context['is_authenticated']:
+        return JsonResponse({"errors": "authenticate_err"}, status=400)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.method == "GET" and is_ajax:
+        get_players_json_status = 0
+        get_players_json_table_status = 0
+        cur_user = context['cur_user']
+        cur_team = context['cur_team']
+        if cur_user is None:
+            return JsonResponse({"errors": "trouble_with_user"}, status=400)
+        try:
+            get_players_json_status = int(request.GET.get("get_players_json", 0))
+        except:
+            pass
+        try:
+            get_players_json_table_status = int(request.GET.get("get_players_json_table", 0))
+        except:
+            pass
+        if get_players_json_status == 1:
+            return await v_api.GET_get_players_json_async(request, cur_user, cur_team, False)
+        elif get_players_json_table_status == 1:
+            return await v_api.GET_get_players_json_async(request, cur_user, cur_team, True)
+        return JsonResponse({"errors": "access_error"}, status=400)
+    else:
+        return JsonResponse({"errors": "access_error"}, status=400)
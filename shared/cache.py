@@ -0,0 +1,177 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from exercises.models import UserExercise, ClubExercise, ExerciseVideo
+from shared.models import SharedLink
+
+
+PAGE_KEY_PREFIX = "shared_page"
+VERSION_KEY_PREFIX = "shared_obj_version"
+
+
+
+def get_version_key(model, pk):
+    """
+    Return cache key of object's version by model and primary key, object isn't loaded.
+
+    :param model: Any model, usually exercise's model.
+    :type model: [Model]
+    :param pk: Object's primary key.
+    :type pk: [int]
+    :return: Cache key.
+    :rtype: [str]
+
+    """
+    return f"{VERSION_KEY_PREFIX}:{model._meta.label_lower}:{pk}"
+
+
+def get_object_version_key(obj):
+    """
+    Return cache key of object's version. Version is changed each time when object is edited.
+
+    :param obj: Any model's object, usually exercise.
+    :type obj: [Model.object]
+    :return: Cache key.
+    :rtype: [str]
+
+    """
+    return get_version_key(type(obj), obj.pk)
+
+
+def get_object_version(obj):
+    """
+    Return current object's version. It should be taken before page rendering.
+
+    :param obj: Any model's object, usually exercise.
+    :type obj: [Model.object]
+    :return: Version.
+    :rtype: [int]
+
+    """
+    return cache.get(get_object_version_key(obj), 0)
+
+
+def bump_version_key(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, None)
+
+
+def bump_version(model, pk):
+    """
+    Change object's version after current transaction is committed, all cached pages which show this object
+    become invalid. Page rendered by concurrent request before commit keeps old version, so it isn't used.
+
+    :param model: Any model, usually exercise's model.
+    :type model: [Model]
+    :param pk: Object's primary key.
+    :type pk: [int]
+
+    """
+    version_key = get_version_key(model, pk)
+    transaction.on_commit(lambda: bump_version_key(version_key))
+
+
+def bump_object_version(obj):
+    """
+    Change object's version, all cached pages which show this object become invalid. Check bump_version().
+
+    :param obj: Any model's object, usually exercise.
+    :type obj: [Model.object]
+
+    """
+    bump_version(type(obj), obj.pk)
+
+
+def get_page_keys(link):
+    return [f"{PAGE_KEY_PREFIX}:{link}:{lang_code}" for lang_code, _ in settings.LANGUAGES]
+
+
+def get_page(link, lang_code):
+    """
+    Return cached page's content or None. Page is valid while version of shown object wasn't changed.
+
+    :param link: Link's token.
+    :type link: [str]
+    :param lang_code: Language's code of request.
+    :type lang_code: [str]
+    :return: Page's content or None.
+    :rtype: [bytes] or None
+
+    """
+    if not link:
+        return None
+    page = cache.get(f"{PAGE_KEY_PREFIX}:{link}:{lang_code}")
+    if not page:
+        return None
+    if cache.get(page['version_key'], 0) != page['version']:
+        return None
+    return page['content']
+
+
+def set_page(link, lang_code, content, obj, version, expiration_date):
+    """
+    Save page's content to cache. Timeout of page is limited by link's expiration date.
+
+    :param link: Link's token.
+    :type link: [str]
+    :param lang_code: Language's code of request.
+    :type lang_code: [str]
+    :param content: Rendered page.
+    :type content: [bytes]
+    :param obj: Object shown on page, usually exercise.
+    :type obj: [Model.object]
+    :param version: Object's version taken before rendering. Check get_object_version().
+    :type version: [int]
+    :param expiration_date: Link's expiration date.
+    :type expiration_date: [datetime]
+
+    """
+    timeout = int((expiration_date - timezone.now()).total_seconds())
+    if timeout <= 0:
+        return
+    page = {
+        'content': content,
+        'version_key': get_object_version_key(obj),
+        'version': version,
+    }
+    cache.set(f"{PAGE_KEY_PREFIX}:{link}:{lang_code}", page, timeout)
+
+
+def delete_pages(link):
+    """
+    Remove cached pages of link in all languages.
+
+    :param link: Link's token.
+    :type link: [str]
+
+    """
+    if link:
+        cache.delete_many(get_page_keys(link))
+
+
+def on_exercise_changed(sender, instance, **kwargs):
+    bump_object_version(instance)
+
+
+def on_exercise_video_changed(sender, instance, **kwargs):
+    for field, model in [('exercise_user_id', UserExercise), ('exercise_club_id', ClubExercise)]:
+        exs_id = getattr(instance, field)
+        if exs_id is not None:
+            bump_version(model, exs_id)
+
+
+def on_link_deleted(sender, instance, **kwargs):
+    # cached page is served before link is checked, so it has to be removed with link.
+    transaction.on_commit(lambda: delete_pages(instance.link))
+
+
+for sender in [UserExercise, ClubExercise]:
+    post_save.connect(on_exercise_changed, sender=sender, dispatch_uid=f"shared_cache_save_{sender.__name__}")
+    post_delete.connect(on_exercise_changed, sender=sender, dispatch_uid=f"shared_cache_delete_{sender.__name__}")
+post_save.connect(on_exercise_video_changed, sender=ExerciseVideo, dispatch_uid="shared_cache_save_ExerciseVideo")
+post_delete.connect(on_exercise_video_changed, sender=ExerciseVideo, dispatch_uid="shared_cache_delete_ExerciseVideo")
+post_delete.connect(on_link_deleted, sender=SharedLink, dispatch_uid="shared_cache_delete_SharedLink")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+import shared.v_api as v_api
+
+
+
+class Command(BaseCommand):
+    help = 'Delete expired shared links by batches. Can be run by cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Amount of links deleted by one query.')
+
+    def handle(self, *args, **options):
+        deleted_count = v_api.delete_expired_links(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted expired links: {deleted_count}.'))
@@ -8,10 +8,11 @@ from matches.models import UserMatch, ClubMatch
 
 
 class SharedLink(models.Model):
-    link = models.CharField(max_length=255)
+    link = models.CharField(max_length=255, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     options = models.JSONField(null=True, blank=True)
-    expiration_date = models.DateTimeField(blank=False, default=timezone.now)
+    snapshot = models.JSONField(null=True, blank=True)
+    expiration_date = models.DateTimeField(blank=False, default=timezone.now, db_index=True)
     language = models.CharField(max_length=10, default='en')
     exercise_nfb = models.ForeignKey(AdminExercise, on_delete=models.CASCADE, null=True, blank=True)
     exercise_user = models.ForeignKey(UserExercise, on_delete=models.CASCADE, null=True, blank=True)
@@ -0,0 +1,30 @@
+$(function() {
+    $('.page-loader-wrapper').fadeIn();
+    $('.header').remove();
+    $('.sidebar').remove();
+    $('.page-wrapper').removeClass('page-wrapper');
+    $('.main-wrapper > div').first().css('min-height', '');
+    setTimeout(() => {
+        $('.page-loader-wrapper').fadeOut();
+    }, 500);
+
+
+    // descriptions are written by users, so they are shown by read-only editor from escaped attribute.
+    $('.description-editor').each((index, elem) => {
+        try {
+            ClassicEditor
+                .create(elem, {
+                    language: 'en'
+                })
+                .then(editor => {
+                    editor.enableReadOnlyMode('');
+                    editor.setData($(elem).attr('data-value'));
+                    $(editor.ui.view.element).find('.ck-editor__top').addClass('d-none');
+                    $(editor.ui.view.element).find('.ck-editor__main').addClass('read-mode');
+                })
+                .catch(err => {
+                    console.error(err);
+                });
+        } catch(e) {}
+    });
+});
@@ -3,14 +3,18 @@ from django.utils import timezone
 import json
 import random
 import string
-from django.http import JsonResponse
+from api.responses import ApiJsonResponse
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.sites.shortcuts import get_current_site
 
 from users.models import User
 from shared.models import SharedLink
 from exercises.models import AdminExercise, UserExercise, ClubExercise
-import exercises.v_api as exercises_v_api
+from trainings.models import UserTraining, ClubTraining
+from matches.models import UserMatch, ClubMatch
+from api.lazy import LazyModule
+import shared.cache as shared_cache
 
 
 
@@ -18,6 +22,9 @@ LANG_CODE_DEFAULT = "en"
 FOLDER_TEAM = "team_folders"
 FOLDER_NFB = "nfb_folders"
 FOLDER_CLUB = "club_folders"
+# exercises and matches are imported on the first shared link, not at process's startup.
+exercises_v_api = LazyModule("exercises.v_api")
+matches_v_api = LazyModule("matches.v_api")
 
 
 def get_by_language_code(value, code):
@@ -68,16 +75,94 @@ def generate_link_str(length=10):
     return g_link
 
 
-def check_link_expiration(c_link):
+def delete_expired_links(batch_size=1000):
+    """
+    Return amount of deleted links. Expired links are deleted by batches, so one query doesn't lock whole table.
+
+    :param batch_size: Amount of links deleted by one query.
+    :type batch_size: [int]
+    :return: Amount of deleted links.
+    :rtype: [int]
+
+    """
     now = timezone.now()
-    if now > c_link.expiration_date:
-        try:
-            c_link.delete()
-        except Exception as e:
-            print(e)
-            pass
-        return False
-    return True
+    deleted_count = 0
+    while True:
+        ids = list(SharedLink.objects.filter(expiration_date__lte=now).values_list('id', flat=True)[:batch_size])
+        if len(ids) == 0:
+            break
+        deleted, _ = SharedLink.objects.filter(id__in=ids).delete()
+        deleted_count += deleted
+    return deleted_count
+
+
+def get_link_event(request, cur_user, c_type, c_id):
+    """
+    Return match's or training's object for link and name of link's field or (None, None) if object not found.
+    Club's object is returned when user is club's member.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param cur_user: The current user of the system, who is currently authorized.
+    :type cur_user: Model.object[User]
+    :param c_type: Link's type: "match" or "training".
+    :type c_type: [str]
+    :param c_id: Event's ID.
+    :type c_id: [int]
+    :return: Object and name of SharedLink's field.
+    :rtype: tuple(Model.object, [str]) or tuple(None, None)
+
+    """
+    is_club = request.user.club_id is not None
+    f_obj = None
+    f_field = None
+    if c_type == "match":
+        if is_club:
+            f_obj = ClubMatch.objects.filter(event_id=c_id, event_id__club_id=request.user.club_id)
+            f_field = 'match_club'
+        else:
+            f_obj = UserMatch.objects.filter(event_id=c_id, event_id__user_id=cur_user)
+            f_field = 'match_user'
+        f_obj = f_obj.select_related('team_id', 'event_id')
+    elif c_type == "training":
+        if is_club:
+            f_obj = ClubTraining.objects.filter(event_id=c_id, event_id__club_id=request.user.club_id)
+            f_field = 'training_club'
+        else:
+            f_obj = UserTraining.objects.filter(event_id=c_id, event_id__user_id=cur_user)
+            f_field = 'training_user'
+        f_obj = f_obj.select_related('event_id')
+    if f_obj is None or not f_obj.exists() or f_obj[0].event_id == None:
+        return None, None
+    return f_obj[0], f_field
+
+
+def get_training_snapshot(request, training):
+    """
+    Return training's date and exercises prepared for showing without database.
+    Titles and descriptions are translated at current request's language.
+
+    :param request: Django HttpRequest.
+    :type request: [HttpRequest]
+    :param training: Training's object.
+    :type training: Model.object[UserTraining] or Model.object[ClubTraining]
+    :return: Dictionary with keys "training" and "exercises".
+    :rtype: dict['training': [obj], 'exercises': list[obj]]
+
+    """
+    training_obj = {
+        'id': training.event_id.id,
+        'date': matches_v_api.get_date_str_from_datetime(training.event_id.date, request.LANGUAGE_CODE),
+        'time': matches_v_api.get_time_from_datetime(training.event_id.date),
+    }
+    exercises_data = []
+    for exercise in training.exercises.all().only('id', 'title', 'description'):
+        exercises_data.append({
+            'id': exercise.id,
+            'title': get_by_language_code(exercise.title, request.LANGUAGE_CODE),
+            'description': get_by_language_code(exercise.description, request.LANGUAGE_CODE),
+        })
+    return {'training': training_obj, 'exercises': exercises_data}
 
 
 
@@ -97,7 +182,7 @@ def POST_add_link(request, cur_user):
     except:
         pass
     if not c_expire_date:
-        return JsonResponse({"errors": "Expire date not correct.", "type": "date"}, status=400)
+        return ApiJsonResponse({"errors": "Expire date not correct.", "type": "date"}, status=400)
     c_dict = {
         'user': cur_user,
         'expiration_date': c_expire_date,
@@ -113,6 +198,14 @@ def POST_add_link(request, cur_user):
         pass
     elif c_type == "exercise_club_folders":
         pass
+    elif c_type == "match" or c_type == "training":
+        f_obj, f_field = get_link_event(request, cur_user, c_type, c_id)
+        if f_obj:
+            c_dict[f_field] = f_obj
+            if c_type == "match":
+                c_dict['snapshot'] = matches_v_api.get_match_snapshot(request, f_obj)
+            else:
+                c_dict['snapshot'] = get_training_snapshot(request, f_obj)
     if f_obj:
         new_link = SharedLink(**c_dict)
         try:
@@ -120,10 +213,10 @@ def POST_add_link(request, cur_user):
             new_link.save()
             domain = get_current_site(request).domain
             t_link = f"http://{domain}/shared?link={new_link.link}"
-            return JsonResponse({"data": {"link": t_link}, "success": True}, status=200)
+            return ApiJsonResponse({"data": {"link": t_link}, "success": True}, status=200)
         except Exception as e:
             pass
-    return JsonResponse({"errors": "Can't create link", "type": "link"}, status=400)
+    return ApiJsonResponse({"errors": "Can't create link", "type": "link"}, status=400)
 
 
 
@@ -146,33 +239,55 @@ def GET_get_link(request, cur_user=None):
             pass
         elif c_type == "exercise_club_folders":
             pass
+        elif c_type == "match" or c_type == "training":
+            f_obj, f_field = get_link_event(request, cur_user, c_type, c_id)
+            if f_obj:
+                f_dict[f_field] = f_obj
         if f_obj:
-            c_link = SharedLink.objects.filter(**f_dict).first()
+            c_link = SharedLink.objects.filter(**f_dict, expiration_date__gt=timezone.now()).first()
     else:
         link_text = request.GET.get("link", "")
-        c_link = SharedLink.objects.filter(link=link_text).first()
+        request_lang = request.LANGUAGE_CODE
+        cached_page = shared_cache.get_page(link_text, request_lang)
+        if cached_page is not None:
+            return HttpResponse(cached_page)
+        c_link = SharedLink.objects.filter(link=link_text, expiration_date__gt=timezone.now()).first()
     if c_link and c_link.id != None:
-        is_link_valid = check_link_expiration(c_link)
-        if is_link_valid:
-            if cur_user:
-                domain = get_current_site(request).domain
-                t_link = f"http://{domain}/shared?link={c_link.link}"
-                return JsonResponse({"data": {"link": t_link}, "success": True}, status=200)
-            else:
-                c_html_file = None
-                request.LANGUAGE_CODE = c_link.language if c_link.language else LANG_CODE_DEFAULT
-                data = {'options': c_link.options}
-                if c_link.exercise_nfb != None:
-                    pass
-                elif c_link.exercise_user != None:
-                    c_html_file = "shared/base_shared_exercise.html"
-                    data['exercise'] = exercises_v_api.GET_get_exs_one(request, -1, -1, {'f_type': FOLDER_TEAM, 'exs': c_link.exercise_user.id})
-                elif c_link.exercise_club != None:
-                    pass
-                if c_html_file:
-                    return render(request, c_html_file, data)
+        if cur_user:
+            domain = get_current_site(request).domain
+            t_link = f"http://{domain}/shared?link={c_link.link}"
+            return ApiJsonResponse({"data": {"link": t_link}, "success": True}, status=200)
+        else:
+            c_html_file = None
+            c_obj = None
+            request.LANGUAGE_CODE = c_link.language if c_link.language else LANG_CODE_DEFAULT
+            data = {'options': c_link.options}
+            if c_link.exercise_nfb != None:
+                pass
+            elif c_link.exercise_user != None:
+                c_html_file = "shared/base_shared_exercise.html"
+                c_obj = c_link.exercise_user
+                c_version = shared_cache.get_object_version(c_obj)
+                data['exercise'] = exercises_v_api.get_shared_exs_data(request, c_link.exercise_user)
+            elif c_link.exercise_club != None:
+                pass
+            elif c_link.snapshot and (c_link.match_user_id != None or c_link.match_club_id != None):
+                c_html_file = "shared/base_shared_match.html"
+                c_obj = c_link
+                c_version = shared_cache.get_object_version(c_obj)
+                data.update(c_link.snapshot)
+            elif c_link.snapshot and (c_link.training_user_id != None or c_link.training_club_id != None):
+                c_html_file = "shared/base_shared_training.html"
+                c_obj = c_link
+                c_version = shared_cache.get_object_version(c_obj)
+                data.update(c_link.snapshot)
+            if c_html_file:
+                response = render(request, c_html_file, data)
+                if c_obj and response.status_code == 200:
+                    shared_cache.set_page(c_link.link, request_lang, response.content, c_obj, c_version, c_link.expiration_date)
+                return response
     if cur_user:
-        return JsonResponse({"errors": "Can't find link"}, status=400)
+        return ApiJsonResponse({"errors": "Can't find link"}, status=400)
     else:
         return False
 